@@ -1,31 +1,15 @@
 import os
-import json
-import re
 import time
-from datetime import datetime
-from typing import Dict, List
 from dotenv import load_dotenv
 load_dotenv()
 
 import streamlit as st
 
-from core.llm import get_interviewer_lm, get_evaluator_lm
-from core.prompts import build_question_prompt, build_eval_prompt
-from core.validators import is_valid_email, parse_and_validate_tech_stack, is_nonempty_string
-from core.storage import (
-    ensure_data_dirs,
-    upsert_candidate,
-    append_performance,
-    save_chat_history,
-)
-from core.evaluator import grade_qa_batch
-from core.flow import (
-    Phase,
-    next_basic_field,
-    BASIC_FIELDS,
-    ensure_session_state,
-    prepare_questions,
-)
+from core.llm import start_warmup, llm_latency_metrics, llm_queue_metrics
+from core.storage import ensure_data_dirs
+from core.flow import Phase, InterviewSession, question_tier_metrics
+from core.ids import new_candidate_id
+from core.session_store import get_session_store
 
 # Streamlit page config
 st.set_page_config(page_title="TalentScout — LLM Interviewer", page_icon="🧠", layout="centered")
@@ -33,19 +17,30 @@ st.set_page_config(page_title="TalentScout — LLM Interviewer", page_icon="🧠
 # Make sure data directories exist
 ensure_data_dirs()
 
-# Initialize session state
-ensure_session_state()
-
-# ✅ New state for locking chat
-if "chat_locked" not in st.session_state:
-    st.session_state.chat_locked = False
+# Load the model into Ollama before the first candidate needs it (no-op after the first run)
+start_warmup()
+
+# Initialize session state; the engine keeps the interview in st.session_state and, with
+# SESSION_STORE set, mirrors it to the store under the ?session= id so any replica can resume it
+store = get_session_store()
+session_id = st.query_params.get("session")
+if store is not None and not session_id:
+    session_id = new_candidate_id()
+    st.query_params["session"] = session_id
+previous = st.session_state.get("_session_sync")
+if previous is not None and previous.session_id != session_id:
+    # the page now points at another interview: stop grading the one it replaces
+    InterviewSession(st.session_state).reset()
+session = InterviewSession(st.session_state, store=store, session_id=session_id)
+
+# After a page refresh or a worker restart, ?resume= picks the interview up from its checkpoint
+resume_token = st.query_params.get("resume")
+if resume_token and session.phase == Phase.GREET and not session.resume(resume_token):
+    del st.query_params["resume"]
 
 # ✅ New state for question generation
 if "generating_questions" not in st.session_state:
     st.session_state.generating_questions = False
-# ✅ New state to track if we're processing the final answer
-if "processing_final_answer" not in st.session_state:
-    st.session_state.processing_final_answer = False
 st.title("🎯 TalentScout — AI Interviewer")
 st.caption("Tech interview simulation with automated scoring. Your responses are stored locally by the interviewer.")
 
@@ -111,6 +106,33 @@ with st.sidebar:
             st.progress(progress)
             st.markdown(f"Step {fields_order.index(st.session_state.pending_field) + 1} of {len(fields_order)}")
 
+    # Starting over abandons the current interview, so its queued grading is cancelled first
+    if phase != Phase.GREET and st.button("🔄 Start a new interview", use_container_width=True):
+        session.reset()
+        st.query_params.clear()
+        st.rerun()
+
+    # Model latency: cold calls include Ollama loading the model, warm calls do not
+    latency = llm_latency_metrics()
+    if latency["cold"]["count"] or latency["warm"]["count"]:
+        st.caption(
+            f"LLM latency (p50) — cold: {latency['cold']['p50_s']:.2f}s ({latency['cold']['count']}), "
+            f"warm: {latency['warm']['p50_s']:.2f}s ({latency['warm']['count']})"
+        )
+    queue = llm_queue_metrics()
+    if queue["interactive"]["admitted"] or queue["batch"]["admitted"]:
+        st.caption(
+            f"LLM queue — running {queue['running']}/{queue['limit']}, waiting {queue['queued']}; "
+            f"wait p50/p99: questions {queue['interactive']['wait_p50_s']:.2f}/{queue['interactive']['wait_p99_s']:.2f}s, "
+            f"grading {queue['batch']['wait_p50_s']:.2f}/{queue['batch']['wait_p99_s']:.2f}s"
+        )
+    tiers = {t: m for t, m in question_tier_metrics().items() if m["interviews"]}
+    if tiers:
+        st.caption("Question sets by tier (first question / full set, p50/p99) — " + ", ".join(
+            f"{t}: {m['interviews']} ({m['first_p50_s']:.1f}/{m['first_p99_s']:.1f}s, "
+            f"{m['full_p50_s']:.1f}/{m['full_p99_s']:.1f}s)" for t, m in tiers.items()
+        ))
+
 # First-time greeting with enhanced styling
 if phase == Phase.GREET:
     st.markdown("""
@@ -149,18 +171,21 @@ if phase == Phase.GREET:
         </div>
     </div>
     """, unsafe_allow_html=True)
-    st.session_state.phase = Phase.WAIT_GREETING
+    session.start()
 
 # ---------- Chat rendering & locking ----------
-# Show loading state during question generation
-if st.session_state.generating_questions:
-    st.markdown("""
+def crafting_banner(position: int = 0) -> str:
+    if position:
+        wait = f"You are <strong>#{position}</strong> in line — other candidates are being served right now. Hang tight!"
+    else:
+        wait = "This may take 10-15 seconds. Please wait while I analyze your tech stack and experience."
+    return f"""
     <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 2rem; border-radius: 1rem; text-align: center; margin: 2rem 0;'>
         <div style='color: white; font-size: 1.5rem; margin-bottom: 1rem;'>
             🤖 AI is crafting your personalized interview questions...
         </div>
         <div style='color: rgba(255,255,255,0.8); font-size: 1rem; margin-bottom: 1.5rem;'>
-            This may take 10-15 seconds. Please wait while I analyze your tech stack and experience.
+            {wait}
         </div>
         <div style='display: flex; justify-content: center; align-items: center; gap: 0.5rem;'>
             <div style='width: 12px; height: 12px; background: white; border-radius: 50%; animation: bounce 1.4s ease-in-out infinite both;'></div>
@@ -169,12 +194,17 @@ if st.session_state.generating_questions:
         </div>
     </div>
     <style>
-        @keyframes bounce {
-            0%, 80%, 100% { transform: scale(0); }
-            40% { transform: scale(1); }
-        }
+        @keyframes bounce {{
+            0%, 80%, 100% {{ transform: scale(0); }}
+            40% {{ transform: scale(1); }}
+        }}
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+# Show loading state during question generation (updated with the queue position while waiting)
+crafting = st.empty()
+if st.session_state.generating_questions:
+    crafting.markdown(crafting_banner(), unsafe_allow_html=True)
 
 # Show chat history with enhanced styling
 for role, content in st.session_state.chat_history:
@@ -208,170 +238,25 @@ elif st.session_state.phase == Phase.SCORING:
 else:
     prompt = st.chat_input("Type your response here... 💬")
 
-# ---------- Input processing protection ----------
-# Only process if we have a valid prompt and we're not in a locked state during critical operations
+# ---------- Input processing ----------
 if prompt is not None and prompt.strip():
-    # Check if we should ignore the input due to race conditions
-    should_process = True
-    
-    if st.session_state.phase == Phase.SCORING and not st.session_state.processing_final_answer:
+    if not session.accepts_input:
         st.warning("Your message was received while the system was processing and has been ignored.")
-        should_process = False
-    
-    if should_process:
+    else:
         user(prompt)
-        st.session_state.chat_history.append(("user", prompt))
-
-    # Lock chat immediately (except when processing final answer)
-    if not st.session_state.processing_final_answer:
-        st.session_state.chat_locked = True
-
-    # ---------- Handle greeting ----------
-    if st.session_state.phase == Phase.WAIT_GREETING:
-        if re.search(r"\b(hi|hii|hie|hello|hey|howdy|yo)\b", prompt.strip().lower()):
-            bot("Great! Let's capture your basic details one by one. First, **what's your full name?**")
-            st.session_state.chat_history.append(("assistant", "Great! Let's capture your basic details one by one. First, **what's your full name?**"))
-            st.session_state.phase = Phase.COLLECT_INFO
-            st.session_state.pending_field = "name"
-        else:
-            bot("Please greet to begin — try saying **hello** 👋")
-            st.session_state.chat_history.append(("assistant", "Please greet to begin — try saying **hello** 👋"))
-            st.session_state.chat_locked = False
-
-    # ---------- Collect info ----------
-    elif st.session_state.phase == Phase.COLLECT_INFO:
-        field = st.session_state.pending_field
-        value = prompt.strip()
-        valid = False
-        err = None
-
-        if field == "name":
-            valid = is_nonempty_string(value) and len(value.split()) >= 2
-            if not valid:
-                err = "Please provide your **full name** (first and last)."
-        elif field == "email":
-            valid = is_valid_email(value)
-            if not valid:
-                err = "Please provide a **valid email** (e.g., name@gmail.com)."
-        elif field == "experience":
-            valid = is_nonempty_string(value)
-            if not valid:
-                err = "Please specify your **experience** (e.g., '3 years')."
-        elif field == "desired_position":
-            valid = is_nonempty_string(value)
-            if not valid:
-                err = "Please provide the **desired position** (e.g., 'Backend Developer')."
-        elif field == "tech_stack":
-            tech_list, tech_err = parse_and_validate_tech_stack(value)
-            valid = tech_err is None and len(tech_list) > 0
-            if not valid:
-                err = tech_err or "Please provide a comma-separated **tech stack** (e.g., 'Python, Django, REST')."
-            else:
-                st.session_state.candidate["tech_list"] = tech_list
-
-        if not valid:
-            bot(err)
-            st.session_state.chat_history.append(("assistant", err))
-            st.session_state.chat_locked = False
-        else:
-            st.session_state.candidate[field] = value
-            nxt = next_basic_field(field)
-            if nxt is None:
-                st.session_state.candidate["id"] = st.session_state.candidate.get("id") or (
-                    datetime.utcnow().strftime("%Y%m%d%H%M%S")
-                )
-                upsert_candidate(st.session_state.candidate)
-
-                interviewer = get_interviewer_lm()
-                q_prompt = build_question_prompt(
-                    candidate_name=st.session_state.candidate["name"],
-                    contact_info=st.session_state.candidate["email"],
-                    experience=st.session_state.candidate["experience"],
-                    desired_position=st.session_state.candidate["desired_position"],
-                    tech_stack=st.session_state.candidate["tech_stack"],
-                )
-
-                with st.spinner("Generating interview questions… ⏳"):
-                    questions = prepare_questions(interviewer, q_prompt, st.session_state.candidate["tech_list"], total=10)
-
-                st.session_state.questions = questions
-                st.session_state.phase = Phase.INTERVIEW
-                first_q = f"Question 1/10: {questions[0]}"
-                bot("Thanks! Your details are recorded. Let's begin the interview.")
-                st.session_state.chat_history.append(("assistant", "Thanks! Your details are recorded. Let's begin the interview."))
-                bot(first_q)
-                st.session_state.chat_history.append(("assistant", first_q))
-                st.session_state.current_q = 0
-                save_chat_history(st.session_state.candidate["id"], st.session_state.chat_history)
-                st.session_state.chat_locked = False
-            else:
-                st.session_state.pending_field = nxt
-                label = {
-                    "email": "Great, now your **email**?",
-                    "experience": "Thanks! What's your **work experience** (e.g., '3 years')?",
-                    "desired_position": "Which **position** are you aiming for?",
-                    "tech_stack": "Finally, list your **tech stack** (comma-separated).",
-                }[nxt]
-                bot(label)
-                st.session_state.chat_history.append(("assistant", label))
-                st.session_state.chat_locked = False
-
-    # ---------- Interview Q&A ----------
-    elif st.session_state.phase == Phase.INTERVIEW:
-        idx = st.session_state.current_q
-        q = st.session_state.questions[idx]
-        st.session_state.answers.append({"q": q, "a": prompt})
-
-        if idx < len(st.session_state.questions) - 1:
-            # Not the last question - continue as normal
-            st.session_state.current_q += 1
-            next_q = st.session_state.questions[st.session_state.current_q]
-            msg = f"Question {st.session_state.current_q + 1}/10: {next_q}"
-            bot(msg)
-            st.session_state.chat_history.append(("assistant", msg))
-            save_chat_history(st.session_state.candidate["id"], st.session_state.chat_history)
-            st.session_state.chat_locked = False
-        else:
-            # This is the 10th question response - handle it differently
-            st.session_state.processing_final_answer = True
-            
-            # Show completion message but don't change phase yet
-            bot("Thanks for completing all questions. Evaluating your responses… ⏳")
-            st.session_state.chat_history.append(("assistant", "Thanks for completing all questions. Evaluating your responses… ⏳"))
-            
-            # Save chat history before starting evaluation
-            save_chat_history(st.session_state.candidate["id"], st.session_state.chat_history)
-            
-            # Now proceed with scoring
-            st.session_state.phase = Phase.SCORING
-
-            with st.spinner("Scoring your answers…"):
-                evaluator = get_evaluator_lm()
-                eval_prompt = build_eval_prompt()
-                results = grade_qa_batch(evaluator, eval_prompt, st.session_state.answers)
-
-                total_score = max(0, min(100, int(round(sum(r.get("score", 0) for r in results)))))
-                st.session_state.performance = {"total": total_score, "breakdown": results}
-
-                append_performance(
-                    candidate_id=st.session_state.candidate["id"],
-                    name=st.session_state.candidate["name"],
-                    email=st.session_state.candidate["email"],
-                    role=st.session_state.candidate["desired_position"],
-                    tech_stack=st.session_state.candidate["tech_stack"],
-                    score=total_score,
-                    breakdown_json=json.dumps(results, ensure_ascii=False),
-                )
-                save_chat_history(st.session_state.candidate["id"], st.session_state.chat_history)
-
-            st.session_state.phase = Phase.THANK_YOU
-            st.session_state.processing_final_answer = False
+        # the engine records the turn, advances the phase and persists the transcript
+        session.handle(
+            prompt,
+            emit=bot,
+            progress=st.spinner,
+            queued=lambda position: crafting.markdown(crafting_banner(position), unsafe_allow_html=True),
+        )
+        crafting.empty()
+        if session.phase == Phase.INTERVIEW:
+            st.query_params["resume"] = st.session_state.resume_token
+        if session.phase == Phase.THANK_YOU:
             st.rerun()
 
-    # Persist chat
-    if st.session_state.candidate.get("id"):
-        save_chat_history(st.session_state.candidate["id"], st.session_state.chat_history)
-
 # ---------- Final Thank-you page with enhanced styling ----------
 if st.session_state.phase == Phase.THANK_YOU:
     score = st.session_state.performance["total"]
@@ -433,6 +318,14 @@ if st.session_state.phase == Phase.THANK_YOU:
                 **Question {i+1}:** {q_score}/10 points
                 """)
 
+    # Confirm the performance record actually reached storage before saying so
+    write = st.session_state.get("performance_write")
+    if write is not None:
+        try:
+            write.result(timeout=10)
+        except Exception:
+            st.warning("We could not confirm that your responses were saved. Please let the hiring team know.")
+
     # Final message
     st.markdown("""
     <div style='background: linear-gradient(135deg, #fef3c7 0%, #fde68a 100%); padding: 2rem; border-radius: 1rem; margin: 2rem 0; text-align: center; border: 2px solid #f59e0b;'>
@@ -441,7 +334,7 @@ if st.session_state.phase == Phase.THANK_YOU:
         </div>
         <p style='color: #78350f; margin: 0; line-height: 1.6;'>
             Your responses have been saved and will be reviewed by our hiring team.<br>
-            You may now close this tab or refresh the page to start a new interview.
+            You may now close this tab or start a new interview from the sidebar.
         </p>
     </div>
     """, unsafe_allow_html=True)
\ No newline at end of file
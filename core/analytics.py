@@ -0,0 +1,217 @@
+# core/analytics.py
+"""
+Columnar copy of the performance records for recruiter reporting.
+
+`export_performances()` flattens every performance row (per-question scores become typed columns,
+the tech stack a list column) into Parquet files partitioned by month under
+data/analytics/performances/month=YYYY-MM/. Exports are incremental: only rows appended since
+the previous export are parsed and written. The query helpers read just the columns (and, with
+`since`, just the month partitions) they need.
+
+    python -m core.analytics export [--rebuild]
+    python -m core.analytics top "Backend Developer" [N]
+    python -m core.analytics dist [ROLE]
+    python -m core.analytics techs [ROLE]
+"""
+import os
+import json
+import shutil
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    _PYARROW_AVAILABLE = True
+except Exception:
+    _PYARROW_AVAILABLE = False
+
+from core.ids import new_candidate_id
+from core.score_stats import histogram, role_key, split_techs, summarize
+from core.storage import DATA_DIR, iter_performances
+
+ANALYTICS_DIR = os.path.join(DATA_DIR, "analytics", "performances")
+_EXPORT_META = os.path.join(ANALYTICS_DIR, "_export.json")
+EXPORT_FORMAT = 1
+MAX_QUESTIONS = 10
+
+
+def _require_pyarrow():
+    if not _PYARROW_AVAILABLE:
+        raise RuntimeError("pyarrow is required for the analytics store (pip install pyarrow)")
+
+
+def _schema():
+    return pa.schema(
+        [
+            ("id", pa.string()),
+            ("name", pa.string()),
+            ("email", pa.string()),
+            ("role", pa.string()),
+            ("role_key", pa.string()),
+            ("tech_stack", pa.string()),
+            ("techs", pa.list_(pa.string())),
+            ("score", pa.int32()),
+            ("created_at", pa.timestamp("us")),
+            ("n_questions", pa.int16()),
+        ]
+        + [(f"q{i}_score", pa.float32()) for i in range(1, MAX_QUESTIONS + 1)]
+    )
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _flatten(row: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        breakdown = json.loads(row.get("breakdown") or "[]")
+    except ValueError:
+        breakdown = []
+    if not isinstance(breakdown, list):
+        breakdown = []
+    try:
+        created = datetime.fromisoformat(row.get("created_at") or "")
+    except ValueError:
+        created = None
+    score = _to_float(row.get("score"))
+    flat = {
+        "id": row.get("id"),
+        "name": row.get("name"),
+        "email": row.get("email"),
+        "role": row.get("role"),
+        "role_key": role_key(row.get("role")),
+        "tech_stack": row.get("tech_stack"),
+        "techs": split_techs(row.get("tech_stack")),
+        "score": None if score is None else int(score),
+        "created_at": created,
+        "n_questions": len(breakdown),
+    }
+    for i in range(MAX_QUESTIONS):
+        item = breakdown[i] if i < len(breakdown) and isinstance(breakdown[i], dict) else {}
+        flat[f"q{i + 1}_score"] = _to_float(item.get("score"))
+    return flat
+
+
+def export_performances(rebuild: bool = False, out_dir: Optional[str] = None) -> Dict[str, int]:
+    """Append performance rows not exported yet (all rows with rebuild=True) to the Parquet store."""
+    _require_pyarrow()
+    out_dir = out_dir or ANALYTICS_DIR
+    meta_path = os.path.join(out_dir, os.path.basename(_EXPORT_META))
+    if rebuild and os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    exported = 0
+    if os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") == EXPORT_FORMAT:
+            exported = int(meta.get("rows_exported", 0))
+
+    by_month: Dict[str, List[Dict[str, Any]]] = {}
+    total = 0
+    for total, row in enumerate(iter_performances(), start=1):
+        if total <= exported:
+            continue
+        flat = _flatten(row)
+        month = flat["created_at"].strftime("%Y-%m") if flat["created_at"] else "unknown"
+        by_month.setdefault(month, []).append(flat)
+
+    schema = _schema()
+    batch_id = new_candidate_id()
+    for month, rows in by_month.items():
+        part_dir = os.path.join(out_dir, f"month={month}")
+        os.makedirs(part_dir, exist_ok=True)
+        tmp = os.path.join(part_dir, f".part-{batch_id}.parquet")
+        pq.write_table(pa.Table.from_pylist(rows, schema=schema), tmp)
+        # files starting with '.' are ignored by readers until renamed into place
+        os.replace(tmp, os.path.join(part_dir, f"part-{batch_id}.parquet"))
+
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"format": EXPORT_FORMAT, "rows_exported": max(total, exported)}, f)
+    os.replace(meta_path + ".tmp", meta_path)
+    return {"new_rows": sum(len(r) for r in by_month.values()), "rows_exported": max(total, exported)}
+
+
+def _read(columns: List[str], role: Optional[str] = None, since: Optional[str] = None, out_dir: Optional[str] = None):
+    _require_pyarrow()
+    out_dir = out_dir or ANALYTICS_DIR
+    if not os.path.isdir(out_dir):
+        return pa.Table.from_pylist([], schema=pa.schema([_schema().field(c) for c in columns]))
+    dataset = ds.dataset(out_dir, format="parquet", partitioning="hive")
+    flt = None
+    if role is not None:
+        flt = ds.field("role_key") == role_key(role)
+    if since is not None:
+        # partition pruning: whole months before `since` (YYYY-MM) are never opened
+        month_flt = ds.field("month") >= since
+        flt = month_flt if flt is None else flt & month_flt
+    return dataset.to_table(columns=columns, filter=flt)
+
+
+def top_n_by_role(role: str, n: int = 10, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    table = _read(["id", "name", "email", "role", "score", "created_at"], role=role, since=since)
+    table = table.filter(pc.is_valid(table["score"])).sort_by([("score", "descending"), ("created_at", "ascending")])
+    return table.slice(0, n).to_pylist()
+
+
+def score_distribution(role: Optional[str] = None, bins: int = 10, since: Optional[str] = None) -> Dict[str, Any]:
+    scores = _read(["score"], role=role, since=since)["score"].drop_null()
+    count = len(scores)
+    width = 100 / bins
+    hist = [0] * bins
+    for s in scores.to_pylist():
+        hist[min(bins - 1, max(0, int(s // width)))] += 1
+    out: Dict[str, Any] = {
+        "count": count,
+        "bins": [{"from": round(i * width, 2), "to": round((i + 1) * width, 2), "count": c} for i, c in enumerate(hist)],
+    }
+    if count:
+        # the same nearest-rank quantiles as storage.performance_stats, so both reports agree
+        stats = summarize(histogram(scores.to_pylist()))
+        out.update({"mean": stats["mean"], "p50": stats["p50"], "p90": stats["p90"]})
+    return out
+
+
+def tech_averages(role: Optional[str] = None, min_count: int = 1, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    table = _read(["techs", "score"], role=role, since=since)
+    table = table.filter(pc.is_valid(table["score"]))
+    if table.num_rows == 0:
+        return []
+    techs = table["techs"].combine_chunks()
+    flat = pa.table({
+        "tech": pc.list_flatten(techs),
+        "score": pc.take(table["score"], pc.list_parent_indices(techs)),
+    })
+    grouped = flat.group_by("tech").aggregate([("score", "mean"), ("score", "count")])
+    rows = [
+        {"tech": r["tech"], "mean_score": r["score_mean"], "count": r["score_count"]}
+        for r in grouped.to_pylist()
+        if r["score_count"] >= min_count
+    ]
+    return sorted(rows, key=lambda r: (-r["mean_score"], -r["count"], r["tech"]))
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    cmd = args[0] if args else ""
+    if cmd == "export":
+        result = export_performances(rebuild="--rebuild" in args)
+    elif cmd == "top" and len(args) >= 2:
+        result = top_n_by_role(args[1], int(args[2]) if len(args) > 2 else 10)
+    elif cmd == "dist":
+        result = score_distribution(args[1] if len(args) > 1 else None)
+    elif cmd == "techs":
+        result = tech_averages(args[1] if len(args) > 1 else None)
+    else:
+        print(__doc__)
+        sys.exit(2)
+    print(json.dumps(result, indent=2, default=str))
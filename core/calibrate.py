@@ -0,0 +1,152 @@
+# core/calibrate.py
+"""
+Fit the evaluator's weights and acceptance threshold to human-labeled answers.
+
+The labeled sample is a CSV or JSONL file with `question`, `answer` and `label` (the score a
+reviewer gave, 0..10). Per-answer features are computed once with the evaluator itself; every
+candidate (w_sim, w_kw, threshold) is then scored against the whole sample with array operations
+only, and the best set is written to the weights file the evaluator loads at startup.
+
+    python -m core.calibrate labels.csv [--metric mae|mse] [--step 0.05] [--dry-run]
+"""
+import os
+import csv
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core import evaluator
+from core.evaluator import EVALUATOR_WEIGHTS_PATH, WEIGHTS_FORMAT, answer_features
+
+METRICS = ("mae", "mse")
+
+
+def load_labeled(path: str) -> Tuple[List[Dict[str, str]], np.ndarray]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            records = [json.loads(line) for line in f if line.strip()]
+        else:
+            records = list(csv.DictReader(f))
+    qa, labels = [], []
+    for rec in records:
+        try:
+            label = float(rec.get("label"))
+        except (TypeError, ValueError):
+            continue  # unlabeled row
+        qa.append({"q": rec.get("question") or "", "a": rec.get("answer") or ""})
+        labels.append(min(10.0, max(0.0, label)))
+    return qa, np.asarray(labels, dtype=np.float64)
+
+
+def score_features(features: np.ndarray, weights: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+    """
+    Evaluator scores for every answer under every weight set at once, as _score_result computes
+    them. weights is (C, 2) of (w_sim, w_kw), thresholds is (C,); returns (C, N).
+    """
+    combined = weights[:, 0:1] * features[:, 1] + weights[:, 1:2] * features[:, 0]
+    scores = np.round(np.clip(combined * 10.0, 0.0, 10.0), 2)
+    scores[combined < thresholds[:, None]] = 0.0
+    scores[:, features[:, 2] > 0] = 0.0
+    return scores
+
+
+def _errors(scores: np.ndarray, labels: np.ndarray, metric: str) -> np.ndarray:
+    diff = scores - labels
+    return np.abs(diff).mean(axis=1) if metric == "mae" else (diff * diff).mean(axis=1)
+
+
+def grid_search(
+    features: np.ndarray,
+    labels: np.ndarray,
+    metric: str = "mae",
+    step: float = 0.05,
+    max_threshold: float = 0.5,
+    threshold_step: float = 0.01,
+) -> Dict[str, Any]:
+    """Exhaustive search over w_sim, w_kw in [0, 1] and threshold in [0, max_threshold]."""
+    if metric not in METRICS:
+        raise ValueError(f"unknown metric {metric!r}; expected one of {METRICS}")
+    grid = np.round(np.arange(0.0, 1.0 + step / 2, step), 6)
+    thresholds = np.round(np.arange(0.0, max_threshold + threshold_step / 2, threshold_step), 6)
+    w_sim, w_kw = np.meshgrid(grid, grid, indexing="ij")
+    pairs = np.column_stack([w_sim.ravel(), w_kw.ravel()])
+
+    started = time.perf_counter()
+    best = (np.inf, None)
+    # one (weight sets x answers) matrix per threshold keeps memory at C * N
+    for thr in thresholds:
+        errs = _errors(score_features(features, pairs, np.full(len(pairs), thr)), labels, metric)
+        i = int(np.argmin(errs))
+        if errs[i] < best[0]:
+            best = (float(errs[i]), (float(pairs[i, 0]), float(pairs[i, 1]), float(thr)))
+    elapsed = time.perf_counter() - started
+    evaluated = len(pairs) * len(thresholds)
+    error, (bw_sim, bw_kw, bthr) = best
+    return {
+        "w_sim": bw_sim,
+        "w_kw": bw_kw,
+        "threshold": bthr,
+        metric: error,
+        "evaluated": evaluated,
+        "seconds": round(elapsed, 3),
+        "ms_per_weight_set": round(elapsed * 1000 / evaluated, 4),
+    }
+
+
+def current_error(features: np.ndarray, labels: np.ndarray, metric: str = "mae") -> float:
+    weights = np.array([[evaluator.W_SIM, evaluator.W_KW]])
+    return float(_errors(score_features(features, weights, np.array([evaluator.MIN_ACCEPT_THRESHOLD])), labels, metric)[0])
+
+
+def write_weights(result: Dict[str, Any], metric: str, n_samples: int, baseline: float, path: Optional[str] = None) -> Dict[str, Any]:
+    path = path or EVALUATOR_WEIGHTS_PATH
+    now = datetime.utcnow()
+    data = {
+        "format": WEIGHTS_FORMAT,
+        "version": f"cal-{now.strftime('%Y%m%d%H%M%S')}",
+        "w_sim": result["w_sim"],
+        "w_kw": result["w_kw"],
+        "threshold": result["threshold"],
+        "metric": metric,
+        "error": result[metric],
+        "baseline_error": baseline,
+        "n_samples": n_samples,
+        "evaluator_version": evaluator.EVALUATOR_VERSION,
+        "created_at": now.isoformat(),
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+    return data
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m core.calibrate", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("labels", help="CSV or JSONL with question, answer, label (0..10)")
+    parser.add_argument("--metric", choices=METRICS, default="mae")
+    parser.add_argument("--step", type=float, default=0.05, help="weight grid step")
+    parser.add_argument("--dry-run", action="store_true", help="report without writing the weights file")
+    args = parser.parse_args()
+
+    qa, labels = load_labeled(args.labels)
+    if not qa:
+        parser.error("no labeled rows found")
+    t0 = time.perf_counter()
+    features = answer_features(qa)
+    feature_seconds = time.perf_counter() - t0
+    baseline = current_error(features, labels, args.metric)
+    result = grid_search(features, labels, args.metric, args.step)
+    report = {"samples": len(qa), "feature_seconds": round(feature_seconds, 3), "current": {
+        "w_sim": evaluator.W_SIM, "w_kw": evaluator.W_KW, "threshold": evaluator.MIN_ACCEPT_THRESHOLD,
+        "version": evaluator.WEIGHTS_VERSION, args.metric: baseline,
+    }, "best": result}
+    if not args.dry_run:
+        report["written"] = write_weights(result, args.metric, len(qa), baseline)
+    print(json.dumps(report, indent=2))
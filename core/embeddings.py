@@ -0,0 +1,217 @@
+# core/embeddings.py
+"""
+Optional sentence-embedding similarity for the evaluator (EVALUATOR_SIMILARITY=embedding).
+
+The sentence-transformers model is loaded on first use and runs on the CPU. All questions and
+answers of a grading batch are encoded in one forward pass; question vectors are also kept in an
+append-only, memory-mapped cache under data/models/embeddings/<model>/ keyed by a hash of the
+text, so a question asked in earlier interviews is never encoded again.
+
+    python -m core.embeddings bench [N]   # latency / throughput against the TF-IDF path
+"""
+import os
+import re
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+
+    _NUMPY_AVAILABLE = True
+except Exception:
+    _NUMPY_AVAILABLE = False
+
+from core.idf_model import MODEL_DIR
+from core.locks import file_lock
+
+# "tfidf" keeps the corpus-IDF / TF-IDF / Jaccard chain; "embedding" uses the model below
+SIMILARITY_BACKEND = os.getenv("EVALUATOR_SIMILARITY", "tfidf").lower()
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDINGS_DIR = os.path.join(MODEL_DIR, "embeddings")
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class VectorCache:
+    """
+    Float32 vectors in a flat file (memory-mapped for reads) plus a parallel file of keys, one per
+    line. Both are only ever appended to, under an inter-process lock; vectors are written before
+    their keys, so a crash between the two leaves an unreferenced vector rather than a bad entry.
+    """
+
+    def __init__(self, directory: str, dim: int):
+        self.dim = dim
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.keys_path = os.path.join(directory, "keys.txt")
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self._keys_size = 0
+        self._mmap = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _refresh(self):
+        # pick up entries appended since the last look, by this or another process
+        size = os.path.getsize(self.keys_path) if os.path.exists(self.keys_path) else 0
+        if size == self._keys_size:
+            return
+        with open(self.keys_path, "rb") as f:
+            f.seek(self._keys_size)
+            data = f.read(size - self._keys_size)
+        data = data[: data.rfind(b"\n") + 1]
+        for line in data.decode("utf-8").splitlines():
+            self._index.setdefault(line, len(self._index))
+        self._keys_size += len(data)
+        n_vectors = os.path.getsize(self.vectors_path) // (4 * self.dim) if os.path.exists(self.vectors_path) else 0
+        self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(n_vectors, self.dim)) if n_vectors else None
+
+    def get_many(self, keys: List[str]) -> Dict[str, "np.ndarray"]:
+        with self._lock:
+            self._refresh()
+            if self._mmap is None:
+                return {}
+            return {k: np.asarray(self._mmap[self._index[k]]) for k in keys if k in self._index and self._index[k] < len(self._mmap)}
+
+    def put_many(self, entries: Dict[str, "np.ndarray"]):
+        if not entries:
+            return
+        with self._lock, file_lock(self.keys_path):
+            self._refresh()
+            new = [(k, v) for k, v in entries.items() if k not in self._index]
+            if not new:
+                return
+            n_keys = len(self._index)
+            with open(self.vectors_path, "r+b" if os.path.exists(self.vectors_path) else "wb") as f:
+                # row i of the vector file belongs to line i of the key file; drop orphans first
+                f.truncate(n_keys * 4 * self.dim)
+                f.seek(0, os.SEEK_END)
+                f.write(np.asarray([v for _, v in new], dtype=np.float32).tobytes())
+            with open(self.keys_path, "a", encoding="utf-8") as f:
+                f.write("".join(k + "\n" for k, _ in new))
+            self._refresh()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._index)
+
+
+class EmbeddingSimilarity:
+    def __init__(self, model_name: str = EMBEDDING_MODEL, cache_dir: Optional[str] = None):
+        self.model_name = model_name
+        self._cache_dir = cache_dir or os.path.join(EMBEDDINGS_DIR, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))
+        self._lock = threading.Lock()
+        self._model = None
+        self._cache: Optional[VectorCache] = None
+
+    def _load(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    model = SentenceTransformer(self.model_name, device="cpu")
+                    self._cache = VectorCache(self._cache_dir, model.get_sentence_embedding_dimension())
+                    self._model = model
+        return self._model
+
+    def encode(self, texts: List[str]) -> "np.ndarray":
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self._load().encode(
+            texts, batch_size=EMBEDDING_BATCH_SIZE, normalize_embeddings=True, convert_to_numpy=True
+        ).astype(np.float32, copy=False)
+
+    def similarities(self, questions: List[str], answers: List[str]) -> List[float]:
+        """Cosine similarity (clamped to 0..1) of each pair; empty texts score 0."""
+        self._load()
+        q_keys = [text_key(q) for q in questions]
+        cached = self._cache.get_many(list(dict.fromkeys(q_keys)))
+        missing = list(dict.fromkeys(q for q, k in zip(questions, q_keys) if k not in cached))
+        # every uncached question and every answer in one forward pass
+        vectors = self.encode(missing + list(answers))
+        fresh = {text_key(q): vectors[i] for i, q in enumerate(missing)}
+        try:
+            self._cache.put_many(fresh)
+        except OSError:
+            pass  # the cache only saves work; scoring goes on without it
+        cached.update(fresh)
+        a_vecs = vectors[len(missing):]
+        sims = []
+        for i, (q, a) in enumerate(zip(questions, answers)):
+            if not q.strip() or not a.strip():
+                sims.append(0.0)
+                continue
+            sim = float(np.dot(cached[q_keys[i]], a_vecs[i]))
+            sims.append(0.0 if np.isnan(sim) else max(0.0, min(1.0, sim)))
+        return sims
+
+
+_BACKEND_LOCK = threading.Lock()
+_BACKEND: Optional[EmbeddingSimilarity] = None
+_BACKEND_FAILED = False
+
+
+def get_embedding_similarity() -> Optional[EmbeddingSimilarity]:
+    """Process-wide backend when EVALUATOR_SIMILARITY=embedding and the model can be loaded, else None."""
+    global _BACKEND, _BACKEND_FAILED
+    if SIMILARITY_BACKEND != "embedding" or not _NUMPY_AVAILABLE or _BACKEND_FAILED:
+        return None
+    if _BACKEND is None:
+        with _BACKEND_LOCK:
+            if _BACKEND is None and not _BACKEND_FAILED:
+                backend = EmbeddingSimilarity()
+                try:
+                    backend._load()
+                    _BACKEND = backend
+                except Exception:
+                    # sentence-transformers missing or model unavailable: stay on TF-IDF
+                    _BACKEND_FAILED = True
+    return _BACKEND
+
+
+if __name__ == "__main__":
+    import sys
+    import json
+    import time
+
+    from core import evaluator
+    from core.idf_model import iter_transcript_qa
+    from core.storage import iter_chat_histories
+
+    args = sys.argv[1:]
+    if args[:1] != ["bench"]:
+        print("usage: python -m core.embeddings bench [N]")
+        sys.exit(2)
+    limit = int(args[1]) if len(args) > 1 else 1000
+    pairs = []
+    for _, history in iter_chat_histories():
+        pairs.extend(iter_transcript_qa(history))
+        if len(pairs) >= limit:
+            break
+    if not pairs:
+        print("no answered questions in data/interviews/ to benchmark on")
+        sys.exit(1)
+    pairs = pairs[:limit]
+    qs, as_ = [q for q, _ in pairs], [a for _, a in pairs]
+    report = {"pairs": len(pairs)}
+
+    t0 = time.perf_counter()
+    evaluator._batch_semantic_similarity(qs, as_)
+    elapsed = time.perf_counter() - t0
+    report["tfidf"] = {"seconds": round(elapsed, 3), "pairs_per_s": round(len(pairs) / elapsed, 1)}
+
+    backend = EmbeddingSimilarity()
+    t0 = time.perf_counter()
+    backend._load()
+    report["embedding_model_load_s"] = round(time.perf_counter() - t0, 3)
+    for label in ("embedding_cold", "embedding_warm"):
+        # the warm run finds every question vector in the on-disk cache
+        t0 = time.perf_counter()
+        backend.similarities(qs, as_)
+        elapsed = time.perf_counter() - t0
+        report[label] = {"seconds": round(elapsed, 3), "pairs_per_s": round(len(pairs) / elapsed, 1)}
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,162 @@
+# core/eval_cache.py
+"""
+Persistent, content-addressed cache of per-answer evaluation results.
+
+Entries are keyed by a hash of the question, the answer and an evaluator "variant" string
+(version, weights, similarity backend, LLM model), so changing any of those never serves a stale
+score. The cache is an SQLite table bounded to EVAL_CACHE_MAX_ENTRIES; the least recently used
+entries are evicted first.
+"""
+import os
+import sqlite3
+import hashlib
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from core.storage import DATA_DIR
+
+EVAL_CACHE_PATH = os.path.join(DATA_DIR, "eval_cache.db")
+EVAL_CACHE_ENABLED = os.getenv("EVAL_CACHE", "1") not in ("0", "false", "off")
+EVAL_CACHE_MAX_ENTRIES = int(os.getenv("EVAL_CACHE_MAX_ENTRIES", "100000"))
+
+
+def cache_key(question: str, answer: str, variant: str) -> str:
+    h = hashlib.sha256()
+    for part in (variant, question, answer):
+        data = part.encode("utf-8")
+        # length-prefixed so ("ab", "c") and ("a", "bc") never collide
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()
+
+
+class EvalCache:
+    def __init__(self, path: str = EVAL_CACHE_PATH, max_entries: int = EVAL_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size: Optional[int] = None  # rows in the table, counted at open and kept up to date
+        self._data_version = None
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS eval_cache ("
+            "key TEXT PRIMARY KEY, score REAL, justification TEXT, last_used REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS eval_cache_lru ON eval_cache (last_used)")
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Tuple[float, str]]:
+        if not keys:
+            return {}
+        found: Dict[str, Tuple[float, str]] = {}
+        with self._lock:
+            # stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, score, justification FROM eval_cache WHERE key IN ({', '.join('?' for _ in chunk)})",
+                    chunk,
+                ).fetchall()
+                found.update((k, (s, j)) for k, s, j in rows)
+            if found:
+                now = time.time()
+                self._conn.executemany("UPDATE eval_cache SET last_used = ? WHERE key = ?", [(now, k) for k in found])
+                self._conn.commit()
+            self.hits += sum(1 for k in keys if k in found)
+            self.misses += sum(1 for k in keys if k not in found)
+        return found
+
+    def put_many(self, entries: Dict[str, Tuple[float, str]]):
+        if not entries:
+            return
+        now = time.time()
+        keys = list(entries)
+        with self._lock:
+            self._count_rows()
+            existing = 0
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                (n,) = self._conn.execute(
+                    f"SELECT COUNT(*) FROM eval_cache WHERE key IN ({', '.join('?' for _ in chunk)})", chunk
+                ).fetchone()
+                existing += n
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO eval_cache (key, score, justification, last_used) VALUES (?, ?, ?, ?)",
+                [(k, s, j, now) for k, (s, j) in entries.items()],
+            )
+            self._size += len(entries) - existing
+            if self._size > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _count_rows(self):
+        # COUNT(*) is a table scan: only at open and after another process (data_version) has written
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._size is None or version != self._data_version:
+            (self._size,) = self._conn.execute("SELECT COUNT(*) FROM eval_cache").fetchone()
+            self._data_version = version
+
+    def _evict(self):
+        excess = self._size - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM eval_cache WHERE key IN (SELECT key FROM eval_cache ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+            self._size = self.max_entries
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            (size,) = self._conn.execute("SELECT COUNT(*) FROM eval_cache").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": size,
+                "max_entries": self.max_entries,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM eval_cache")
+            self._conn.commit()
+            self._size = 0
+
+
+_CACHE_LOCK = threading.Lock()
+_CACHE: Optional[EvalCache] = None
+
+
+def get_eval_cache() -> Optional[EvalCache]:
+    """Process-wide cache; None when disabled with EVAL_CACHE=0 or the database cannot be opened."""
+    global _CACHE
+    if not EVAL_CACHE_ENABLED:
+        return None
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                try:
+                    _CACHE = EvalCache()
+                except Exception:
+                    return None
+    return _CACHE
+
+
+if __name__ == "__main__":
+    import sys
+    import json
+
+    cache = EvalCache()
+    if sys.argv[1:] == ["clear"]:
+        cache.clear()
+    print(json.dumps(cache.stats()))
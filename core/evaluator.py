@@ -1,11 +1,61 @@
 # core/evaluator.py
+import os
 import json
 import re
 import math
-from typing import List, Dict, Any
-
-# Keep the old parser available (for backward compatibility if needed)
-def safe_parse_json(s: str) -> Dict[str, Any]:
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import cached_property, lru_cache
+from typing import List, Dict, Any, Optional
+
+from core.embeddings import get_embedding_similarity
+from core.eval_cache import cache_key, get_eval_cache
+from core.idf_model import MODEL_DIR, get_idf_model
+from core.storage import BASE_DIR
+
+# "local" = hybrid keyword/similarity scoring only, "llm" = ask the evaluator model per answer
+EVALUATOR_MODE = os.getenv("EVALUATOR_MODE", "local").lower()
+LLM_GRADING_CONCURRENCY = int(os.getenv("EVALUATOR_LLM_CONCURRENCY", "4"))
+LLM_GRADING_TIMEOUT = float(os.getenv("EVALUATOR_LLM_TIMEOUT", "30"))  # seconds per call
+
+# Bump whenever scoring logic changes so cached and re-scored results are never mixed up
+EVALUATOR_VERSION = "hybrid-3"
+W_SIM = 0.6
+W_KW = 0.4
+MIN_ACCEPT_THRESHOLD = 0.15  # below this, treat as 0 relevance
+
+# Calibrated weights (python -m core.calibrate) replace the defaults above when present; a relative
+# EVALUATOR_WEIGHTS is taken from the project directory, like data/, not from wherever the app starts
+EVALUATOR_WEIGHTS_PATH = os.path.join(BASE_DIR, os.getenv("EVALUATOR_WEIGHTS", os.path.join(MODEL_DIR, "evaluator_weights.json")))
+WEIGHTS_FORMAT = 1
+WEIGHTS_VERSION = "default"
+
+
+def load_weights(path: str = EVALUATOR_WEIGHTS_PATH) -> Optional[Dict[str, Any]]:
+    """Read a calibrated weights file; None if it is missing, unreadable or of another format."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != WEIGHTS_FORMAT:
+            return None
+        return {
+            "version": str(data["version"]),
+            "w_sim": float(data["w_sim"]),
+            "w_kw": float(data["w_kw"]),
+            "threshold": float(data["threshold"]),
+        }
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        return None
+
+
+_weights = load_weights()
+if _weights is not None:
+    W_SIM, W_KW, MIN_ACCEPT_THRESHOLD = _weights["w_sim"], _weights["w_kw"], _weights["threshold"]
+    WEIGHTS_VERSION = _weights["version"]
+
+
+def _extract_json(s: str) -> Optional[Dict[str, Any]]:
     try:
         return json.loads(s)
     except Exception:
@@ -16,13 +66,23 @@ def safe_parse_json(s: str) -> Dict[str, Any]:
                 return json.loads(s[start : end + 1])
             except Exception:
                 pass
+        return None
+
+
+# Keep the old parser available (for backward compatibility if needed)
+def safe_parse_json(s: str) -> Dict[str, Any]:
+    parsed = _extract_json(s)
+    if parsed is None:
         return {"justification": s.strip()[:200], "score": 0}
+    return parsed
 
 
 # Try to import sklearn for TF-IDF + cosine similarity; if not available, use fallback
 try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
+    import numpy as np
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
     from sklearn.metrics.pairwise import cosine_similarity
+    from sklearn.preprocessing import normalize
 
     _SKLEARN_AVAILABLE = True
 except Exception:
@@ -37,16 +97,22 @@ _STOPWORDS = {
 }
 
 
+_TOKEN_RE = re.compile(r"[A-Za-z0-9#+\-.]+")
+_WORD_RE = re.compile(r"\w+")
+# sklearn's default TfidfVectorizer token pattern (applied to lowercased text)
+_TERM_RE = re.compile(r"(?u)\b\w\w+\b")
+_REPEAT_RE = re.compile(r"(.)\1{6,}")
+
+
 def _tokenize(text: str) -> List[str]:
     if not isinstance(text, str):
         return []
     # keep alphanumerics and '+' '#' '.' '-' as tokens if present
-    tokens = re.findall(r"[A-Za-z0-9#+\-.]+", text.lower())
+    tokens = _TOKEN_RE.findall(text.lower())
     return [t for t in tokens if t and t not in _STOPWORDS]
 
 
-def _extract_keywords(text: str, top_k: int = 6) -> List[str]:
-    tokens = _tokenize(text)
+def _keywords_from_tokens(tokens: List[str], top_k: int = 6) -> List[str]:
     if not tokens:
         return []
     # Frequency order
@@ -59,30 +125,105 @@ def _extract_keywords(text: str, top_k: int = 6) -> List[str]:
     return keywords
 
 
-def _keyword_overlap_score(question: str, answer: str) -> float:
-    keywords = _extract_keywords(question, top_k=6)
+def _extract_keywords(text: str, top_k: int = 6) -> List[str]:
+    return _keywords_from_tokens(_tokenize(text), top_k)
+
+
+@lru_cache(maxsize=4096)
+def _keyword_pattern(kw: str):
+    return re.compile(rf"\b{re.escape(kw)}\b")
+
+
+class AnalyzedText:
+    """
+    One question or answer, analyzed once and shared by every scoring stage.
+
+    Derived views are computed on first access, so an answer never pays for the question-only
+    keyword list and vice versa.
+    """
+
+    def __init__(self, text: str):
+        self.text = (text or "").strip()
+        self.lower = self.text.lower()
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        return [t for t in _TOKEN_RE.findall(self.lower) if t and t not in _STOPWORDS]
+
+    @cached_property
+    def token_set(self) -> set:
+        return set(self.tokens)
+
+    @cached_property
+    def alpha_ratio(self) -> float:
+        total_chars = len(self.text)
+        alpha_chars = sum(1 for c in self.text if c.isalpha())
+        return alpha_chars / total_chars if total_chars > 0 else 0.0
+
+    @cached_property
+    def keywords(self) -> List[str]:
+        return _keywords_from_tokens(self.tokens, top_k=6)
+
+    @cached_property
+    def words(self) -> set:
+        # maximal \w runs: an all-word keyword matches \bkw\b exactly when it is one of these
+        return set(_WORD_RE.findall(self.lower))
+
+    @cached_property
+    def terms(self) -> List[str]:
+        return _TERM_RE.findall(self.lower)
+
+    def contains_keyword(self, kw: str) -> bool:
+        if _WORD_RE.fullmatch(kw):
+            return kw in self.words
+        # keywords such as 'c++' or 'node.js' keep the original word-boundary semantics
+        return _keyword_pattern(kw).search(self.lower) is not None
+
+
+def analyze_text(text) -> AnalyzedText:
+    return text if isinstance(text, AnalyzedText) else AnalyzedText(text)
+
+
+def _terms_analyzer(doc) -> List[str]:
+    return doc.terms
+
+
+def _keyword_overlap_score(question, answer) -> float:
+    keywords = analyze_text(question).keywords
     if not keywords:
         return 0.0
-    ans_lower = (answer or "").lower()
+    ans = analyze_text(answer)
     found = 0
     for kw in keywords:
         # word boundary check
-        if re.search(rf"\b{re.escape(kw)}\b", ans_lower):
+        if ans.contains_keyword(kw):
             found += 1
     overlap = found / len(keywords)
     # return 0..1
     return max(0.0, min(1.0, overlap))
 
 
-def _semantic_similarity(question: str, answer: str) -> float:
-    q = (question or "").strip()
-    a = (answer or "").strip()
-    if not q or not a:
+def _semantic_similarity(question, answer) -> float:
+    q = analyze_text(question)
+    a = analyze_text(answer)
+    if not q.text or not a.text:
         return 0.0
+    # Sentence embeddings when enabled with EVALUATOR_SIMILARITY=embedding
+    backend = get_embedding_similarity()
+    if backend is not None:
+        try:
+            return backend.similarities([q.text], [a.text])[0]
+        except Exception:
+            pass
+    # A prebuilt corpus IDF model (python -m core.idf_model rebuild) takes precedence
+    model = get_idf_model()
+    if model is not None:
+        sim = model.similarity(q.terms, a.terms)
+        return _jaccard_similarity(q, a) if sim is None else sim
     # Prefer sklearn TF-IDF cosine similarity if present
     if _SKLEARN_AVAILABLE:
         try:
-            vec = TfidfVectorizer().fit([q, a])
+            vec = TfidfVectorizer(analyzer=_terms_analyzer).fit([q, a])
             mat = vec.transform([q, a])
             sim = float(cosine_similarity(mat[0], mat[1])[0][0])
             # safety
@@ -94,8 +235,12 @@ def _semantic_similarity(question: str, answer: str) -> float:
             pass
 
     # Fallback: token Jaccard similarity
-    q_tokens = set(_tokenize(q))
-    a_tokens = set(_tokenize(a))
+    return _jaccard_similarity(q, a)
+
+
+def _jaccard_similarity(question, answer) -> float:
+    q_tokens = analyze_text(question).token_set
+    a_tokens = analyze_text(answer).token_set
     if not q_tokens or not a_tokens:
         return 0.0
     inter = q_tokens & a_tokens
@@ -104,50 +249,259 @@ def _semantic_similarity(question: str, answer: str) -> float:
     return max(0.0, min(1.0, sim))
 
 
-def _is_gibberish(answer: str) -> (bool, str):
-    if not isinstance(answer, str):
+# IDF that a two-document TfidfVectorizer (smooth_idf=True) assigns to a term found in only one of them
+_PAIR_IDF_SINGLE = float(np.log(3 / 2) + 1) if _SKLEARN_AVAILABLE else 0.0
+
+
+def _batch_semantic_similarity(questions: List[Any], answers: List[Any]) -> List[float]:
+    """
+    Vectorized equivalent of calling _semantic_similarity on every (question, answer) pair.
+
+    All texts are counted in a single sparse pass over a shared vocabulary. Each pair still gets
+    the IDF its own two-document TfidfVectorizer would fit (1.0 for terms in both texts, ln(3/2)+1
+    for terms in only one), so the similarities match the per-pair path.
+    """
+    n = len(questions)
+    qs = [analyze_text(q) for q in questions]
+    as_ = [analyze_text(a) for a in answers]
+    backend = get_embedding_similarity()
+    if backend is not None:
+        try:
+            # the whole batch in one forward pass
+            return backend.similarities([q.text for q in qs], [a.text for a in as_])
+        except Exception:
+            pass
+    if get_idf_model() is not None:
+        # corpus IDF scoring is already a per-pair sparse dot product
+        return [_semantic_similarity(q, a) for q, a in zip(qs, as_)]
+    try:
+        counts = CountVectorizer(analyzer=_terms_analyzer).fit_transform(qs + as_).tocsr().astype(np.float64)
+    except ValueError:
+        # empty vocabulary across the whole batch
+        return [_semantic_similarity(q, a) for q, a in zip(qs, as_)]
+
+    q_counts, a_counts = counts[:n], counts[n:]
+    q_shared = q_counts.multiply(a_counts > 0).tocsr()
+    a_shared = a_counts.multiply(q_counts > 0).tocsr()
+    q_w = q_shared + (q_counts - q_shared) * _PAIR_IDF_SINGLE
+    a_w = a_shared + (a_counts - a_shared) * _PAIR_IDF_SINGLE
+    # TfidfVectorizer l2-normalizes on transform and cosine_similarity normalizes again
+    q_n = normalize(normalize(q_w))
+    a_n = normalize(normalize(a_w))
+    dots = np.asarray(q_n.multiply(a_n).sum(axis=1)).ravel()
+
+    q_nnz = np.diff(q_counts.indptr)
+    a_nnz = np.diff(a_counts.indptr)
+    sims: List[float] = []
+    for i in range(n):
+        if not qs[i].text or not as_[i].text:
+            sims.append(0.0)
+        elif q_nnz[i] == 0 and a_nnz[i] == 0:
+            # per-pair vectorizer would raise on an empty vocabulary and fall back to Jaccard
+            sims.append(_jaccard_similarity(qs[i], as_[i]))
+        else:
+            sim = float(dots[i])
+            sims.append(0.0 if math.isnan(sim) else max(0.0, min(1.0, sim)))
+    return sims
+
+
+def _is_gibberish(answer) -> (bool, str):
+    if not isinstance(answer, (str, AnalyzedText)):
         return True, "non-string answer"
-    a = answer.strip()
+    ans = analyze_text(answer)
+    a = ans.text
     if not a:
         return True, "empty answer"
 
     # too many repeated characters (e.g., 'aaaaa....')
-    if re.search(r"(.)\1{6,}", a):
+    if _REPEAT_RE.search(a):
         return True, "repeated character sequence"
 
     # compute alphabetic ratio
     total_chars = len(a)
-    alpha_chars = sum(1 for c in a if c.isalpha())
-    alpha_ratio = alpha_chars / total_chars if total_chars > 0 else 0.0
+    alpha_ratio = ans.alpha_ratio
 
     # if answer is long but contains very few letters -> gibberish
     if total_chars >= 15 and alpha_ratio < 0.25:
         return True, f"low alpha ratio ({alpha_ratio:.2f})"
 
     # if it's extremely short and contains no meaningful tokens, consider gibberish
-    tokens = _tokenize(a)
-    if total_chars < 6 and len(tokens) == 0:
+    if total_chars < 6 and len(ans.tokens) == 0:
         return True, "too short / no tokens"
 
     return False, ""
 
 
-def grade_qa_batch(evaluator_llm, eval_prompt, qa_list: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+def _score_result(q_text: str, a_text: str, kw_overlap: float, sim: float) -> Dict[str, Any]:
+    # Combine scores
+    combined = (W_SIM * sim) + (W_KW * kw_overlap)
+
+    # Threshold to filter near-random matches
+    if combined < MIN_ACCEPT_THRESHOLD:
+        score = 0.0
+        justification = (
+            f"Low relevance (combined={combined:.3f} < {MIN_ACCEPT_THRESHOLD}). "
+            f"Keyword overlap: {kw_overlap:.2f}, Similarity: {sim:.2f}."
+        )
+    else:
+        # Map to 0..10
+        score_raw = combined * 10.0
+        # final rounding to 2 decimals
+        score = round(max(0.0, min(10.0, score_raw)), 2)
+        justification = (
+            f"Keyword overlap: {kw_overlap:.2f}, Similarity: {sim:.2f}, "
+            f"Combined: {combined:.3f} => score {score:.2f}/10"
+        )
+
+    return {
+        "question": q_text,
+        "answer": a_text,
+        "justification": justification,
+        "score": score,
+    }
+
+
+def _error_result(item, exc: Exception) -> Dict[str, Any]:
+    # Fail-safe entry so we never break the pipeline
+    return {
+        "question": item.get("q", "") if isinstance(item, dict) else "",
+        "answer": item.get("a", "") if isinstance(item, dict) else str(item),
+        "justification": f"Evaluator error: {str(exc)[:200]}",
+        "score": 0.0,
+    }
+
+
+def _llm_grade_one(evaluator_llm, eval_prompt, q_text: str, a_text: str) -> Dict[str, Any]:
+    resp = evaluator_llm.invoke(eval_prompt.format(question=q_text, answer=a_text))
+    content = resp.content if hasattr(resp, "content") else str(resp)
+    parsed = _extract_json(content)
+    if not isinstance(parsed, dict) or "score" not in parsed:
+        raise ValueError("evaluator reply is not a JSON object with a score")
+    score = round(max(0.0, min(10.0, float(parsed["score"]))), 2)
+    return {
+        "question": q_text,
+        "answer": a_text,
+        "justification": f"LLM: {str(parsed.get('justification', '')).strip()[:500]}",
+        "score": score,
+    }
+
+
+def _llm_grade_concurrently(evaluator_llm, eval_prompt, pairs: List[tuple]) -> List[Any]:
+    """
+    Run one evaluator call per (question, answer) pair, at most LLM_GRADING_CONCURRENCY at a time.
+
+    Each call gets LLM_GRADING_TIMEOUT seconds once it has a model slot (time waiting in the
+    admission queue does not count); calls that fail, time out or never get a slot before the
+    overall deadline come back as the exception describing why. Calls still queued when the batch
+    gives up leave the admission queue instead of taking a model slot later.
+    """
+    from core.llm import abandon_calls, call_limits, llm_queue_position
+
+    out: List[Any] = [TimeoutError("LLM grading timed out")] * len(pairs)
+    if not pairs:
+        return out
+    workers = max(1, min(LLM_GRADING_CONCURRENCY, len(pairs)))
+    started: Dict[int, float] = {}
+    threads: Dict[int, int] = {}
+    overall_deadline = time.monotonic() + LLM_GRADING_TIMEOUT * math.ceil(len(pairs) / workers)
+    abandoned = threading.Event()
+
+    def call(i: int, q_text: str, a_text: str):
+        threads[i] = threading.get_ident()
+        started[i] = time.monotonic()
+        with call_limits(abandoned, max(0.0, overall_deadline - time.monotonic())):
+            return _llm_grade_one(evaluator_llm, eval_prompt, q_text, a_text)
+
+    # a private pool: a hung model only ever ties up this batch's threads
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-grading")
+    futures = {pool.submit(call, i, q, a): i for i, (q, a) in enumerate(pairs)}
+    pending = set(futures)
+    try:
+        while pending:
+            now = time.monotonic()
+            if now >= overall_deadline:
+                break
+            for f in pending:
+                i = futures[f]
+                if i in threads and llm_queue_position(threads[i]):
+                    started[i] = now  # still waiting for a model slot
+            deadlines = [started[futures[f]] + LLM_GRADING_TIMEOUT for f in pending if futures[f] in started]
+            wait_for = min(deadlines + [overall_deadline]) - now
+            done, pending = wait(pending, timeout=max(0.0, min(wait_for, 0.5)), return_when=FIRST_COMPLETED)
+            for f in done:
+                try:
+                    out[futures[f]] = f.result()
+                except Exception as exc:
+                    out[futures[f]] = exc
+            now = time.monotonic()
+            pending = {
+                f for f in pending
+                if futures[f] not in started or now - started[futures[f]] < LLM_GRADING_TIMEOUT
+            }
+    finally:
+        abandon_calls(abandoned)
+        pool.shutdown(wait=False, cancel_futures=True)
+    return out
+
+
+def answer_features(qa_list: List[Dict[str, str]]):
+    """
+    The inputs _score_result combines, for every item: an (N, 3) float array of keyword overlap,
+    similarity and a 1.0 gibberish flag (gibberish answers get 0 overlap / similarity).
+    """
+    if not _SKLEARN_AVAILABLE:
+        raise RuntimeError("answer_features needs numpy and scikit-learn")
+    feats = np.zeros((len(qa_list), 3), dtype=np.float64)
+    rows, qs, as_ = [], [], []
+    for i, item in enumerate(qa_list):
+        q_doc = AnalyzedText(item.get("q", "") if isinstance(item, dict) else "")
+        a_doc = AnalyzedText(item.get("a", "") if isinstance(item, dict) else str(item))
+        if _is_gibberish(a_doc)[0]:
+            feats[i, 2] = 1.0
+            continue
+        feats[i, 0] = _keyword_overlap_score(q_doc, a_doc)
+        rows.append(i)
+        qs.append(q_doc)
+        as_.append(a_doc)
+    if rows:
+        feats[rows, 1] = _batch_semantic_similarity(qs, as_)
+    return feats
+
+
+def grade_qa_batch(
+    evaluator_llm,
+    eval_prompt,
+    qa_list: List[Dict[str, str]],
+    batched: bool = True,
+    use_llm: Optional[bool] = None,
+    use_cache: bool = True,
+) -> List[Dict[str, Any]]:
     """
     Local hybrid evaluator — keeps the same signature to avoid breaking other modules.
 
     Algorithm (per QA):
       1. If empty / gibberish -> score = 0.
       2. Compute keyword overlap (0..1) between question and answer.
-      3. Compute semantic similarity (0..1) using TF-IDF cosine (sklearn) or Jaccard tokens fallback.
+      3. Compute semantic similarity (0..1) using sentence embeddings (EVALUATOR_SIMILARITY=embedding),
+         TF-IDF cosine (sklearn) or Jaccard tokens fallback.
       4. Combine: final = w_sim * sim + w_kw * overlap  (defaults: w_sim=0.6, w_kw=0.4)
       5. Map final (0..1) -> score (0..10). If final < threshold (0.15) -> score = 0 to avoid rewarding random text.
       6. justification contains details.
 
+    With batched=True (and sklearn available) step 3 runs once for the whole list as a single
+    sparse-matrix pass instead of fitting a vectorizer per pair; the results are the same.
+
+    With use_llm=True (default: EVALUATOR_MODE=llm) every non-gibberish answer is additionally
+    graded by evaluator_llm with eval_prompt, all calls in flight concurrently. Any call that
+    errors, times out or returns unparseable output keeps the local hybrid score for that item.
+
+    Results are looked up in / stored to the persistent evaluation cache (core.eval_cache) keyed
+    by question, answer and evaluator variant; only misses are scored. LLM fallbacks and evaluator
+    errors are never cached.
+
     Returns list of dicts:
       { "question": q, "answer": a, "justification": "...", "score": <0..10 float> }
     """
-    results: List[Dict[str, Any]] = []
     # Defensive: allow qa_list to be JSON string if passed accidentally
     if isinstance(qa_list, str):
         try:
@@ -155,68 +509,128 @@ def grade_qa_batch(evaluator_llm, eval_prompt, qa_list: List[Dict[str, str]]) ->
         except Exception:
             qa_list = []
 
+    if use_llm is None:
+        use_llm = EVALUATOR_MODE == "llm"
+    use_llm = bool(use_llm and evaluator_llm is not None and eval_prompt is not None)
+
+    cache = get_eval_cache() if use_cache else None
+    if cache is None:
+        return _grade_uncached(evaluator_llm, eval_prompt, qa_list, batched, use_llm)[0]
+
+    variant = evaluator_variant(evaluator_llm if use_llm else None)
+    keys: List[Optional[str]] = []
+    for item in qa_list:
+        if isinstance(item, dict) and isinstance(item.get("q") or "", str) and isinstance(item.get("a") or "", str):
+            keys.append(cache_key((item.get("q") or "").strip(), (item.get("a") or "").strip(), variant))
+        else:
+            keys.append(None)
+    try:
+        cached = cache.get_many([k for k in keys if k is not None])
+    except Exception:
+        cached = {}
+
+    results: List[Any] = [None] * len(qa_list)
+    misses: List[int] = []
+    for i, (item, key) in enumerate(zip(qa_list, keys)):
+        if key in cached:
+            score, justification = cached[key]
+            results[i] = {
+                "question": (item.get("q") or "").strip(),
+                "answer": (item.get("a") or "").strip(),
+                "justification": justification,
+                "score": score,
+            }
+        else:
+            misses.append(i)
+
+    if misses:
+        fresh, cacheable = _grade_uncached(evaluator_llm, eval_prompt, [qa_list[i] for i in misses], batched, use_llm)
+        to_store = {}
+        for i, r, ok in zip(misses, fresh, cacheable):
+            results[i] = r
+            if ok and keys[i] is not None:
+                to_store[keys[i]] = (r["score"], r["justification"])
+        try:
+            cache.put_many(to_store)
+        except Exception:
+            pass
+
+    return results
+
+
+def evaluator_variant(evaluator_llm=None) -> str:
+    """Everything besides the Q/A text that determines a result; part of every cache key."""
+    model = get_idf_model()
+    if get_embedding_similarity() is not None:
+        sim_backend = f"embedding:{get_embedding_similarity().model_name}"
+    elif model is not None:
+        sim_backend = f"corpus-idf:{model.meta.get('built_at')}"
+    else:
+        sim_backend = "pair-tfidf" if _SKLEARN_AVAILABLE else "jaccard"
+    llm = "off"
+    if evaluator_llm is not None:
+        llm = f"{getattr(evaluator_llm, 'model', type(evaluator_llm).__name__)}@{getattr(evaluator_llm, 'temperature', '')}"
+    return f"{EVALUATOR_VERSION}|w_sim={W_SIM}|w_kw={W_KW}|thr={MIN_ACCEPT_THRESHOLD}|sim={sim_backend}|llm={llm}"
+
+
+def _grade_uncached(evaluator_llm, eval_prompt, qa_list: List[Any], batched: bool, use_llm: bool):
+    """Score qa_list; returns (results, cacheable) where cacheable flags deterministic results."""
+    results: List[Any] = []
+    pending: List[tuple] = []  # (result index, q_doc, a_doc, kw_overlap) awaiting similarity
+    gradable: List[int] = []  # indices of answers that passed the gibberish gate
+    errored = set()
     for item in qa_list:
         try:
             q = item.get("q", "") if isinstance(item, dict) else ""
             a = item.get("a", "") if isinstance(item, dict) else str(item)
 
-            # basic normalization
-            q_text = (q or "").strip()
-            a_text = (a or "").strip()
+            # basic normalization; each text is analyzed once and shared by all stages below
+            q_doc = AnalyzedText(q)
+            a_doc = AnalyzedText(a)
+            q_text, a_text = q_doc.text, a_doc.text
 
             # gibberish / empty checks
-            is_gib, reason = _is_gibberish(a_text)
+            is_gib, reason = _is_gibberish(a_doc)
             if is_gib:
-                justification = f"Gibberish/invalid answer detected: {reason}"
-                score = 0.0
                 results.append({
                     "question": q_text,
                     "answer": a_text,
-                    "justification": justification,
-                    "score": score,
+                    "justification": f"Gibberish/invalid answer detected: {reason}",
+                    "score": 0.0,
                 })
                 continue
 
-            # keyword overlap and semantic similarity
-            kw_overlap = _keyword_overlap_score(q_text, a_text)  # 0..1
-            sim = _semantic_similarity(q_text, a_text)  # 0..1
-
-            # Combine scores
-            w_sim = 0.6
-            w_kw = 0.4
-            combined = (w_sim * sim) + (w_kw * kw_overlap)
-
-            # Threshold to filter near-random matches
-            MIN_ACCEPT_THRESHOLD = 0.15  # below this, treat as 0 relevance
-            if combined < MIN_ACCEPT_THRESHOLD:
-                score = 0.0
-                justification = (
-                    f"Low relevance (combined={combined:.3f} < {MIN_ACCEPT_THRESHOLD}). "
-                    f"Keyword overlap: {kw_overlap:.2f}, Similarity: {sim:.2f}."
-                )
+            kw_overlap = _keyword_overlap_score(q_doc, a_doc)  # 0..1
+            gradable.append(len(results))
+            if batched and _SKLEARN_AVAILABLE:
+                results.append(None)
+                pending.append((len(results) - 1, q_doc, a_doc, kw_overlap))
             else:
-                # Map to 0..10
-                score_raw = combined * 10.0
-                # final rounding to 2 decimals
-                score = round(max(0.0, min(10.0, score_raw)), 2)
-                justification = (
-                    f"Keyword overlap: {kw_overlap:.2f}, Similarity: {sim:.2f}, "
-                    f"Combined: {combined:.3f} => score {score:.2f}/10"
-                )
-
-            results.append({
-                "question": q_text,
-                "answer": a_text,
-                "justification": justification,
-                "score": score,
-            })
+                sim = _semantic_similarity(q_doc, a_doc)  # 0..1
+                results.append(_score_result(q_text, a_text, kw_overlap, sim))
         except Exception as exc:
-            # Fail-safe entry so we never break the pipeline
-            results.append({
-                "question": item.get("q", "") if isinstance(item, dict) else "",
-                "answer": item.get("a", "") if isinstance(item, dict) else str(item),
-                "justification": f"Evaluator error: {str(exc)[:200]}",
-                "score": 0.0,
-            })
+            results.append(_error_result(item, exc))
+            errored.add(len(results) - 1)
 
-    return results
+    if pending:
+        try:
+            sims = _batch_semantic_similarity([p[1] for p in pending], [p[2] for p in pending])
+        except Exception:
+            sims = [_semantic_similarity(q_doc, a_doc) for _, q_doc, a_doc, _ in pending]
+        for (idx, q_doc, a_doc, kw_overlap), sim in zip(pending, sims):
+            results[idx] = _score_result(q_doc.text, a_doc.text, kw_overlap, sim)
+
+    if use_llm:
+        # gibberish items keep their local 0 without spending a model call
+        graded = _llm_grade_concurrently(
+            evaluator_llm, eval_prompt, [(results[i]["question"], results[i]["answer"]) for i in gradable]
+        )
+        for i, g in zip(gradable, graded):
+            if isinstance(g, dict):
+                results[i] = g
+            else:
+                local = results[i]
+                results[i] = {**local, "justification": f"{local['justification']} (LLM fallback: {str(g)[:100] or type(g).__name__})"}
+                errored.add(i)
+
+    return results, [i not in errored for i in range(len(results))]
@@ -1,5 +1,42 @@
+import os
 import re
-from typing import List
+import json
+import time
+import secrets
+import threading
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Iterable, Iterator, List, MutableMapping, Optional, Set, Tuple, Union
+
+from core.evaluator import grade_qa_batch
+from core.ids import new_candidate_id
+from core.llm import abandon_calls, call_limits, get_evaluator_lm, get_interviewer_lm, llm_queue_position
+from core.prompts import build_eval_prompt, build_question_prompt
+from core.question_bank import QUESTION_BANK_FRESH_RATIO, get_question_bank, profile_key
+from core.question_index import FALLBACK_QUESTION, QUESTION_INDEX_FALLBACK_S, get_question_index, indexable
+from core.scoring import BackgroundScorer
+from core.session_store import SessionSync
+from core.storage import (
+    append_performance,
+    close_chat_history,
+    drop_checkpoint,
+    load_chat_history,
+    load_checkpoint,
+    save_chat_history,
+    save_checkpoint,
+    upsert_candidate,
+)
+from core.validators import is_nonempty_string, is_valid_email, parse_and_validate_tech_stack
+
+# Seconds the model gets to stream a question set before the rest comes from the fallback tiers
+QUESTION_DEADLINE_S = float(os.getenv("QUESTION_DEADLINE_S", "60"))
+# Hard limit for a generation that carries on after the deadline (its questions still feed the
+# bank and index); past it the completion is closed and its model slot released
+QUESTION_GENERATION_TIMEOUT_S = float(os.getenv("QUESTION_GENERATION_TIMEOUT_S", "120"))
+# "single": one completion for the whole tech stack; "per_tech": one concurrent completion per
+# tech, each asked for its share of the set, merged and deduplicated as they stream in
+QUESTION_GENERATION = os.getenv("QUESTION_GENERATION", "single").lower()
+# Where a question came from, best first
+QUESTION_TIERS = ("model", "bank", "index", "generic")
 
 # Add the missing BASIC_FIELDS constant
 BASIC_FIELDS = ["name", "email", "experience", "desired_position", "tech_stack"]
@@ -12,16 +49,20 @@ class Phase:
     SCORING = "scoring"
     THANK_YOU = "thankyou"
 
+def init_session_state(state: MutableMapping[str, Any]):
+    if "phase" not in state:
+        state["phase"] = Phase.GREET
+    state.setdefault("pending_field", None)
+    state.setdefault("candidate", {})
+    state.setdefault("questions", [])
+    state.setdefault("current_q", 0)
+    state.setdefault("answers", [])
+    state.setdefault("chat_history", [])
+    state.setdefault("scorer", None)
+
 def ensure_session_state():
     import streamlit as st
-    if "phase" not in st.session_state:
-        st.session_state.phase = Phase.GREET
-    st.session_state.setdefault("pending_field", None)
-    st.session_state.setdefault("candidate", {})
-    st.session_state.setdefault("questions", [])
-    st.session_state.setdefault("current_q", 0)
-    st.session_state.setdefault("answers", [])
-    st.session_state.setdefault("chat_history", [])
+    init_session_state(st.session_state)
 
 def next_basic_field(current_field: str | None):
     if current_field is None:
@@ -34,35 +75,788 @@ def next_basic_field(current_field: str | None):
         return None
     return BASIC_FIELDS[idx + 1]
 
+def _parse_question_line(line: str) -> Optional[str]:
+    # Accept formats like: "1. question", "1) question", "- question"
+    l = re.sub(r"^(?:\d+[\).]|[-*])\s*", "", line.strip())
+    return l if len(l) > 3 else None
+
 def parse_numbered_list(text: str) -> List[str]:
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
     out = []
-    for l in lines:
-        # Accept formats like: "1. question", "1) question", "- question"
-        l = re.sub(r"^(?:\d+[\).]|[-*])\s*", "", l)
-        if len(l) > 3:
-            out.append(l)
+    for l in text.splitlines():
+        q = _parse_question_line(l)
+        if q:
+            out.append(q)
     return out
 
-def prepare_questions(interviewer_llm, question_prompt_text: str, tech_list: List[str], total: int = 10) -> List[str]:
-    resp = interviewer_llm.invoke(question_prompt_text)
-    content = resp.content if hasattr(resp, "content") else str(resp)
-    all_qs = parse_numbered_list(content)
-    
-    # Ensure coverage across tech_list. If insufficient, synthesize per-tech ask.
-    qs: List[str] = []
-    per_tech = max(1, total // max(1, len(tech_list)))
-    
-    # First pass: take up to total questions from generated
-    for q in all_qs[: total]:
-        qs.append(q)
-    
-    # If not enough, top up per tech
-    i = 0
-    while len(qs) < total:
-        tech = tech_list[i % len(tech_list)]
-        qs.append(f"In {tech}, explain a concept or solve a small problem relevant to {tech} fundamentals.")
-        i += 1
-    
-    # Trim to exact total
-    return qs[: total]
\ No newline at end of file
+def iter_numbered_list(chunks: Iterable[str]) -> Iterator[str]:
+    """Incremental parse_numbered_list: yields each question as soon as its line is complete."""
+    buf = ""
+    for chunk in chunks:
+        buf += chunk
+        *lines, buf = buf.split("\n")
+        for l in lines:
+            q = _parse_question_line(l)
+            if q:
+                yield q
+    q = _parse_question_line(buf)
+    if q:
+        yield q
+
+def _dedup_key(question: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9#+]+", question.lower()))
+
+def per_tech_quotas(tech_list: List[str], total: int = 10) -> Dict[str, int]:
+    """How many of `total` questions each tech gets: an even share, the remainder to the first ones."""
+    techs = list(dict.fromkeys(tech_list))
+    per_tech = max(1, total // max(1, len(techs)))
+    extra = max(0, total - per_tech * len(techs))
+    return {tech: per_tech + (1 if i < extra else 0) for i, tech in enumerate(techs)}
+
+def _fallback_question(tech_list: List[str], i: int) -> str:
+    return FALLBACK_QUESTION.format(tech=tech_list[i % len(tech_list)])
+
+def _indexed_questions(tech_list: List[str], n: int, exclude: Iterable[str] = ()) -> List[str]:
+    # Real questions asked in earlier interviews for these techs, best-rated first
+    index = get_question_index()
+    if index is None or n <= 0:
+        return []
+    try:
+        return index.assemble(tech_list, n, exclude=exclude)
+    except Exception:
+        return []
+
+def _index_generated(questions: List[str], tech_list: List[str]):
+    index = get_question_index()
+    if index is not None and questions:
+        try:
+            index.add(questions, tech_list)
+        except Exception:
+            pass
+
+def record_question_results(tech_list: List[str], results: List[dict]):
+    """
+    Feed a finished interview's per-question scores into the question index's usage stats. Generic
+    fallback questions are left out (the question bank never stores them either), so they are not
+    served back later as index-tier questions.
+    """
+    index = get_question_index()
+    results = [r for r in results if indexable(r.get("question") or "", r.get("tier"))]
+    if index is not None and results:
+        try:
+            index.record(tech_list, [(r.get("question") or "", r.get("score")) for r in results])
+        except Exception:
+            pass
+
+class _TierStats:
+    """
+    Which tier completed each question set, how long the candidate waited for its first question
+    and how long until the whole set was available.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._first: Dict[str, List[float]] = {t: [] for t in QUESTION_TIERS}
+        self._full: Dict[str, List[float]] = {t: [] for t in QUESTION_TIERS}
+        self._counts: Dict[str, int] = {t: 0 for t in QUESTION_TIERS}
+
+    def record(self, tier: str, first_s: float, full_s: float):
+        with self._lock:
+            self._counts[tier] += 1
+            for samples, seconds in ((self._first[tier], first_s), (self._full[tier], full_s)):
+                samples.append(seconds)
+                del samples[:-1000]  # bounded window
+
+    @staticmethod
+    def _percentiles(samples: List[float]) -> Tuple[float, float]:
+        s = sorted(samples)
+        if not s:
+            return 0.0, 0.0
+        return s[len(s) // 2], s[min(len(s) - 1, int(len(s) * 0.99))]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        out = {}
+        with self._lock:
+            for tier in QUESTION_TIERS:
+                first_p50, first_p99 = self._percentiles(self._first[tier])
+                full_p50, full_p99 = self._percentiles(self._full[tier])
+                out[tier] = {
+                    "interviews": self._counts[tier],
+                    "first_p50_s": first_p50,
+                    "first_p99_s": first_p99,
+                    "full_p50_s": full_p50,
+                    "full_p99_s": full_p99,
+                }
+        return out
+
+
+_TIER_STATS = _TierStats()
+
+
+def question_tier_metrics() -> Dict[str, Dict[str, float]]:
+    return _TIER_STATS.summary()
+
+
+def prepare_questions(interviewer_llm, question_prompt_text: Union[str, Dict[str, str]], tech_list: List[str], total: int = 10,
+                      bank_key: str | None = None, deadline_s: Optional[float] = QUESTION_DEADLINE_S) -> List[str]:
+    """
+    The whole question set at once. Whatever the model has not produced within deadline_s is
+    filled from the fallback tiers (bank, index, generic), so this never waits on a hung model.
+    A {tech: prompt} dict generates per tech concurrently (see QuestionStream).
+    """
+    questions = stream_questions(interviewer_llm, question_prompt_text, tech_list, total, bank_key, deadline_s)
+    return questions if isinstance(questions, list) else questions.result()
+
+
+class QuestionStream:
+    """
+    Question list that fills in while the interviewer model is still generating.
+
+    A background thread consumes interviewer_llm.stream() and parses numbered lines as they
+    complete. Indexing blocks only until that question exists, so "Question 1/10" can be shown
+    after the first line instead of the full completion. len() is always `total`: cached bank
+    questions fill the non-fresh share, and indexed questions from earlier interviews (then
+    generic per-tech ones) top up whatever the model did not produce.
+
+    With a {tech: prompt} dict instead of one prompt, every tech gets its own completion, all
+    running at once; duplicates across them are dropped and the next question is taken from the
+    tech that has had the fewest so far, so coverage stays even whichever finishes first.
+
+    Waiting for the model ends at deadline_s after the start (or on fall_back()). Questions
+    streamed by then are kept; every later slot is filled right away from the next tier that has
+    one. `tier` is the lowest tier the set needed (QUESTION_TIERS order). A completion still
+    waiting for a model slot at that point is withdrawn from the admission queue; one already
+    running may finish (for the bank and index) within QUESTION_GENERATION_TIMEOUT_S.
+    """
+
+    def __init__(self, interviewer_llm, question_prompt_text: Union[str, Dict[str, str]], tech_list: List[str], total: int = 10,
+                 cached: Optional[List[str]] = None, n_fresh: Optional[int] = None, bank=None, bank_key: str | None = None,
+                 deadline_s: Optional[float] = QUESTION_DEADLINE_S):
+        self.total = total
+        self.tech_list = tech_list
+        self._llm = interviewer_llm
+        if isinstance(question_prompt_text, dict):
+            self._parts = [([tech], prompt) for tech, prompt in question_prompt_text.items()]
+        else:
+            self._parts = [(tech_list, question_prompt_text)]
+        self._cached = list(cached or [])
+        self._n_fresh = total if n_fresh is None else n_fresh
+        self._bank = bank
+        self._bank_key = bank_key
+        self._fresh: List[str] = []  # every distinct generated question, in arrival order
+        self._pending: List[Tuple[int, str]] = []  # (part, question) not placed yet
+        self._placed = [0] * len(self._parts)
+        self._seen: Set[str] = set()
+        self._running = len(self._parts)
+        self._served: List[str] = []
+        self._sources: List[str] = []  # tier of each served question
+        self._ready: List[float] = []  # seconds after the start at which each served question was available
+        self._arrived: Dict[str, float] = {}  # same, for every generated question
+        self._settled: Optional[float] = None  # when waiting for the model ended
+        self._indexed: Optional[List[str]] = None
+        self._topups = 0
+        self._started = time.monotonic()
+        self._deadline = self._started + deadline_s if deadline_s else None
+        self._cut = False  # no longer waiting for the model
+        self._abandoned = threading.Event()
+        self.first_latency: Optional[float] = None
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+        self._threads = [
+            threading.Thread(target=self._run, args=(i,), name=f"question-stream-{i}", daemon=True)
+            for i in range(len(self._parts))
+        ]
+        for t in self._threads:
+            t.start()
+
+    def _chunks(self, prompt: str) -> Iterator[str]:
+        if hasattr(self._llm, "stream"):
+            for chunk in self._llm.stream(prompt):
+                yield chunk.content if hasattr(chunk, "content") else str(chunk)
+        else:
+            resp = self._llm.invoke(prompt)
+            yield resp.content if hasattr(resp, "content") else str(resp)
+
+    def _run(self, part: int):
+        techs, prompt = self._parts[part]
+        generated: List[str] = []
+        try:
+            with call_limits(self._abandoned, QUESTION_GENERATION_TIMEOUT_S):
+                for q in iter_numbered_list(self._chunks(prompt)):
+                    key = _dedup_key(q)
+                    with self._cond:
+                        if key in self._seen:
+                            continue
+                        self._seen.add(key)
+                        self._fresh.append(q)
+                        self._arrived[q] = time.monotonic() - self._started
+                        self._pending.append((part, q))
+                        self._cond.notify_all()
+                    generated.append(q)
+        except Exception as exc:
+            self.error = self.error or exc
+        finally:
+            with self._cond:
+                self._running -= 1
+                last = self._running == 0
+                if last:
+                    self.done = True
+                    self._settle()
+                self._cond.notify_all()
+            # questions that arrive after the deadline still go to the bank and index
+            _index_generated(generated, techs)
+            if last and self._bank is not None and self._fresh:
+                try:
+                    self._bank.add(self._bank_key, list(self._fresh))
+                except Exception:
+                    pass
+
+    def _waiting_for_model(self) -> bool:
+        if self.done or self._cut:
+            return False
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            self._stop_waiting()
+            return False
+        return True
+
+    def _stop_waiting(self):
+        self._cut = True
+        self._settle()
+        abandon_calls(self._abandoned)
+
+    def _settle(self):
+        if self._settled is None:
+            self._settled = time.monotonic() - self._started
+
+    def _next_fresh(self, timeout: Optional[float]) -> Optional[str]:
+        if not self._pending and self._waiting_for_model():
+            if self._deadline is not None:
+                left = max(0.0, self._deadline - time.monotonic())
+                timeout = left if timeout is None else min(timeout, left)
+            self._cond.wait_for(lambda: self._pending or self.done, timeout)
+        if not self._pending:
+            return None
+        # earliest question of the least-covered part
+        i = min(range(len(self._pending)), key=lambda k: self._placed[self._pending[k][0]])
+        part, q = self._pending.pop(i)
+        self._placed[part] += 1
+        return q
+
+    def _place_next(self, timeout: Optional[float]) -> bool:
+        q, source = None, "model"
+        while q is None and len(self._served) < self._n_fresh:
+            q = self._next_fresh(timeout)
+            if q is None:
+                if self._waiting_for_model():
+                    return False
+                break
+            if q in self._served:
+                q = None  # the bank already filled a slot with it while the model was slow
+        while q is None and self._cached:
+            c = self._cached.pop(0)
+            if c not in self._served and c not in self._fresh:
+                q, source = c, "bank"
+        while q is None:
+            q, source = self._next_fresh(timeout), "model"
+            if q is None and self._waiting_for_model():
+                return False
+            if q is None:
+                q, source = self._top_up()
+            elif q in self._served:
+                q = None
+        self._served.append(q)
+        self._sources.append(source)
+        # bank questions are there from the start, fallback ones once the model is no longer awaited
+        if source == "model":
+            self._ready.append(self._arrived.get(q, 0.0))
+        else:
+            self._ready.append(0.0 if source == "bank" else self._settled or 0.0)
+        if len(self._served) == 1:
+            self.first_latency = time.monotonic() - self._started
+        if len(self._served) == self.total:
+            _TIER_STATS.record(self.tier, self.first_latency, max(self._ready))
+        return True
+
+    def _top_up(self):
+        if self._indexed is None:
+            self._indexed = _indexed_questions(self.tech_list, self.total, exclude=self._served + self._fresh)
+        while self._indexed:
+            q = self._indexed.pop(0)
+            if q not in self._served:
+                return q, "index"
+        q = _fallback_question(self.tech_list, self._topups)
+        self._topups += 1
+        return q, "generic"
+
+    def sources(self) -> List[str]:
+        """The tier each question placed so far was served from, in order."""
+        with self._cond:
+            return list(self._sources)
+
+    @property
+    def tier(self) -> Optional[str]:
+        return max(self._sources, key=QUESTION_TIERS.index) if self._sources else None
+
+    def fall_back(self):
+        """
+        Stop waiting for the model now instead of at the deadline (it keeps generating for the
+        bank and index); questions not shown yet come from what it has streamed, then the fallback tiers.
+        """
+        with self._cond:
+            self._stop_waiting()
+
+    def get(self, idx: int, timeout: Optional[float] = None) -> str:
+        if not 0 <= idx < self.total:
+            raise IndexError(idx)
+        with self._cond:
+            while len(self._served) <= idx:
+                if not self._place_next(timeout):
+                    raise TimeoutError(f"question {idx + 1} not generated yet")
+            return self._served[idx]
+
+    def snapshot(self) -> List[str]:
+        """The questions that can be fixed in order right now, without waiting for the model."""
+        with self._cond:
+            while len(self._served) < self.total and self._place_next(0):
+                pass
+            return list(self._served)
+
+    def queue_position(self) -> int:
+        """Place in the model admission queue while generation has not been let through yet (else 0)."""
+        if self.done:
+            return 0
+        # the candidate only waits in line while none of the completions has been admitted
+        positions = [llm_queue_position(t.ident) for t in self._threads]
+        return min(positions) if all(positions) else 0
+
+    def result(self, timeout: Optional[float] = None) -> List[str]:
+        return [self.get(i, timeout) for i in range(self.total)]
+
+    def __getitem__(self, idx: int) -> str:
+        return self.get(idx)
+
+    def __len__(self) -> int:
+        return self.total
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.get(i) for i in range(self.total))
+
+
+def stream_questions(interviewer_llm, question_prompt_text: Union[str, Dict[str, str]], tech_list: List[str], total: int = 10,
+                     bank_key: str | None = None, deadline_s: Optional[float] = QUESTION_DEADLINE_S):
+    """
+    Streaming counterpart of prepare_questions. Returns a plain list when the question bank can
+    serve the whole set, otherwise a QuestionStream that is already generating in the background.
+    """
+    started = time.monotonic()
+    bank = get_question_bank() if bank_key else None
+    cached: List[str] = []
+    n_fresh = total
+    if bank is not None:
+        n_fresh = min(total, int(round(total * QUESTION_BANK_FRESH_RATIO)))
+        cached = bank.sample(bank_key, total)
+        if n_fresh == 0 and len(cached) >= total:
+            elapsed = time.monotonic() - started
+            _TIER_STATS.record("bank", elapsed, elapsed)
+            return cached[:total]
+    return QuestionStream(interviewer_llm, question_prompt_text, tech_list, total,
+                          cached=cached, n_fresh=n_fresh, bank=bank, bank_key=bank_key, deadline_s=deadline_s)
+
+
+GREETING_RE = re.compile(r"\b(hi|hii|hie|hello|hey|howdy|yo)\b")
+
+FIELD_PROMPTS = {
+    "email": "Great, now your **email**?",
+    "experience": "Thanks! What's your **work experience** (e.g., '3 years')?",
+    "desired_position": "Which **position** are you aiming for?",
+    "tech_stack": "Finally, list your **tech stack** (comma-separated).",
+}
+
+
+def validate_field(field: str, value: str):
+    """(ok, error message, parsed tech list) for one basic-info answer."""
+    if field == "name":
+        if is_nonempty_string(value) and len(value.split()) >= 2:
+            return True, None, None
+        return False, "Please provide your **full name** (first and last).", None
+    if field == "email":
+        if is_valid_email(value):
+            return True, None, None
+        return False, "Please provide a **valid email** (e.g., name@gmail.com).", None
+    if field == "experience":
+        if is_nonempty_string(value):
+            return True, None, None
+        return False, "Please specify your **experience** (e.g., '3 years').", None
+    if field == "desired_position":
+        if is_nonempty_string(value):
+            return True, None, None
+        return False, "Please provide the **desired position** (e.g., 'Backend Developer').", None
+    if field == "tech_stack":
+        tech_list, tech_err = parse_and_validate_tech_stack(value)
+        if tech_err is None and len(tech_list) > 0:
+            return True, None, tech_list
+        return False, tech_err or "Please provide a comma-separated **tech stack** (e.g., 'Python, Django, REST').", None
+    return False, "Unexpected input.", None
+
+
+class InterviewSession:
+    """
+    The interview state machine (greeting, basic details, questions, scoring) without any UI.
+
+    All state lives in the `state` mapping under the keys init_session_state sets up, so the
+    Streamlit app passes st.session_state and other front-ends a plain dict. handle() takes one
+    candidate message and returns the assistant messages it produced; `emit` is called with each
+    one as soon as it exists and `progress(label)` wraps the slow steps (e.g. st.spinner).
+    `queued(position)` is called while question generation waits for a model slot, with the
+    candidate's place in line (0 once generation has started).
+
+    With a session store (core.session_store) and a session_id, a state that has never been
+    initialized is first loaded from the store, and every turn writes its changes back, so the
+    next turn can be handled by another process.
+
+    Independently of that, every interview turn checkpoints the questions, the current question
+    and the answers under a random resume token (not the candidate id, which is no secret);
+    resume() continues from there after a page refresh or a worker restart without generating
+    the questions again.
+    """
+
+    def __init__(self, state: Optional[MutableMapping[str, Any]] = None, total: int = 10,
+                 interviewer_llm=None, evaluator_llm=None, store=None, session_id: str | None = None):
+        self.state = {} if state is None else state
+        self.total = total
+        self._interviewer_llm = interviewer_llm
+        self._evaluator_llm = evaluator_llm
+        self._sync: Optional[SessionSync] = None
+        self.restored = False  # state was loaded from the store
+        if store is not None and session_id:
+            sync = self.state.get("_session_sync")
+            if sync is None or sync.session_id != session_id:
+                sync = self.state["_session_sync"] = SessionSync(store, session_id)
+                if "phase" not in self.state:
+                    self.restored = sync.load(self.state)
+                self._sync = sync
+            else:
+                self._sync = sync
+                self.refresh()
+        init_session_state(self.state)
+
+    def refresh(self) -> bool:
+        """Reload the state if another replica has handled a turn since; True if it did."""
+        if self._sync is None or not self._sync.stale():
+            return False
+        return self._sync.load(self.state)
+
+    def _commit(self):
+        if self._sync is not None:
+            self._track_sources()
+            self._sync.commit(self.state)
+
+    def _track_sources(self):
+        # a stream keeps the tier of each question itself; the stored copy is a plain list
+        questions = self.state.get("questions")
+        if isinstance(questions, QuestionStream):
+            questions.snapshot()
+            self.state["question_sources"] = questions.sources()
+
+    @property
+    def phase(self) -> str:
+        return self.state["phase"]
+
+    @property
+    def accepts_input(self) -> bool:
+        return self.phase not in (Phase.SCORING, Phase.THANK_YOU)
+
+    def start(self) -> bool:
+        """Leave the GREET phase (the front-end shows its welcome); True the first time only."""
+        if self.phase != Phase.GREET:
+            return False
+        self.state["phase"] = Phase.WAIT_GREETING
+        self._commit()
+        return True
+
+    def handle(self, text: str, emit: Optional[Callable[[str], Any]] = None,
+               progress: Optional[Callable[[str], Any]] = None,
+               queued: Optional[Callable[[int], Any]] = None) -> List[str]:
+        self.refresh()
+        if not self.accepts_input or not (text or "").strip():
+            return []
+        out: List[str] = []
+
+        def say(msg: str):
+            self.state["chat_history"].append(("assistant", msg))
+            out.append(msg)
+            if emit is not None:
+                emit(msg)
+
+        self._progress = progress or (lambda label: nullcontext())
+        self._queued = queued
+        self.state["chat_history"].append(("user", text))
+        if self.phase == Phase.GREET:
+            self.start()
+        if self.phase == Phase.WAIT_GREETING:
+            self._on_greeting(text, say)
+        elif self.phase == Phase.COLLECT_INFO:
+            self._on_field(text.strip(), say)
+        elif self.phase == Phase.INTERVIEW:
+            self._on_answer(text, say)
+
+        if self.state["candidate"].get("id"):
+            save_chat_history(self.state["candidate"]["id"], self.state["chat_history"])
+        if self.phase == Phase.INTERVIEW:
+            self._checkpoint()
+        self._commit()
+        return out
+
+    def _checkpoint(self):
+        questions = self.state["questions"]
+        self._track_sources()
+        save_checkpoint(self.state["resume_token"], {
+            "resume_token": self.state["resume_token"],
+            "candidate": self.state["candidate"],
+            "questions": questions if isinstance(questions, list) else questions.snapshot(),
+            "question_sources": self.state.get("question_sources") or [],
+            "question_tier": self._questions_tier(),
+            "current_q": self.state["current_q"],
+            "answers": self.state["answers"],
+        })
+
+    def resume(self, resume_token: str) -> bool:
+        """
+        Continue the unfinished interview `resume_token` was issued for, at the question it stopped
+        on, with the questions it was given (no model call). False if there is no checkpoint to resume.
+        """
+        checkpoint = load_checkpoint(resume_token)
+        if checkpoint is None or self.phase in (Phase.SCORING, Phase.THANK_YOU):
+            return False
+        # checkpoints written before resume tokens are named by candidate id: those never resume
+        if not secrets.compare_digest(str(checkpoint.get("resume_token") or ""), resume_token):
+            return False
+        self.close()
+        candidate_id = checkpoint["candidate"]["id"]
+        self.state["resume_token"] = resume_token
+        self.state["candidate"] = checkpoint["candidate"]
+        self.state["questions"] = checkpoint["questions"]
+        self.state["question_sources"] = checkpoint.get("question_sources") or []
+        self.state["question_tier"] = checkpoint.get("question_tier")
+        self.state["current_q"] = checkpoint["current_q"]
+        self.state["answers"] = checkpoint["answers"]
+        self.state["chat_history"] = load_chat_history(candidate_id)
+        self.state["pending_field"] = None
+        self.state["phase"] = Phase.INTERVIEW
+        # answers given before the interruption are graded again in the background
+        scorer = BackgroundScorer(self._evaluator_llm or get_evaluator_lm(), build_eval_prompt())
+        for answer in self.state["answers"]:
+            scorer.submit(answer)
+        self.state["scorer"] = scorer
+
+        idx = self.state["current_q"]
+        self.state["chat_history"].append(
+            ("assistant", f"Welcome back! Let's continue.\n\nQuestion {idx + 1}/{self.total}: {self._question(idx)}")
+        )
+        save_chat_history(candidate_id, self.state["chat_history"])
+        self._commit()
+        return True
+
+    def _on_greeting(self, text: str, say):
+        if GREETING_RE.search(text.strip().lower()):
+            say("Great! Let's capture your basic details one by one. First, **what's your full name?**")
+            self.state["phase"] = Phase.COLLECT_INFO
+            self.state["pending_field"] = "name"
+        else:
+            say("Please greet to begin — try saying **hello** 👋")
+
+    def _on_field(self, value: str, say):
+        field = self.state["pending_field"]
+        ok, err, tech_list = validate_field(field, value)
+        if not ok:
+            say(err)
+            return
+        candidate = self.state["candidate"]
+        if tech_list is not None:
+            candidate["tech_list"] = tech_list
+        candidate[field] = value
+        nxt = next_basic_field(field)
+        if nxt is not None:
+            self.state["pending_field"] = nxt
+            say(FIELD_PROMPTS[nxt])
+            return
+        candidate["id"] = candidate.get("id") or new_candidate_id()
+        upsert_candidate(candidate)
+        self._start_interview(say)
+
+    def _start_interview(self, say):
+        candidate = self.state["candidate"]
+        interviewer = self._interviewer_llm or get_interviewer_lm()
+        q_prompt = self._question_prompt(candidate)
+        # Questions stream in: only the first one is awaited here, the rest keep
+        # generating in the background while the candidate answers.
+        with self._progress("Generating interview questions… ⏳"):
+            questions = stream_questions(
+                interviewer,
+                q_prompt,
+                candidate["tech_list"],
+                total=self.total,
+                bank_key=profile_key(candidate["tech_list"], candidate["desired_position"], candidate["experience"]),
+            )
+            first_question = self._first_question(questions)
+
+        self.state["questions"] = questions
+        # a plain list is a set served whole from the bank
+        self.state["question_tier"] = None if isinstance(questions, QuestionStream) else "bank"
+        self.state["question_sources"] = []
+        self.state["resume_token"] = secrets.token_urlsafe(24)
+        if self.state.get("scorer") is not None:
+            self.state["scorer"].cancel()
+        self.state["scorer"] = BackgroundScorer(self._evaluator_llm or get_evaluator_lm(), build_eval_prompt())
+        self.state["phase"] = Phase.INTERVIEW
+        self.state["current_q"] = 0
+        say("Thanks! Your details are recorded. Let's begin the interview.")
+        say(f"Question 1/{self.total}: {first_question}")
+
+    def _question_prompt(self, candidate: Dict[str, Any]) -> Union[str, Dict[str, str]]:
+        def prompt(tech_stack: str, count: int | None = None) -> str:
+            return build_question_prompt(
+                candidate_name=candidate["name"],
+                contact_info=candidate["email"],
+                experience=candidate["experience"],
+                desired_position=candidate["desired_position"],
+                tech_stack=tech_stack,
+                count=count,
+            )
+
+        quotas = per_tech_quotas(candidate["tech_list"], self.total)
+        if QUESTION_GENERATION == "per_tech" and len(quotas) > 1:
+            # one spare each, so questions dropped as cross-tech duplicates rarely need a fallback
+            return {tech: prompt(tech, n + 1) for tech, n in quotas.items()}
+        return prompt(candidate["tech_stack"])
+
+    def _first_question(self, questions) -> str:
+        if not isinstance(questions, QuestionStream):
+            return questions[0]
+        deadline = time.monotonic() + QUESTION_INDEX_FALLBACK_S
+        shown = None
+        while True:
+            try:
+                return questions.get(0, timeout=min(0.5, max(0.0, deadline - time.monotonic())))
+            except TimeoutError:
+                if time.monotonic() >= deadline:
+                    # model is slow (or busy with other candidates): start from the fallback tiers
+                    questions.fall_back()
+                    return questions[0]
+            position = questions.queue_position()
+            if self._queued is not None and position != shown:
+                self._queued(position)
+                shown = position
+
+    def _question(self, idx: int) -> str:
+        questions = self.state["questions"]
+        if idx >= len(questions):
+            # a set restored from the session store holds only the questions asked before
+            tech_list = self.state["candidate"]["tech_list"]
+            sources = self.state.setdefault("question_sources", [])
+            sources.extend([self.state.get("question_tier")] * (len(questions) - len(sources)))
+            for q in _indexed_questions(tech_list, self.total - len(questions), exclude=questions):
+                questions.append(q)
+                sources.append("index")
+            while len(questions) <= idx:
+                questions.append(_fallback_question(tech_list, len(questions)))
+                sources.append("generic")
+        return questions[idx]
+
+    def _questions_tier(self) -> Optional[str]:
+        # the lowest tier the set needed; a restored list knows it from its sources and the stored tier
+        questions = self.state["questions"]
+        if isinstance(questions, QuestionStream):
+            return questions.tier
+        tiers = [t for t in (self.state.get("question_sources") or []) + [self.state.get("question_tier")] if t]
+        return max(tiers, key=QUESTION_TIERS.index) if tiers else None
+
+    def _question_source(self, idx: int) -> Optional[str]:
+        questions = self.state["questions"]
+        sources = questions.sources() if isinstance(questions, QuestionStream) else self.state.get("question_sources") or []
+        return sources[idx] if idx < len(sources) else self.state.get("question_tier")
+
+    def _on_answer(self, text: str, say):
+        idx = self.state["current_q"]
+        self.state["answers"].append({"q": self._question(idx), "a": text, "tier": self._question_source(idx)})
+        # start grading this answer now so SCORING only has to collect results
+        if self.state.get("scorer") is not None:
+            self.state["scorer"].submit(self.state["answers"][-1])
+
+        if idx < self.total - 1:
+            self.state["current_q"] = idx + 1
+            say(f"Question {idx + 2}/{self.total}: {self._question(idx + 1)}")
+            return
+
+        say("Thanks for completing all questions. Evaluating your responses… ⏳")
+        # Save chat history before starting evaluation
+        save_chat_history(self.state["candidate"]["id"], self.state["chat_history"])
+        self.state["phase"] = Phase.SCORING
+        with self._progress("Scoring your answers…"):
+            self._score()
+        self.state["phase"] = Phase.THANK_YOU
+
+    def _score(self):
+        candidate = self.state["candidate"]
+        answers = self.state["answers"]
+        if self.state.get("scorer") is not None:
+            results = self.state["scorer"].collect(answers)
+        else:
+            results = grade_qa_batch(self._evaluator_llm or get_evaluator_lm(), build_eval_prompt(), answers)
+        results = [{**r, "tier": a.get("tier")} for r, a in zip(results, answers)]
+
+        total_score = max(0, min(100, int(round(sum(r.get("score", 0) for r in results)))))
+        record_question_results(candidate["tech_list"], results)
+        self.state["performance"] = {
+            "total": total_score,
+            "breakdown": results,
+            "question_tier": self._questions_tier(),
+        }
+
+        # queued off the request path; front-ends wait for this one write before confirming
+        self.state["performance_write"] = append_performance(
+            candidate_id=candidate["id"],
+            name=candidate["name"],
+            email=candidate["email"],
+            role=candidate["desired_position"],
+            tech_stack=candidate["tech_stack"],
+            score=total_score,
+            breakdown_json=json.dumps(results, ensure_ascii=False),
+        )
+        save_chat_history(candidate["id"], self.state["chat_history"])
+        close_chat_history(candidate["id"])
+        if self.state.get("resume_token"):
+            drop_checkpoint(self.state["resume_token"])
+
+    def close(self):
+        """Stop background grading of an interview that is abandoned mid-way."""
+        if self.state.get("scorer") is not None:
+            self.state["scorer"].cancel()
+
+    def reset(self):
+        """Abandon this interview (see close()) and clear the state for a new one, unbound from any store."""
+        self.close()
+        self.state.clear()
+        self._sync = None
+        self.restored = False
+        init_session_state(self.state)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly view of where the interview stands."""
+        out: Dict[str, Any] = {
+            "phase": self.phase,
+            "pending_field": self.state.get("pending_field"),
+            "current_q": self.state.get("current_q", 0),
+            "total": self.total,
+            "accepts_input": self.accepts_input,
+            "candidate_id": self.state["candidate"].get("id"),
+            "resume_token": self.state.get("resume_token") if self.phase == Phase.INTERVIEW else None,
+        }
+        perf = self.state.get("performance")
+        if perf is not None:
+            out["performance"] = {
+                "total": perf["total"],
+                "scores": [r.get("score", 0) for r in perf["breakdown"]],
+                "question_tier": perf.get("question_tier"),
+            }
+        return out
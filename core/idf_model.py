@@ -0,0 +1,217 @@
+# core/idf_model.py
+"""
+Corpus-level IDF model for the evaluator's semantic similarity.
+
+The model is built offline from the stored interview transcripts (every question and every
+answer is one document) and saved as a frozen vocabulary plus an IDF weight array. At runtime it
+is loaded once (weights memory-mapped) so scoring an answer is a sparse dot product.
+
+    python -m core.idf_model rebuild   # (re)build from data/interviews/
+    python -m core.idf_model check     # exit code 1 if missing, incompatible or stale
+"""
+import os
+import re
+import json
+import math
+import hashlib
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import numpy as np
+
+    _NUMPY_AVAILABLE = True
+except Exception:
+    _NUMPY_AVAILABLE = False
+
+from core.storage import DATA_DIR, INTERVIEWS_DIR, iter_chat_histories, transcript_paths
+
+MODEL_DIR = os.path.join(DATA_DIR, "models")
+META_PATH = os.path.join(MODEL_DIR, "idf_meta.json")
+WEIGHTS_PATH = os.path.join(MODEL_DIR, "idf_weights.npy")
+
+# Bump when tokenization or weighting changes; older artifacts are then refused at load time.
+FORMAT_VERSION = 1
+# Same token pattern as sklearn's TfidfVectorizer default, applied to lowercased text
+TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+_TOKEN_RE = re.compile(TOKEN_PATTERN)
+
+_QUESTION_RE = re.compile(r"^Question \d+/\d+:\s*(.+)$", re.S)
+
+
+def analyze(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def corpus_fingerprint(interviews_dir: str = INTERVIEWS_DIR) -> str:
+    h = hashlib.sha1()
+    for path in transcript_paths(interviews_dir):
+        st = os.stat(path)
+        h.update(f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+def iter_corpus_documents(interviews_dir: str = INTERVIEWS_DIR) -> Iterator[str]:
+    """Yield every interview question and candidate answer found in the stored transcripts."""
+    for _, history in iter_chat_histories(interviews_dir):
+        asked = False
+        for role, content in history:
+            content = content or ""
+            if role == "assistant":
+                m = _QUESTION_RE.match(content.strip())
+                asked = m is not None
+                if m:
+                    yield m.group(1)
+            elif role == "user" and asked:
+                # only answers to interview questions, not greetings / personal details
+                yield content
+                asked = False
+
+
+def iter_transcript_qa(history: List[tuple]) -> Iterator[tuple]:
+    """Yield (question, answer) for every interview question in a transcript that got an answer."""
+    question = None
+    for role, content in history:
+        content = content or ""
+        if role == "assistant":
+            m = _QUESTION_RE.match(content.strip())
+            question = m.group(1) if m else None
+        elif role == "user" and question is not None:
+            yield question, content
+            question = None
+
+
+class IdfModel:
+    def __init__(self, vocabulary: Dict[str, int], idf, n_docs: int, meta: Dict):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.n_docs = n_docs
+        self.meta = meta
+        # smoothed IDF of a term never seen in the corpus (df = 0)
+        self.oov_idf = math.log((1 + n_docs) / 1) + 1
+
+    def _weights(self, text) -> Dict[Any, float]:
+        terms = analyze(text) if isinstance(text, str) or text is None else text
+        weights: Dict[Any, float] = {}
+        for term, tf in Counter(terms).items():
+            idx = self.vocabulary.get(term)
+            # out-of-vocabulary terms keep their own key so they can still match each other
+            weights[term if idx is None else idx] = tf * (self.oov_idf if idx is None else float(self.idf[idx]))
+        return weights
+
+    def similarity(self, question: str, answer: str) -> Optional[float]:
+        """
+        Cosine similarity of two texts (raw strings or already-analyzed term lists).
+        Returns None if neither contains a single term.
+        """
+        q_w = self._weights(question)
+        a_w = self._weights(answer)
+        if not q_w and not a_w:
+            return None
+        if not q_w or not a_w:
+            return 0.0
+        if len(q_w) > len(a_w):
+            q_w, a_w = a_w, q_w
+        dot = sum(w * a_w[k] for k, w in q_w.items() if k in a_w)
+        norm = math.sqrt(sum(w * w for w in q_w.values())) * math.sqrt(sum(w * w for w in a_w.values()))
+        return max(0.0, min(1.0, dot / norm)) if norm else 0.0
+
+    def is_stale(self, interviews_dir: str = INTERVIEWS_DIR) -> bool:
+        return self.meta.get("corpus_fingerprint") != corpus_fingerprint(interviews_dir)
+
+
+def build_idf_model(interviews_dir: str = INTERVIEWS_DIR, model_dir: str = MODEL_DIR) -> Dict:
+    if not _NUMPY_AVAILABLE:
+        raise RuntimeError("numpy is required to build the IDF model")
+    # fingerprint first: transcripts written while we scan make the model stale, not silently current
+    fingerprint = corpus_fingerprint(interviews_dir)
+    df: Counter = Counter()
+    n_docs = 0
+    for doc in iter_corpus_documents(interviews_dir):
+        terms = set(analyze(doc))
+        if terms:
+            df.update(terms)
+            n_docs += 1
+
+    terms = sorted(df)
+    vocabulary = {t: i for i, t in enumerate(terms)}
+    idf = np.array([math.log((1 + n_docs) / (1 + df[t])) + 1 for t in terms], dtype=np.float64)
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "token_pattern": TOKEN_PATTERN,
+        "built_at": datetime.utcnow().isoformat(),
+        "n_docs": n_docs,
+        "corpus_fingerprint": fingerprint,
+        "vocabulary": vocabulary,
+    }
+    os.makedirs(model_dir, exist_ok=True)
+    weights_path = os.path.join(model_dir, os.path.basename(WEIGHTS_PATH))
+    meta_path = os.path.join(model_dir, os.path.basename(META_PATH))
+    # write-then-rename so a running app never loads half an artifact
+    np.save(weights_path + ".tmp.npy", idf)
+    os.replace(weights_path + ".tmp.npy", weights_path)
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(meta_path + ".tmp", meta_path)
+    return {"n_docs": n_docs, "vocabulary_size": len(terms)}
+
+
+def load_idf_model(model_dir: str = MODEL_DIR) -> Optional[IdfModel]:
+    if not _NUMPY_AVAILABLE:
+        return None
+    meta_path = os.path.join(model_dir, os.path.basename(META_PATH))
+    weights_path = os.path.join(model_dir, os.path.basename(WEIGHTS_PATH))
+    if not (os.path.exists(meta_path) and os.path.exists(weights_path)):
+        return None
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format_version") != FORMAT_VERSION or meta.get("token_pattern") != TOKEN_PATTERN:
+        return None
+    vocabulary = meta.pop("vocabulary")
+    idf = np.load(weights_path, mmap_mode="r")
+    if len(idf) != len(vocabulary):
+        return None
+    return IdfModel(vocabulary, idf, int(meta.get("n_docs", 0)), meta)
+
+
+_MODEL_LOCK = threading.Lock()
+_MODEL: Optional[IdfModel] = None
+_MODEL_LOADED = False
+
+
+def get_idf_model(reload: bool = False) -> Optional[IdfModel]:
+    """Process-wide model, loaded on first use. Returns None when no compatible artifact exists."""
+    global _MODEL, _MODEL_LOADED
+    if _MODEL_LOADED and not reload:
+        return _MODEL
+    with _MODEL_LOCK:
+        if reload or not _MODEL_LOADED:
+            try:
+                _MODEL = load_idf_model()
+            except Exception:
+                _MODEL = None
+            _MODEL_LOADED = True
+    return _MODEL
+
+
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else ""
+    if cmd == "rebuild":
+        print(json.dumps(build_idf_model()))
+    elif cmd == "check":
+        model = load_idf_model()
+        if model is None:
+            print("missing or incompatible IDF model; run: python -m core.idf_model rebuild")
+            sys.exit(1)
+        if model.is_stale():
+            print(f"stale: built {model.meta.get('built_at')} from a different set of transcripts")
+            sys.exit(1)
+        print(f"ok: {model.n_docs} documents, {len(model.vocabulary)} terms, built {model.meta.get('built_at')}")
+    else:
+        print("usage: python -m core.idf_model rebuild|check")
+        sys.exit(2)
@@ -0,0 +1,44 @@
+# core/ids.py
+import os
+import threading
+import time
+
+# Crockford base32: sortable as plain strings, no ambiguous letters
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+_lock = threading.Lock()
+_last_ms = -1
+_last_rand = 0
+
+
+def _encode(value: int, length: int) -> str:
+    out = []
+    for _ in range(length):
+        value, rem = divmod(value, 32)
+        out.append(_ALPHABET[rem])
+    return "".join(reversed(out))
+
+
+def new_candidate_id() -> str:
+    """
+    26-character ULID: 48-bit millisecond timestamp followed by 80 random bits.
+
+    IDs sort by creation time. Within one process they are strictly increasing (the random part is
+    incremented when two IDs share a millisecond); across processes and hosts the 80 random bits
+    make a collision practically impossible, so no coordination is needed.
+    """
+    global _last_ms, _last_rand
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms <= _last_ms:
+            now_ms = _last_ms
+            _last_rand += 1
+            if _last_rand >= 1 << 80:
+                # 2^80 IDs in one millisecond: borrow the next one
+                now_ms += 1
+                _last_rand = int.from_bytes(os.urandom(10), "big") >> 1
+        else:
+            # keep the top bit clear so increments within the millisecond cannot overflow in practice
+            _last_rand = int.from_bytes(os.urandom(10), "big") >> 1
+        _last_ms = now_ms
+        return _encode(now_ms, 10) + _encode(_last_rand, 16)
@@ -1,12 +1,320 @@
 import os
-from typing import Any
+import time
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
 from langchain_core.output_parsers import StrOutputParser
 from langchain_community.chat_models import ChatOllama
 
 _DEF_MODEL = os.getenv("OLLAMA_MODEL", "gemma:2b")  # set via .env if needed
+_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+# How long Ollama keeps the model loaded after a request (Ollama duration string or seconds)
+_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+# Seconds between background warm-up pings; 0 disables the periodic ping (startup ping still runs)
+_WARMUP_INTERVAL = float(os.getenv("OLLAMA_WARMUP_INTERVAL", "0"))
+# Model calls admitted at once across all sessions; match Ollama's OLLAMA_NUM_PARALLEL
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", os.getenv("OLLAMA_NUM_PARALLEL", "4")))
+# Seconds an Ollama request may go without a response before it fails (frees its slot from a hung model)
+LLM_TIMEOUT_S = int(os.getenv("LLM_TIMEOUT_S", "120"))
+
+# Admission order: a candidate is waiting on question generation, grading only matters at the end
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+_PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch"}
+
+
+def _keep_alive_seconds(value: str) -> float:
+    value = str(value).strip().lower()
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    for suffix in ("ms", "s", "m", "h"):
+        if value.endswith(suffix):
+            try:
+                return float(value[: -len(suffix)]) * units[suffix]
+            except ValueError:
+                break
+    try:
+        seconds = float(value)
+    except ValueError:
+        return 300.0  # Ollama's own default
+    # negative keep_alive means "keep loaded forever"
+    return float("inf") if seconds < 0 else seconds
+
+
+class _LatencyStats:
+    """Cold vs warm call latency per model. A call is cold when the model has been idle longer than keep_alive."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_activity: Dict[str, float] = {}
+        self._samples: Dict[str, List[float]] = {"cold": [], "warm": []}
+
+    def is_warm(self, model: str) -> bool:
+        last = self._last_activity.get(model)
+        return last is not None and time.monotonic() - last < _keep_alive_seconds(_KEEP_ALIVE)
+
+    def record(self, model: str, warm: bool, seconds: float):
+        with self._lock:
+            samples = self._samples["warm" if warm else "cold"]
+            samples.append(seconds)
+            del samples[:-1000]  # bounded window
+            self._last_activity[model] = time.monotonic()
+
+    def touch(self, model: str):
+        with self._lock:
+            self._last_activity[model] = time.monotonic()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        out = {}
+        with self._lock:
+            for kind, samples in self._samples.items():
+                s = sorted(samples)
+                out[kind] = {
+                    "count": len(s),
+                    "mean_s": sum(s) / len(s) if s else 0.0,
+                    "p50_s": s[len(s) // 2] if s else 0.0,
+                    "max_s": s[-1] if s else 0.0,
+                }
+        return out
+
+
+_STATS = _LatencyStats()
+
+
+class LLMCallAbandoned(Exception):
+    """A model call given up by its caller: withdrawn from the queue, or past its time limit."""
+
+
+_limits = threading.local()
+
+
+@contextmanager
+def call_limits(abandoned: Optional[threading.Event] = None, timeout_s: Optional[float] = None):
+    """
+    Limits for the model calls this thread makes inside the block. A call still queued when
+    `abandoned` is set (see abandon_calls) leaves the queue; a call, queued or streaming, is
+    given up timeout_s after the block starts. Both raise LLMCallAbandoned.
+    """
+    previous = getattr(_limits, "value", None)
+    _limits.value = (abandoned, time.monotonic() + timeout_s if timeout_s else None)
+    try:
+        yield
+    finally:
+        _limits.value = previous
+
+
+def _current_limits() -> Tuple[Optional[threading.Event], Optional[float]]:
+    return getattr(_limits, "value", None) or (None, None)
+
+
+class _AdmissionQueue:
+    """
+    Process-wide gate in front of every model call, so a burst of sessions queues here instead of
+    piling onto one Ollama. At most `limit` calls run at once; the others wait in priority order,
+    first come first served within a priority.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._cond = threading.Condition()
+        self._waiting: List[Tuple[int, int, int]] = []  # heap of (priority, arrival, thread id)
+        self._arrivals = itertools.count()
+        self._running = 0
+        self._admitted = {p: 0 for p in _PRIORITY_NAMES}
+        self._waits: Dict[int, List[float]] = {p: [] for p in _PRIORITY_NAMES}
+
+    @contextmanager
+    def slot(self, priority: int):
+        entry = (priority, next(self._arrivals), threading.get_ident())
+        abandoned, deadline = _current_limits()
+        start = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            while not (self._running < self.limit and self._waiting[0] is entry):
+                if (abandoned is not None and abandoned.is_set()) or (deadline is not None and time.monotonic() >= deadline):
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()  # we may have been the head holding others back
+                    raise LLMCallAbandoned("model call withdrawn before it was admitted")
+                self._cond.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            heapq.heappop(self._waiting)
+            self._running += 1
+            self._admitted[priority] += 1
+            waits = self._waits[priority]
+            waits.append(time.monotonic() - start)
+            del waits[:-1000]  # bounded window
+            self._cond.notify_all()  # the new head may fit in a free slot too
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def position(self, thread_id: int) -> int:
+        """1-based place in line of the call thread_id is waiting to make; 0 if it is not waiting."""
+        with self._cond:
+            for pos, entry in enumerate(sorted(self._waiting), 1):
+                if entry[2] == thread_id:
+                    return pos
+        return 0
+
+    def summary(self) -> Dict[str, Any]:
+        with self._cond:
+            out: Dict[str, Any] = {"limit": self.limit, "running": self._running, "queued": len(self._waiting)}
+            for p, name in _PRIORITY_NAMES.items():
+                s = sorted(self._waits[p])
+                out[name] = {
+                    "queued": sum(1 for e in self._waiting if e[0] == p),
+                    "admitted": self._admitted[p],
+                    "wait_p50_s": s[len(s) // 2] if s else 0.0,
+                    "wait_p99_s": s[min(len(s) - 1, int(len(s) * 0.99))] if s else 0.0,
+                }
+        return out
+
+
+_ADMISSION = _AdmissionQueue(LLM_MAX_CONCURRENCY)
+
+
+class _TimedChatModel:
+    """
+    Thin wrapper around a shared ChatOllama that waits for an admission slot before every call and
+    records cold/warm latency (excluding the time spent queued).
+    """
+
+    def __init__(self, llm: Any, priority: int = PRIORITY_INTERACTIVE):
+        self._llm = llm
+        self._priority = priority
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._llm, name)
+
+    def invoke(self, *args, **kwargs):
+        with _ADMISSION.slot(self._priority):
+            warm = _STATS.is_warm(self._llm.model)
+            start = time.perf_counter()
+            resp = self._llm.invoke(*args, **kwargs)
+            _STATS.record(self._llm.model, warm, time.perf_counter() - start)
+        return resp
+
+    def stream(self, *args, **kwargs):
+        # the slot is held until the whole completion has been streamed, or until call_limits' timeout
+        _, deadline = _current_limits()
+        with _ADMISSION.slot(self._priority):
+            warm = _STATS.is_warm(self._llm.model)
+            start = time.perf_counter()
+            first = True
+            chunks = self._llm.stream(*args, **kwargs)
+            try:
+                for chunk in chunks:
+                    if first:
+                        # model load time shows up before the first token
+                        _STATS.record(self._llm.model, warm, time.perf_counter() - start)
+                        first = False
+                    yield chunk
+                    if deadline is not None and time.monotonic() >= deadline:
+                        raise LLMCallAbandoned("model call ran past its time limit")
+            finally:
+                if hasattr(chunks, "close"):
+                    chunks.close()  # stops reading the response, so Ollama can stop generating
+            _STATS.touch(self._llm.model)
+
+
+_REGISTRY_LOCK = threading.Lock()
+_REGISTRY: Dict[Tuple[str, float, int], _TimedChatModel] = {}
+
+
+def _get_client(model: str, temperature: float, priority: int) -> Any:
+    # One client per (model, temperature, priority) for the whole process, shared by all Streamlit sessions
+    key = (model, temperature, priority)
+    client = _REGISTRY.get(key)
+    if client is None:
+        with _REGISTRY_LOCK:
+            client = _REGISTRY.get(key)
+            if client is None:
+                client = _TimedChatModel(
+                    ChatOllama(
+                        model=model, temperature=temperature, base_url=_BASE_URL, keep_alive=_KEEP_ALIVE,
+                        timeout=LLM_TIMEOUT_S,
+                    ),
+                    priority,
+                )
+                _REGISTRY[key] = client
+    return client
 
 def get_interviewer_lm() -> Any:
-    return ChatOllama(model=_DEF_MODEL, temperature=0.2)
+    return _get_client(_DEF_MODEL, 0.2, PRIORITY_INTERACTIVE)
 
 def get_evaluator_lm() -> Any:
-    return ChatOllama(model=_DEF_MODEL, temperature=0.0)
\ No newline at end of file
+    return _get_client(_DEF_MODEL, 0.0, PRIORITY_BATCH)
+
+
+_ollama_client = None
+
+
+def warm_up(model: str = _DEF_MODEL) -> float:
+    """
+    Ask Ollama to load `model` (an empty prompt loads it without generating) and keep it resident
+    for OLLAMA_KEEP_ALIVE. Returns the round-trip time in seconds.
+    """
+    global _ollama_client
+    import ollama
+
+    if _ollama_client is None:
+        # ollama.Client keeps a pooled HTTP connection, so periodic pings reuse it
+        _ollama_client = ollama.Client(host=_BASE_URL)
+    warm = _STATS.is_warm(model)
+    start = time.perf_counter()
+    _ollama_client.generate(model=model, prompt="", keep_alive=_KEEP_ALIVE)
+    elapsed = time.perf_counter() - start
+    _STATS.record(model, warm, elapsed)
+    return elapsed
+
+
+_warmup_started = False
+_warmup_lock = threading.Lock()
+
+
+def _warmup_loop():
+    while True:
+        try:
+            warm_up()
+        except Exception:
+            pass  # Ollama not reachable yet; the next ping or the first real call will load it
+        if _WARMUP_INTERVAL <= 0:
+            return
+        time.sleep(_WARMUP_INTERVAL)
+
+
+def start_warmup():
+    """Start (once per process) a background warm-up ping, repeated every OLLAMA_WARMUP_INTERVAL seconds."""
+    global _warmup_started
+    with _warmup_lock:
+        if _warmup_started:
+            return
+        _warmup_started = True
+    threading.Thread(target=_warmup_loop, name="ollama-warmup", daemon=True).start()
+
+
+def llm_latency_metrics() -> Dict[str, Dict[str, float]]:
+    return _STATS.summary()
+
+
+def llm_queue_metrics() -> Dict[str, Any]:
+    """Admission queue state: slots in use, calls waiting and wait-time percentiles per priority."""
+    return _ADMISSION.summary()
+
+
+def llm_queue_position(thread_id: int) -> int:
+    return _ADMISSION.position(thread_id)
+
+
+def abandon_calls(abandoned: threading.Event):
+    """Set `abandoned`: calls made under call_limits(abandoned) that are still queued leave the queue."""
+    abandoned.set()
+    _ADMISSION.wake()
@@ -0,0 +1,38 @@
+# core/locks.py
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+
+    _HAVE_FCNTL = True
+except ImportError:  # Windows
+    import msvcrt
+
+    _HAVE_FCNTL = False
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Exclusive inter-process lock on `path` (via a sibling `<path>.lock` file).
+
+    Held around appends so rows written by several Streamlit workers never interleave.
+    """
+    fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if _HAVE_FCNTL:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if _HAVE_FCNTL:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
@@ -1,6 +1,6 @@
 from langchain.prompts import PromptTemplate
 
-def build_question_prompt(candidate_name: str, contact_info: str, experience: str, desired_position: str, tech_stack: str):
+def build_question_prompt(candidate_name: str, contact_info: str, experience: str, desired_position: str, tech_stack: str, count: int | None = None):
     template = (
         "You are an intelligent Hiring Assistant chatbot for 'TalentScout'.\n\n"
         "Candidate Name: {candidate_name}\n"
@@ -12,6 +12,8 @@ def build_question_prompt(candidate_name: str, contact_info: str, experience: st
         " Return a numbered list with one question per line."
         " Focus on fundamentals, practical problem-solving, and a touch of system design where relevant."
     )
+    if count:
+        template += f" Write exactly {count} questions."
     return PromptTemplate(
         input_variables=[
             "candidate_name",
@@ -0,0 +1,140 @@
+# core/question_bank.py
+"""
+On-disk bank of LLM-generated interview questions, keyed by candidate profile.
+
+A profile is the normalized tech stack, desired position and experience band, so repeat profiles
+("Python, Django" backend, 2-4 years) can be served from questions generated for earlier
+candidates instead of waiting for the model. Entries expire after QUESTION_BANK_TTL_DAYS and the
+least recently used profiles are evicted beyond QUESTION_BANK_MAX_PROFILES.
+"""
+import os
+import re
+import random
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from core.storage import DATA_DIR
+
+QUESTION_BANK_PATH = os.path.join(DATA_DIR, "question_bank.db")
+QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK", "1") not in ("0", "false", "off")
+QUESTION_BANK_TTL_DAYS = float(os.getenv("QUESTION_BANK_TTL_DAYS", "30"))
+QUESTION_BANK_MAX_PROFILES = int(os.getenv("QUESTION_BANK_MAX_PROFILES", "500"))
+QUESTION_BANK_MAX_PER_PROFILE = int(os.getenv("QUESTION_BANK_MAX_PER_PROFILE", "200"))
+# Share of each question set that is always freshly generated, so repeat profiles do not keep
+# getting the same questions (0 = serve fully from the bank when possible)
+QUESTION_BANK_FRESH_RATIO = float(os.getenv("QUESTION_BANK_FRESH_RATIO", "0.3"))
+
+
+def experience_band(experience: str) -> str:
+    text = (experience or "").lower()
+    m = re.search(r"\d+(?:\.\d+)?", text)
+    if m:
+        years = float(m.group(0))
+        if "month" in text and "year" not in text:
+            years /= 12
+    elif re.search(r"\b(fresher|intern|student|graduate|none|no)\b", text):
+        years = 0.0
+    else:
+        return "unknown"
+    if years < 2:
+        return "0-1"
+    if years < 5:
+        return "2-4"
+    if years < 10:
+        return "5-9"
+    return "10+"
+
+
+def profile_key(tech_list: List[str], desired_position: str, experience: str) -> str:
+    techs = sorted({re.sub(r"\s+", " ", t.strip().lower()) for t in tech_list if t and t.strip()})
+    position = re.sub(r"\s+", " ", (desired_position or "").strip().lower())
+    return f"{','.join(techs)}|{position}|{experience_band(experience)}"
+
+
+class QuestionBank:
+    def __init__(self, path: str = QUESTION_BANK_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS profiles (profile_key TEXT PRIMARY KEY, last_used REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            "profile_key TEXT, question TEXT, created_at REAL, PRIMARY KEY (profile_key, question))"
+        )
+        self._conn.commit()
+
+    def _expired_before(self) -> float:
+        return time.time() - QUESTION_BANK_TTL_DAYS * 86400
+
+    def sample(self, key: str, n: int) -> List[str]:
+        """Up to n unexpired questions for the profile, in random order."""
+        if n <= 0:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT question FROM questions WHERE profile_key = ? AND created_at >= ?",
+                (key, self._expired_before()),
+            ).fetchall()
+            if rows:
+                self._conn.execute("UPDATE profiles SET last_used = ? WHERE profile_key = ?", (time.time(), key))
+                self._conn.commit()
+        questions = [r[0] for r in rows]
+        random.shuffle(questions)
+        return questions[:n]
+
+    def add(self, key: str, questions: List[str]):
+        if not questions:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO profiles (profile_key, last_used) VALUES (?, ?)", (key, now))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO questions (profile_key, question, created_at) VALUES (?, ?, ?)",
+                [(key, q, now) for q in questions],
+            )
+            # keep the newest questions per profile
+            self._conn.execute(
+                "DELETE FROM questions WHERE profile_key = ? AND question NOT IN ("
+                "SELECT question FROM questions WHERE profile_key = ? ORDER BY created_at DESC LIMIT ?)",
+                (key, key, QUESTION_BANK_MAX_PER_PROFILE),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        self._conn.execute("DELETE FROM questions WHERE created_at < ?", (self._expired_before(),))
+        self._conn.execute(
+            "DELETE FROM profiles WHERE profile_key NOT IN (SELECT DISTINCT profile_key FROM questions)"
+        )
+        stale = self._conn.execute(
+            "SELECT profile_key FROM profiles ORDER BY last_used DESC LIMIT -1 OFFSET ?",
+            (QUESTION_BANK_MAX_PROFILES,),
+        ).fetchall()
+        for (key,) in stale:
+            self._conn.execute("DELETE FROM questions WHERE profile_key = ?", (key,))
+            self._conn.execute("DELETE FROM profiles WHERE profile_key = ?", (key,))
+
+
+_BANK_LOCK = threading.Lock()
+_BANK: Optional[QuestionBank] = None
+
+
+def get_question_bank() -> Optional[QuestionBank]:
+    """Process-wide bank; None when disabled with QUESTION_BANK=0 or the database cannot be opened."""
+    global _BANK
+    if not QUESTION_BANK_ENABLED:
+        return None
+    if _BANK is None:
+        with _BANK_LOCK:
+            if _BANK is None:
+                try:
+                    _BANK = QuestionBank()
+                except Exception:
+                    return None
+    return _BANK
@@ -0,0 +1,328 @@
+# core/question_index.py
+"""
+Inverted index over every interview question generated or asked so far.
+
+Each question is posted under the techs it was generated for (narrowed to the ones it names, when
+it names any) and carries usage and quality stats: how often it was asked, how often it was
+answered and the mean score those answers got. The whole index lives in memory, persisted to
+SQLite, so assembling a question set for a tech list is a few dictionary lookups. Sets are
+deduplicated and near-duplicates (high word overlap) are skipped.
+
+    python -m core.question_index rebuild              # from performances + transcripts
+    python -m core.question_index query "Python, Django" [N]
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.storage import DATA_DIR
+
+QUESTION_INDEX_PATH = os.path.join(DATA_DIR, "question_index.db")
+QUESTION_INDEX_ENABLED = os.getenv("QUESTION_INDEX", "1") not in ("0", "false", "off")
+# Word-set Jaccard at or above which two questions count as the same question
+QUESTION_INDEX_NEAR_DUP = float(os.getenv("QUESTION_INDEX_NEAR_DUP", "0.6"))
+# Seconds to wait for the model's first question before serving the set from the index
+QUESTION_INDEX_FALLBACK_S = float(os.getenv("QUESTION_INDEX_FALLBACK_S", "10"))
+
+# The question sets are topped up with this per-tech placeholder when nothing better is left;
+# it is never indexed, so it cannot come back as an index-tier question
+FALLBACK_QUESTION = "In {tech}, explain a concept or solve a small problem relevant to {tech} fundamentals."
+_FALLBACK_RE = re.compile(
+    "^" + re.escape(FALLBACK_QUESTION).replace(re.escape("{tech}"), "(.+)", 1).replace(re.escape("{tech}"), r"\1") + "$"
+)
+
+# Unanswered questions rank as if they had a few answers at this mean score (0..10)
+_PRIOR_SCORE = 5.0
+_PRIOR_WEIGHT = 3.0
+
+_WORD_RE = re.compile(r"[a-z0-9#+]+")
+_STOPWORDS = {
+    "the", "and", "for", "you", "your", "with", "what", "how", "why", "when", "which", "that", "this",
+    "are", "can", "does", "would", "could", "should", "explain", "describe", "between", "difference",
+    "example", "use", "using", "into", "from", "about", "its", "they", "their", "have", "has",
+}
+
+
+def normalize_tech(tech: str) -> str:
+    return re.sub(r"\s+", " ", (tech or "").strip().lower())
+
+
+def _words(text: str) -> frozenset:
+    return frozenset(w for w in _WORD_RE.findall(text.lower()) if len(w) > 2 and w not in _STOPWORDS)
+
+
+def _norm_key(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def _near_duplicate(a: frozenset, b: frozenset) -> bool:
+    if not a or not b:
+        return a == b
+    return len(a & b) / len(a | b) >= QUESTION_INDEX_NEAR_DUP
+
+
+def _techs_for(question: str, tech_list: Iterable[str]) -> List[str]:
+    techs = [t for t in dict.fromkeys(normalize_tech(t) for t in tech_list) if t]
+    lower = question.lower()
+    named = [t for t in techs if re.search(rf"(?<![\w#+]){re.escape(t)}(?![\w#+])", lower)]
+    return named or techs
+
+
+class _Entry:
+    __slots__ = ("qid", "text", "words", "served", "answered", "score_sum")
+
+    def __init__(self, qid: int, text: str, served: int = 0, answered: int = 0, score_sum: float = 0.0):
+        self.qid = qid
+        self.text = text
+        self.words = _words(text)
+        self.served = served
+        self.answered = answered
+        self.score_sum = score_sum
+
+    @property
+    def quality(self) -> float:
+        return (self.score_sum + _PRIOR_SCORE * _PRIOR_WEIGHT) / (self.answered + _PRIOR_WEIGHT)
+
+
+def indexable(question: str, tier: Optional[str] = None) -> bool:
+    """False for generic fallback questions, whether or not the tier they were served from is known."""
+    return tier != "generic" and not _FALLBACK_RE.match((question or "").strip())
+
+
+class QuestionIndex:
+    def __init__(self, path: str = QUESTION_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            "qid INTEGER PRIMARY KEY, norm TEXT UNIQUE, question TEXT, "
+            "served INTEGER DEFAULT 0, answered INTEGER DEFAULT 0, score_sum REAL DEFAULT 0, created_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings (tech TEXT, qid INTEGER, PRIMARY KEY (tech, qid)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+        self._data_version = None
+        self._load()
+
+    def _load(self):
+        self._entries: Dict[int, _Entry] = {}
+        self._by_norm: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._ranked: Dict[str, List[int]] = {}
+        for qid, norm, text, served, answered, score_sum in self._conn.execute(
+            "SELECT qid, norm, question, served, answered, score_sum FROM questions"
+        ):
+            self._entries[qid] = _Entry(qid, text, served, answered, score_sum)
+            self._by_norm[norm] = qid
+        for tech, qid in self._conn.execute("SELECT tech, qid FROM postings"):
+            self._postings.setdefault(tech, []).append(qid)
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _refresh(self):
+        # data_version changes only when another connection (another worker process) committed
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self._load()
+
+    def _ranked_for(self, tech: str) -> List[int]:
+        ranked = self._ranked.get(tech)
+        if ranked is None:
+            entries = self._entries
+            ranked = sorted(self._postings.get(tech, ()), key=lambda q: (-entries[q].quality, entries[q].served, q))
+            self._ranked[tech] = ranked
+        return ranked
+
+    def assemble(self, tech_list: List[str], n: int = 10, exclude: Iterable[str] = ()) -> List[str]:
+        """
+        Up to n distinct questions covering tech_list round-robin, best-rated (then least asked)
+        first, skipping near-duplicates of each other and of `exclude`.
+        """
+        techs = [t for t in dict.fromkeys(normalize_tech(t) for t in tech_list) if t]
+        if n <= 0 or not techs:
+            return []
+        with self._lock:
+            self._refresh()
+            taken: List[frozenset] = [_words(q) for q in exclude]
+            chosen: List[str] = []
+            chosen_ids: Set[int] = set()
+            cursors = {t: 0 for t in techs}
+            while len(chosen) < n and cursors:
+                for tech in list(cursors):
+                    ranked = self._ranked_for(tech)
+                    pos = cursors[tech]
+                    while pos < len(ranked):
+                        entry = self._entries[ranked[pos]]
+                        pos += 1
+                        if entry.qid in chosen_ids or any(_near_duplicate(entry.words, w) for w in taken):
+                            continue
+                        chosen.append(entry.text)
+                        chosen_ids.add(entry.qid)
+                        taken.append(entry.words)
+                        break
+                    if pos >= len(ranked):
+                        del cursors[tech]
+                    else:
+                        cursors[tech] = pos
+                    if len(chosen) >= n:
+                        break
+            return chosen
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._entries)
+
+    def _upsert(self, question: str, tech_list: Iterable[str]) -> Optional[int]:
+        """Existing id of the question (or of a near-duplicate under the same techs), else a new one."""
+        question = (question or "").strip()
+        norm = _norm_key(question)
+        if not norm:
+            return None
+        techs = _techs_for(question, tech_list)
+        qid = self._by_norm.get(norm)
+        if qid is None:
+            words = _words(question)
+            for tech in techs:
+                for other in self._postings.get(tech, ()):
+                    if _near_duplicate(words, self._entries[other].words):
+                        qid = other
+                        break
+                if qid is not None:
+                    break
+        if qid is None:
+            # another worker process may have inserted the same question since our last refresh
+            self._conn.execute(
+                "INSERT OR IGNORE INTO questions (norm, question, created_at) VALUES (?, ?, ?)",
+                (norm, question, time.time()),
+            )
+            qid, served, answered, score_sum = self._conn.execute(
+                "SELECT qid, served, answered, score_sum FROM questions WHERE norm = ?", (norm,)
+            ).fetchone()
+            self._entries[qid] = _Entry(qid, question, served, answered, score_sum)
+            self._by_norm[norm] = qid
+        for tech in techs:
+            posting = self._postings.setdefault(tech, [])
+            if qid not in posting:
+                self._conn.execute("INSERT OR IGNORE INTO postings (tech, qid) VALUES (?, ?)", (tech, qid))
+                posting.append(qid)
+            self._ranked.pop(tech, None)
+        return qid
+
+    def add(self, questions: List[str], tech_list: List[str]):
+        """Index freshly generated questions for a tech list (no usage yet)."""
+        if not questions:
+            return
+        with self._lock:
+            self._refresh()
+            for q in questions:
+                self._upsert(q, tech_list)
+            self._conn.commit()
+            self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def record(self, tech_list: List[str], results: List[Tuple[str, Optional[float]]]):
+        """Count each (question, score) as asked once; a None score means asked but not graded."""
+        if not results:
+            return
+        with self._lock:
+            self._refresh()
+            for question, score in results:
+                qid = self._upsert(question, tech_list)
+                if qid is None:
+                    continue
+                entry = self._entries[qid]
+                answered, score = (1, float(score)) if score is not None else (0, 0.0)
+                entry.served += 1
+                entry.answered += answered
+                entry.score_sum += score
+                # increments, so concurrent workers never overwrite each other's counts
+                self._conn.execute(
+                    "UPDATE questions SET served = served + 1, answered = answered + ?, score_sum = score_sum + ? "
+                    "WHERE qid = ?",
+                    (answered, score, qid),
+                )
+            self._ranked.clear()
+            self._conn.commit()
+            self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM postings")
+            self._conn.execute("DELETE FROM questions")
+            self._conn.commit()
+            self._load()
+
+
+def rebuild_question_index(index: Optional["QuestionIndex"] = None) -> Dict[str, int]:
+    """Re-create the index from stored performances (asked + scored) and transcripts (asked)."""
+    import json
+
+    from core.idf_model import iter_transcript_qa
+    from core.storage import iter_candidates, iter_chat_histories, iter_performances
+
+    index = index if index is not None else QuestionIndex()
+    index.clear()
+    stacks = {row.get("id"): row.get("tech_stack") or "" for row in iter_candidates()}
+    scored_ids = set()
+    interviews = 0
+    for row in iter_performances():
+        try:
+            breakdown = json.loads(row.get("breakdown") or "[]")
+        except ValueError:
+            continue
+        results = [
+            (item.get("question") or "", item.get("score"))
+            for item in (breakdown if isinstance(breakdown, list) else [])
+            if isinstance(item, dict) and indexable(item.get("question") or "", item.get("tier"))
+        ]
+        index.record((row.get("tech_stack") or "").split(","), results)
+        scored_ids.add(row.get("id"))
+        interviews += 1
+    for candidate_id, history in iter_chat_histories():
+        if candidate_id in scored_ids or candidate_id not in stacks:
+            continue
+        index.record(stacks[candidate_id].split(","), [(q, None) for q, _ in iter_transcript_qa(history) if indexable(q)])
+        interviews += 1
+    return {"interviews": interviews, "questions": len(index)}
+
+
+_INDEX_LOCK = threading.Lock()
+_INDEX: Optional[QuestionIndex] = None
+
+
+def get_question_index() -> Optional[QuestionIndex]:
+    """Process-wide index; None when disabled with QUESTION_INDEX=0 or the database cannot be opened."""
+    global _INDEX
+    if not QUESTION_INDEX_ENABLED:
+        return None
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                try:
+                    _INDEX = QuestionIndex()
+                except Exception:
+                    return None
+    return _INDEX
+
+
+if __name__ == "__main__":
+    import sys
+    import json
+
+    args = sys.argv[1:]
+    if args == ["rebuild"]:
+        print(json.dumps(rebuild_question_index()))
+    elif args[:1] == ["query"] and len(args) in (2, 3):
+        idx = QuestionIndex()
+        t0 = time.perf_counter()
+        picked = idx.assemble(args[1].split(","), int(args[2]) if len(args) == 3 else 10)
+        print(json.dumps({"questions": picked, "microseconds": round((time.perf_counter() - t0) * 1e6, 1)}, indent=2))
+    else:
+        print("usage: python -m core.question_index rebuild | query \"TECH, TECH\" [N]")
+        sys.exit(2)
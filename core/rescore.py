@@ -0,0 +1,178 @@
+# core/rescore.py
+"""
+Re-grade every stored interview with the current evaluator configuration.
+
+Q/A pairs are streamed from the performance breakdowns (or from the transcripts) in chunks and
+scored on a process pool with the local evaluator; pairs the evaluation cache (core.eval_cache)
+already holds for this evaluator variant are not scored again. Results go to a CSV per evaluator
+version, data/rescores/<source>-<tag>.csv, whose score_<tag> / breakdown_<tag> columns sit next
+to the original rows' keys. The output doubles as the checkpoint: every finished chunk is appended and
+flushed, and a re-run skips the rows already present, so an interrupted run simply resumes.
+
+    python -m core.rescore [--source performances|transcripts] [--workers N] [--chunk N] [--restart]
+"""
+import os
+import csv
+import sys
+import json
+import time
+import hashlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from core.evaluator import evaluator_variant, grade_qa_batch
+from core.idf_model import iter_transcript_qa
+from core.storage import DATA_DIR, INTERVIEWS_DIR, iter_chat_histories, iter_performances
+
+RESCORE_DIR = os.path.join(DATA_DIR, "rescores")
+SOURCES = ("performances", "transcripts")
+
+
+def score_tag() -> str:
+    """Short, filesystem-safe name for the current evaluator configuration."""
+    variant = evaluator_variant()
+    return f"{variant.split('|', 1)[0]}-{hashlib.sha1(variant.encode('utf-8')).hexdigest()[:8]}"
+
+
+def _iter_performance_items() -> Iterator[Dict[str, Any]]:
+    for row_no, row in enumerate(iter_performances(), start=1):
+        try:
+            breakdown = json.loads(row.get("breakdown") or "[]")
+        except ValueError:
+            breakdown = []
+        qa = [
+            {"q": item.get("question") or "", "a": item.get("answer") or ""}
+            for item in (breakdown if isinstance(breakdown, list) else [])
+            if isinstance(item, dict)
+        ]
+        yield {"row": str(row_no), "id": row.get("id"), "qa": qa}
+
+
+def _iter_transcript_items(interviews_dir: str = INTERVIEWS_DIR) -> Iterator[Dict[str, Any]]:
+    for candidate_id, history in iter_chat_histories(interviews_dir):
+        qa = [{"q": q, "a": a} for q, a in iter_transcript_qa(history)]
+        yield {"row": candidate_id, "id": candidate_id, "qa": qa}
+
+
+def _score_chunk(items: List[Dict[str, Any]]) -> List[List[Any]]:
+    # one grading call for the whole chunk so the similarity step runs as a single batch; pairs
+    # already graded under this evaluator variant come from the evaluation cache
+    flat = [qa for item in items for qa in item["qa"]]
+    results = grade_qa_batch(None, None, flat, use_llm=False) if flat else []
+    out, pos = [], 0
+    for item in items:
+        breakdown = results[pos : pos + len(item["qa"])]
+        pos += len(item["qa"])
+        total = max(0, min(100, int(round(sum(r.get("score", 0) for r in breakdown)))))
+        out.append([item["row"], item["id"], total, json.dumps(breakdown, ensure_ascii=False)])
+    return out
+
+
+def _done_rows(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb") as f:
+        data = f.read()
+    complete = data[: data.rfind(b"\n") + 1]
+    if len(complete) != len(data):
+        # a run killed mid-write leaves a torn last record; drop it, that chunk is redone
+        with open(path, "r+b") as f:
+            f.truncate(len(complete))
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return {r["row"] for r in csv.DictReader(f)}
+
+
+def _chunks(items: Iterator[Dict[str, Any]], done: Set[str], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for item in items:
+        if item["row"] in done:
+            continue
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def rescore(
+    source: str = "performances",
+    workers: Optional[int] = None,
+    chunk_size: int = 200,
+    restart: bool = False,
+    out_dir: Optional[str] = None,
+    progress=None,
+) -> Dict[str, Any]:
+    if source not in SOURCES:
+        raise ValueError(f"unknown source {source!r}; expected one of {SOURCES}")
+    out_dir = out_dir or RESCORE_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    tag = score_tag()
+    out_path = os.path.join(out_dir, f"{source}-{tag}.csv")
+    meta_path = out_path[: -len(".csv")] + ".json"
+    if restart:
+        for path in (out_path, meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+    done = _done_rows(out_path)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"variant": evaluator_variant(), "source": source, "started_at": datetime.utcnow().isoformat()}, f)
+
+    items = _iter_performance_items() if source == "performances" else _iter_transcript_items()
+    workers = workers or os.cpu_count() or 1
+    scored = answers = 0
+    started = time.monotonic()
+    new_file = not os.path.exists(out_path)
+    with open(out_path, "a", encoding="utf-8", newline="") as f, ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(["row", "id", f"score_{tag}", f"breakdown_{tag}"])
+            f.flush()
+        chunks = _chunks(items, done, chunk_size)
+        in_flight = {}
+        while True:
+            # a couple of chunks queued per worker keeps everyone busy without reading the whole history
+            while len(in_flight) < workers * 2:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                in_flight[pool.submit(_score_chunk, chunk)] = sum(len(item["qa"]) for item in chunk)
+            if not in_flight:
+                break
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                rows = fut.result()
+                writer.writerows(rows)
+                f.flush()  # checkpoint: these rows are skipped on resume
+                scored += len(rows)
+                answers += in_flight.pop(fut)
+            if progress is not None:
+                progress(scored, answers, time.monotonic() - started)
+
+    return {
+        "output": out_path,
+        "tag": tag,
+        "skipped": len(done),
+        "rescored": scored,
+        "answers": answers,
+        "seconds": round(time.monotonic() - started, 2),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m core.rescore", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--source", choices=SOURCES, default="performances")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--chunk", type=int, default=200, help="interviews per task")
+    parser.add_argument("--restart", action="store_true", help="discard earlier output for this version")
+    args = parser.parse_args()
+
+    def report(rows: int, answers: int, elapsed: float):
+        print(f"\r{rows} interviews, {answers} answers, {answers / max(elapsed, 1e-9):.0f} answers/s", end="", file=sys.stderr)
+
+    result = rescore(args.source, args.workers, args.chunk, args.restart, progress=report)
+    print(file=sys.stderr)
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,122 @@
+# core/score_stats.py
+"""
+Running score aggregates per role and per tech, kept next to the performance rows.
+
+Scores are integers in 0..100, so each aggregate is a 101-bucket histogram: count, mean and any
+quantile come straight from it (exactly, not approximately), an update is one upsert per bucket
+touched and a query reads at most 101 rows however much history exists. Histograms only add up,
+so rebuilding from the stored rows in any order reproduces the same numbers.
+"""
+import math
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+SCORE_BUCKETS = 101  # one per integer score 0..100
+DIMENSIONS = ("all", "role", "tech")
+
+
+def role_key(role: str) -> str:
+    return " ".join((role or "").lower().split())
+
+
+def split_techs(tech_stack: str) -> List[str]:
+    return [t.strip().lower() for t in (tech_stack or "").split(",") if t.strip()]
+
+
+def _bucket(score) -> Optional[int]:
+    try:
+        value = float(score)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(value):
+        return None
+    return min(SCORE_BUCKETS - 1, max(0, int(round(value))))
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS score_stats ("
+        "dim TEXT, key TEXT, bucket INTEGER, n INTEGER, PRIMARY KEY (dim, key, bucket)) WITHOUT ROWID"
+    )
+
+
+def _increments(rows: Iterable[Dict[str, Any]]) -> Dict[tuple, int]:
+    counts: Dict[tuple, int] = {}
+    for row in rows:
+        b = _bucket(row.get("score"))
+        if b is None:
+            continue
+        keys = [("all", ""), ("role", role_key(row.get("role")))]
+        keys += [("tech", t) for t in dict.fromkeys(split_techs(row.get("tech_stack")))]
+        for dim, key in keys:
+            counts[(dim, key, b)] = counts.get((dim, key, b), 0) + 1
+    return counts
+
+
+def record(conn: sqlite3.Connection, rows: Iterable[Dict[str, Any]]):
+    """Add performance rows to the aggregates; runs inside the caller's transaction."""
+    conn.executemany(
+        "INSERT INTO score_stats (dim, key, bucket, n) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (dim, key, bucket) DO UPDATE SET n = n + excluded.n",
+        [(dim, key, b, n) for (dim, key, b), n in _increments(rows).items()],
+    )
+
+
+def rebuild(conn: sqlite3.Connection, rows: Iterable[Dict[str, Any]]) -> int:
+    """Replace the aggregates with ones computed from `rows`; returns the number of rows counted."""
+    conn.execute("DELETE FROM score_stats")
+    counted = 0
+    batch: List[Dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= 5000:
+            record(conn, batch)
+            counted += len(batch)
+            batch = []
+    record(conn, batch)
+    return counted + len(batch)
+
+
+def _quantile(hist: List[int], count: int, q: float) -> int:
+    # nearest rank: the smallest score with at least ceil(q * count) scores at or below it
+    rank = max(1, math.ceil(q * count))
+    seen = 0
+    for score, n in enumerate(hist):
+        seen += n
+        if seen >= rank:
+            return score
+    return SCORE_BUCKETS - 1
+
+
+def histogram(scores: Iterable[Any]) -> List[int]:
+    """Bucket counts of `scores` (unparseable ones skipped), in the form summarize() takes."""
+    hist = [0] * SCORE_BUCKETS
+    for score in scores:
+        b = _bucket(score)
+        if b is not None:
+            hist[b] += 1
+    return hist
+
+
+def summarize(hist: List[int], quantiles=(0.5, 0.9)) -> Dict[str, Any]:
+    count = sum(hist)
+    out: Dict[str, Any] = {"count": count}
+    if count:
+        out["mean"] = sum(score * n for score, n in enumerate(hist)) / count
+        for q in quantiles:
+            out[f"p{int(round(q * 100))}"] = _quantile(hist, count, q)
+    return out
+
+
+def query(conn: sqlite3.Connection, dim: str, key: str = "") -> Dict[str, Any]:
+    if dim not in DIMENSIONS:
+        raise ValueError(f"unknown dimension {dim!r}; expected one of {DIMENSIONS}")
+    key = role_key(key) if dim == "role" else (key or "").strip().lower()
+    hist = [0] * SCORE_BUCKETS
+    for b, n in conn.execute("SELECT bucket, n FROM score_stats WHERE dim = ? AND key = ?", (dim, key)):
+        hist[b] = n
+    return summarize(hist)
+
+
+def keys(conn: sqlite3.Connection, dim: str) -> List[str]:
+    return [k for (k,) in conn.execute("SELECT DISTINCT key FROM score_stats WHERE dim = ? ORDER BY key", (dim,))]
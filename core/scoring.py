@@ -0,0 +1,67 @@
+# core/scoring.py
+import os
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from core.evaluator import grade_qa_batch
+
+# Shared by every Streamlit session in the process
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SCORING_WORKERS", "4")),
+    thread_name_prefix="answer-scoring",
+)
+
+
+def _cancel_pending(entries: List[Tuple[Dict[str, str], Future]]):
+    for _, fut in entries:
+        fut.cancel()
+
+
+def _grade_one(evaluator_llm, eval_prompt, qa: Dict[str, str]) -> Dict[str, Any]:
+    # grade_qa_batch scores every item independently, so a one-item batch gives the same dict
+    return grade_qa_batch(evaluator_llm, eval_prompt, [qa])[0]
+
+
+class BackgroundScorer:
+    """
+    Scores interview answers on a worker pool as soon as they are given.
+
+    submit() is called once per answer; collect() then only waits for the futures that are still
+    running. Answers that were never submitted (or whose future was cancelled) are graded inline,
+    so collect() always returns exactly what grade_qa_batch would for the same list.
+    Queued work is cancelled when the scorer is cancelled or garbage-collected with its session.
+    """
+
+    def __init__(self, evaluator_llm=None, eval_prompt=None):
+        self.evaluator_llm = evaluator_llm
+        self.eval_prompt = eval_prompt
+        self._entries: List[Tuple[Dict[str, str], Future]] = []
+        self._finalizer = weakref.finalize(self, _cancel_pending, self._entries)
+
+    def submit(self, qa: Dict[str, str]) -> Future:
+        qa = dict(qa)
+        fut = _EXECUTOR.submit(_grade_one, self.evaluator_llm, self.eval_prompt, qa)
+        self._entries.append((qa, fut))
+        return fut
+
+    def collect(self, qa_list: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        results: List[Any] = [None] * len(qa_list)
+        missing: List[int] = []
+        for i, qa in enumerate(qa_list):
+            entry = self._entries[i] if i < len(self._entries) else None
+            if entry is None or entry[0] != qa or entry[1].cancelled():
+                missing.append(i)
+                continue
+            try:
+                results[i] = entry[1].result()
+            except Exception:
+                missing.append(i)
+        if missing:
+            graded = grade_qa_batch(self.evaluator_llm, self.eval_prompt, [qa_list[i] for i in missing])
+            for i, r in zip(missing, graded):
+                results[i] = r
+        return results
+
+    def cancel(self):
+        self._finalizer()
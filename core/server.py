@@ -0,0 +1,325 @@
+# core/server.py
+"""
+HTTP / WebSocket front-end for InterviewSession, on the standard library's asyncio.
+
+    POST /sessions                      body {"resume_token": ...} optional, resumes the checkpointed
+                                        interview it was issued for -> {"session_id", "messages", ...snapshot}
+    POST /sessions/<id>/messages        body {"text": "..."} -> {"messages", ...snapshot}
+    GET  /sessions/<id>                 -> snapshot + chat history
+    GET  /sessions/<id>/ws              WebSocket: send text (or {"text": ...}), receive one JSON reply per turn
+    GET  /healthz
+
+The event loop only parses requests and moves bytes. Each turn runs on a worker thread, because
+it may wait on the model (first question, scoring), so one process serves many interviews at
+once. Turns of one session are serialized; idle sessions are dropped after SESSION_IDLE_S.
+With SESSION_STORE set, every turn is written to the shared store and a session this replica
+has not seen (or has dropped) is loaded from it, so requests can land on any replica.
+
+    python -m core.server [--host 127.0.0.1] [--port 8080]
+"""
+import os
+import json
+import time
+import base64
+import asyncio
+import hashlib
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from core.flow import InterviewSession, Phase, question_tier_metrics
+from core.llm import llm_queue_metrics
+from core.session_store import get_session_store
+
+SERVICE_THREADS = int(os.getenv("SERVICE_THREADS", "128"))
+SERVICE_MAX_SESSIONS = int(os.getenv("SERVICE_MAX_SESSIONS", "2000"))
+SESSION_IDLE_S = float(os.getenv("SESSION_IDLE_S", "3600"))
+MAX_BODY_BYTES = 64 * 1024
+
+WELCOME = (
+    "Welcome to TalentScout! I'm your AI Interview Assistant. Say hi/hello to begin, share your basic "
+    "details (name, email, experience, role, tech stack), then answer 10 technical questions."
+)
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            409: "Conflict", 413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+class _Entry:
+    __slots__ = ("session", "lock", "last_seen")
+
+    def __init__(self, session: InterviewSession):
+        self.session = session
+        self.lock = asyncio.Lock()
+        self.last_seen = time.monotonic()
+
+
+class InterviewService:
+    def __init__(self, threads: int = SERVICE_THREADS, max_sessions: int = SERVICE_MAX_SESSIONS,
+                 idle_s: float = SESSION_IDLE_S, session_factory=InterviewSession, store=None):
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="interview-turn")
+        self._sessions: Dict[str, _Entry] = {}
+        self._max_sessions = max_sessions
+        self._idle_s = idle_s
+        self._factory = session_factory
+        self._store = get_session_store() if store is None else store
+
+    async def create(self, resume_token: Optional[str] = None) -> Tuple[str, InterviewSession]:
+        if len(self._sessions) >= self._max_sessions:
+            raise OverflowError("too many active interviews")
+        sid = secrets.token_urlsafe(16)
+        # building a session may read the store or a checkpoint, so it runs on a worker like a turn
+        loop = asyncio.get_running_loop()
+        session = await loop.run_in_executor(self._pool, self._start, sid, resume_token)
+        self._sessions[sid] = _Entry(session)
+        return sid, session
+
+    def _start(self, sid: str, resume_token: Optional[str]) -> InterviewSession:
+        session = self._factory(store=self._store, session_id=sid)
+        if not (resume_token and session.resume(resume_token)):
+            session.start()
+        return session
+
+    async def get(self, sid: str) -> Optional[_Entry]:
+        entry = self._sessions.get(sid)
+        if entry is None and self._store is not None and len(self._sessions) < self._max_sessions:
+            loop = asyncio.get_running_loop()
+            session = await loop.run_in_executor(self._pool, partial(self._factory, store=self._store, session_id=sid))
+            if session.restored:
+                # another request for the same session may have loaded it meanwhile
+                entry = self._sessions.setdefault(sid, _Entry(session))
+        if entry is not None:
+            entry.last_seen = time.monotonic()
+        return entry
+
+    @staticmethod
+    def _turn(session: InterviewSession, text: str) -> Optional[List[str]]:
+        # another replica may have handled the previous turns of this session
+        session.refresh()
+        if not session.accepts_input:
+            return None
+        return session.handle(text)
+
+    async def turn(self, entry: _Entry, text: str) -> Optional[Dict[str, Any]]:
+        """One candidate message; None if the interview is not accepting answers."""
+        async with entry.lock:
+            loop = asyncio.get_running_loop()
+            messages = await loop.run_in_executor(self._pool, self._turn, entry.session, text)
+            entry.last_seen = time.monotonic()
+            if messages is None:
+                return None
+            return {"messages": messages, **entry.session.snapshot()}
+
+    async def reap_idle(self, every_s: float = 60.0):
+        while True:
+            await asyncio.sleep(every_s)
+            cutoff = time.monotonic() - self._idle_s
+            for sid, entry in list(self._sessions.items()):
+                if entry.last_seen < cutoff and not entry.lock.locked():
+                    del self._sessions[sid]
+                    entry.session.close()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                if headers.get("upgrade", "").lower() == "websocket":
+                    await self._websocket(path, headers, reader, writer)
+                    break
+                status, payload = await self._route(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                _write_json(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        parts = [p for p in urlsplit(path).path.split("/") if p]
+        if parts == ["healthz"]:
+            return 200, {
+                "ok": True,
+                "sessions": len(self._sessions),
+                "llm_queue": llm_queue_metrics(),
+                "question_tiers": question_tier_metrics(),
+            }
+        if not parts or parts[0] != "sessions":
+            return 404, {"error": "not found"}
+        if len(parts) == 1:
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            try:
+                resume_token = json.loads(body or b"{}").get("resume_token")
+            except (ValueError, AttributeError):
+                resume_token = None
+            if not isinstance(resume_token, str):
+                resume_token = None
+            try:
+                sid, session = await self.create(resume_token)
+            except OverflowError as exc:
+                return 503, {"error": str(exc)}
+            resumed = resume_token is not None and session.phase == Phase.INTERVIEW
+            messages = [session.state["chat_history"][-1][1]] if resumed else [WELCOME]
+            return 201, {"session_id": sid, "messages": messages, **session.snapshot()}
+        entry = await self.get(parts[1])
+        if entry is None:
+            return 404, {"error": "unknown session"}
+        if len(parts) == 2 and method == "GET":
+            await asyncio.get_running_loop().run_in_executor(self._pool, entry.session.refresh)
+            return 200, {**entry.session.snapshot(), "chat_history": entry.session.state["chat_history"]}
+        if len(parts) == 3 and parts[2] == "messages" and method == "POST":
+            try:
+                text = json.loads(body or b"{}").get("text")
+            except (ValueError, AttributeError):
+                text = None
+            if not isinstance(text, str) or not text.strip():
+                return 400, {"error": "body must be JSON with a non-empty 'text'"}
+            result = await self.turn(entry, text)
+            if result is None:
+                return 409, {"error": "interview is not accepting answers", **entry.session.snapshot()}
+            return 200, result
+        return 405, {"error": "method not allowed"}
+
+    async def _websocket(self, path: str, headers: Dict[str, str], reader, writer):
+        parts = [p for p in urlsplit(path).path.split("/") if p]
+        entry = await self.get(parts[1]) if len(parts) == 3 and parts[0] == "sessions" and parts[2] == "ws" else None
+        key = headers.get("sec-websocket-key")
+        if entry is None or not key:
+            _write_json(writer, 404 if entry is None else 400, {"error": "bad websocket request"}, False)
+            await writer.drain()
+            return
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+        )
+        await _ws_send(writer, json.dumps(entry.session.snapshot()))
+        while True:
+            frame = await _ws_read_message(reader, writer)
+            if frame is None:
+                return
+            try:
+                data = json.loads(frame)
+                text = data.get("text") if isinstance(data, dict) else frame
+            except ValueError:
+                text = frame
+            if not isinstance(text, str) or not text.strip():
+                await _ws_send(writer, json.dumps({"error": "empty message"}))
+            else:
+                result = await self.turn(entry, text)
+                if result is None:
+                    result = {"error": "interview is not accepting answers", **entry.session.snapshot()}
+                await _ws_send(writer, json.dumps(result, ensure_ascii=False))
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line:
+        return None
+    method, path, _ = line.decode("latin-1").split(" ", 2)
+    headers: Dict[str, str] = {}
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = h.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY_BYTES:
+        raise ValueError("body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+
+def _write_json(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], keep_alive: bool):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    writer.write(
+        (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\nContent-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        ).encode("latin-1")
+        + body
+    )
+
+
+async def _ws_send(writer: asyncio.StreamWriter, text: str, opcode: int = 0x1):
+    payload = text.encode("utf-8") if isinstance(text, str) else text
+    n = len(payload)
+    if n < 126:
+        header = bytes([0x80 | opcode, n])
+    elif n < 1 << 16:
+        header = bytes([0x80 | opcode, 126]) + n.to_bytes(2, "big")
+    else:
+        header = bytes([0x80 | opcode, 127]) + n.to_bytes(8, "big")
+    writer.write(header + payload)
+    await writer.drain()
+
+
+async def _ws_read_message(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Optional[str]:
+    """Next complete text message (fragments joined; pings answered); None once the peer closes."""
+    parts = []
+    while True:
+        b1, b2 = await reader.readexactly(2)
+        fin, opcode = b1 & 0x80, b1 & 0x0F
+        n = b2 & 0x7F
+        if n == 126:
+            n = int.from_bytes(await reader.readexactly(2), "big")
+        elif n == 127:
+            n = int.from_bytes(await reader.readexactly(8), "big")
+        if n > MAX_BODY_BYTES:
+            return None
+        mask = await reader.readexactly(4) if b2 & 0x80 else None
+        payload = await reader.readexactly(n)
+        if mask:
+            payload = bytes(c ^ mask[i % 4] for i, c in enumerate(payload))
+        if opcode == 0x8:
+            await _ws_send(writer, payload[:2], 0x8)
+            return None
+        if opcode == 0x9:
+            await _ws_send(writer, payload, 0xA)
+            continue
+        if opcode in (0x1, 0x2, 0x0):
+            parts.append(payload)
+            if fin:
+                return b"".join(parts).decode("utf-8", "replace")
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8080, service: Optional[InterviewService] = None):
+    service = service or InterviewService()
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    reaper = asyncio.create_task(service.reap_idle())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        reaper.cancel()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from core.llm import start_warmup
+    from core.storage import ensure_data_dirs
+
+    parser = argparse.ArgumentParser(prog="python -m core.server", description="TalentScout interview service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    ensure_data_dirs()
+    start_warmup()
+    print(f"serving interviews on http://{args.host}:{args.port}")
+    asyncio.run(serve(args.host, args.port))
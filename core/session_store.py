@@ -0,0 +1,271 @@
+# core/session_store.py
+"""
+Interview state kept outside the serving process, so any replica can continue an interview.
+
+A session is the set of fields init_session_state sets up (plus the final performance). After
+every turn only what changed is written: new chat messages, answers and questions are appended
+as items, other fields are overwritten when their value differs. Every write bumps the session's
+version and only succeeds against the version the writer last saw, so a replica holding an
+older copy reloads instead of overwriting a newer turn. SESSION_STORE picks the
+backend: "sqlite" (data/sessions.db, shareable by replicas on one host or a shared volume),
+"memory" (process-local stand-in) or "none" (default; state lives in st.session_state only).
+"""
+import os
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.storage import DATA_DIR
+
+SESSION_STORE = os.getenv("SESSION_STORE", "none").lower()
+SESSION_STORE_PATH = os.path.join(DATA_DIR, "sessions.db")
+SESSION_TTL_DAYS = float(os.getenv("SESSION_TTL_DAYS", "7"))
+
+PERSISTED_FIELDS = (
+    "phase", "pending_field", "candidate", "questions", "question_sources", "current_q", "answers", "chat_history",
+    "question_tier", "resume_token", "performance",
+)
+# only ever appended to during an interview, so they are stored item by item
+LIST_FIELDS = ("questions", "question_sources", "answers", "chat_history")
+
+Delta = List[Tuple[str, str, Any]]  # ("set", field, value) | ("append", field, [items])
+
+
+def _decode(field: str, value: Any) -> Any:
+    if field == "chat_history":
+        return [tuple(m) for m in value]
+    return value
+
+
+class MemorySessionStore:
+    """Process-local stand-in with the same delta and version semantics as the SQLite store."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._versions: Dict[str, int] = {}
+
+    def version(self, session_id: str) -> Optional[int]:
+        with self._lock:
+            return self._versions.get(session_id)
+
+    def load(self, session_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        with self._lock:
+            data = self._sessions.get(session_id)
+            if data is None:
+                return None
+            # round-trip through JSON so callers never share objects with the store
+            return self._versions[session_id], {k: _decode(k, json.loads(v)) for k, v in data.items()}
+
+    def apply(self, session_id: str, delta: Delta, expected_version: int) -> Optional[int]:
+        """Write delta if the session is still at expected_version; the new version, or None."""
+        with self._lock:
+            if self._versions.get(session_id, 0) != expected_version:
+                return None
+            data = self._sessions.setdefault(session_id, {})
+            for op, field, value in delta:
+                if op == "append":
+                    value = json.loads(data.get(field, "[]")) + value
+                data[field] = json.dumps(value, ensure_ascii=False)
+            self._versions[session_id] = expected_version + 1
+            return expected_version + 1
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._versions.pop(session_id, None)
+
+
+class SQLiteSessionStore:
+    def __init__(self, path: str = SESSION_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, version INTEGER NOT NULL, updated_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_fields ("
+            "session_id TEXT, field TEXT, value TEXT, PRIMARY KEY (session_id, field)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_items ("
+            "session_id TEXT, field TEXT, seq INTEGER, value TEXT, PRIMARY KEY (session_id, field, seq)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def version(self, session_id: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute("SELECT version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def load(self, session_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        with self._lock:
+            # one read transaction, so a concurrent write by another replica is seen whole or not at all
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute("SELECT version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+                if row is None:
+                    return None
+                data: Dict[str, Any] = {f: [] for f in LIST_FIELDS}
+                for field, value in self._conn.execute(
+                    "SELECT field, value FROM session_fields WHERE session_id = ?", (session_id,)
+                ):
+                    data[field] = json.loads(value)
+                for field, value in self._conn.execute(
+                    "SELECT field, value FROM session_items WHERE session_id = ? ORDER BY field, seq", (session_id,)
+                ):
+                    data[field].append(json.loads(value))
+            finally:
+                self._conn.commit()
+        return row[0], {k: _decode(k, v) for k, v in data.items()}
+
+    def apply(self, session_id: str, delta: Delta, expected_version: int) -> Optional[int]:
+        """Write delta if the session is still at expected_version; the new version, or None."""
+        with self._lock, self._conn:
+            if expected_version == 0:
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO sessions (session_id, version, updated_at) VALUES (?, 1, ?)",
+                    (session_id, time.time()),
+                )
+            else:
+                cur = self._conn.execute(
+                    "UPDATE sessions SET version = version + 1, updated_at = ? WHERE session_id = ? AND version = ?",
+                    (time.time(), session_id, expected_version),
+                )
+            if cur.rowcount == 0:
+                return None  # another replica wrote first
+            for op, field, value in delta:
+                if field not in LIST_FIELDS:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO session_fields (session_id, field, value) VALUES (?, ?, ?)",
+                        (session_id, field, json.dumps(value, ensure_ascii=False)),
+                    )
+                    continue
+                if op == "set":
+                    self._conn.execute("DELETE FROM session_items WHERE session_id = ? AND field = ?", (session_id, field))
+                    start = 0
+                else:
+                    (start,) = self._conn.execute(
+                        "SELECT COALESCE(MAX(seq) + 1, 0) FROM session_items WHERE session_id = ? AND field = ?",
+                        (session_id, field),
+                    ).fetchone()
+                self._conn.executemany(
+                    "INSERT INTO session_items (session_id, field, seq, value) VALUES (?, ?, ?, ?)",
+                    [(session_id, field, start + i, json.dumps(v, ensure_ascii=False)) for i, v in enumerate(value)],
+                )
+            return expected_version + 1
+
+    def delete(self, session_id: str):
+        with self._lock, self._conn:
+            for table in ("session_items", "session_fields", "sessions"):
+                self._conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+
+    def purge_expired(self) -> int:
+        cutoff = time.time() - SESSION_TTL_DAYS * 86400
+        with self._lock:
+            ids = [r[0] for r in self._conn.execute("SELECT session_id FROM sessions WHERE updated_at < ?", (cutoff,))]
+        for sid in ids:
+            self.delete(sid)
+        return len(ids)
+
+
+class SessionSync:
+    """
+    Remembers what one session last wrote to (or read from) a store, and at which version, and
+    turns the current state into the delta since then. Kept in the session state itself, so it
+    survives Streamlit reruns.
+    """
+
+    def __init__(self, store, session_id: str):
+        self.store = store
+        self.session_id = session_id
+        self.version = 0
+        self._last: Dict[str, Any] = {}
+
+    @staticmethod
+    def _plain(field: str, value: Any) -> Any:
+        if field == "questions" and not isinstance(value, list):
+            return value.snapshot()  # QuestionStream: the questions known so far
+        if field in LIST_FIELDS:
+            return [list(v) if isinstance(v, tuple) else v for v in value]
+        return value
+
+    @staticmethod
+    def _mark(field: str, value: Any) -> Any:
+        # what later states are compared against: a copy for lists, the encoding otherwise
+        return list(value) if field in LIST_FIELDS else json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+    def load(self, state) -> bool:
+        loaded = self.store.load(self.session_id)
+        if loaded is None:
+            return False
+        self.version, data = loaded
+        self._last = {}
+        for field in PERSISTED_FIELDS:
+            if field in data:
+                state[field] = data[field]
+                self._last[field] = self._mark(field, self._plain(field, data[field]))
+            elif field in state and field not in LIST_FIELDS:
+                del state[field]
+        return True
+
+    def stale(self) -> bool:
+        """True when another replica has written the session since we last read or wrote it."""
+        version = self.store.version(self.session_id)
+        return version is not None and version != self.version
+
+    def delta(self, state) -> Tuple[Delta, Dict[str, Any]]:
+        ops: Delta = []
+        marks: Dict[str, Any] = {}
+        for field in PERSISTED_FIELDS:
+            if field not in state:
+                continue
+            value = self._plain(field, state[field])
+            mark = self._mark(field, value)
+            last = self._last.get(field)
+            if mark == last:
+                continue
+            if field in LIST_FIELDS and last is not None and len(value) > len(last) and value[: len(last)] == last:
+                ops.append(("append", field, value[len(last):]))
+            else:
+                ops.append(("set", field, value))
+            marks[field] = mark
+        return ops, marks
+
+    def commit(self, state) -> int:
+        """
+        Write what changed since the last commit; returns the number of changed fields. If another
+        replica wrote the session in the meantime, its state wins: it is loaded and 0 returned.
+        """
+        ops, marks = self.delta(state)
+        if not ops:
+            return 0
+        version = self.store.apply(self.session_id, ops, self.version)
+        if version is None:
+            self.load(state)
+            return 0
+        self.version = version
+        self._last.update(marks)
+        return len(ops)
+
+
+_STORE_LOCK = threading.Lock()
+_STORE = None
+
+
+def get_session_store():
+    """Process-wide store selected by SESSION_STORE; None when sessions are kept in memory only."""
+    global _STORE
+    if SESSION_STORE not in ("sqlite", "memory"):
+        return None
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = SQLiteSessionStore() if SESSION_STORE == "sqlite" else MemorySessionStore()
+    return _STORE
@@ -1,33 +1,233 @@
 import os
+import re
+import csv
 import json
-import pandas as pd
+import sqlite3
+import atexit
+import threading
+from concurrent.futures import Future
 from datetime import datetime
-from typing import Dict, List
+from typing import Any, Dict, Iterator, List, Optional
+
+from core import score_stats
+from core.locks import file_lock
+from core.write_behind import WriteBehindQueue
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 INTERVIEWS_DIR = os.path.join(DATA_DIR, "interviews")
+# where an unfinished interview stands (questions, current question, answers), per candidate
+CHECKPOINTS_DIR = os.path.join(DATA_DIR, "checkpoints")
 CANDIDATES_CSV = os.path.join(DATA_DIR, "candidates.csv")
 PERF_CSV = os.path.join(DATA_DIR, "performances.csv")
+DB_PATH = os.path.join(DATA_DIR, "talentscout.db")
+# score aggregates for the CSV backend (the SQLite backend keeps them in DB_PATH)
+STATS_DB_PATH = os.path.join(DATA_DIR, "score_stats.db")
+
+# "csv" keeps the flat files recruiters already open in a spreadsheet (append-only writes),
+# "sqlite" stores the same rows in an embedded WAL database.
+STORAGE_BACKEND = os.getenv("TALENTSCOUT_STORAGE", "csv").lower()
+# Writes are applied by a background thread in group commits unless STORAGE_WRITE_BEHIND=0.
+STORAGE_WRITE_BEHIND = os.getenv("STORAGE_WRITE_BEHIND", "1") not in ("0", "false", "off")
+# "flush": a commit is confirmed once handed to the OS; "fsync": once it is on disk.
+STORAGE_DURABILITY = os.getenv("STORAGE_DURABILITY", "flush").lower()
+STORAGE_QUEUE_SIZE = int(os.getenv("STORAGE_QUEUE_SIZE", "1000"))
+STORAGE_GROUP_COMMIT_MS = float(os.getenv("STORAGE_GROUP_COMMIT_MS", "5"))
+
+CANDIDATE_COLUMNS = ["id", "name", "email", "experience", "desired_position", "tech_stack", "created_at"]
+PERF_COLUMNS = ["id", "name", "email", "role", "tech_stack", "score", "breakdown", "created_at"]
+
+_TABLES = {
+    "candidates": (CANDIDATES_CSV, CANDIDATE_COLUMNS),
+    "performances": (PERF_CSV, PERF_COLUMNS),
+}
+
+_local = threading.local()
+
+
+def _connect() -> sqlite3.Connection:
+    # One connection per thread: Streamlit runs each session's script in its own thread.
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        # several worker processes may write at once: wait for their transactions instead of failing
+        conn = sqlite3.connect(DB_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL" if STORAGE_DURABILITY == "fsync" else "PRAGMA synchronous=NORMAL")
+        _local.conn = conn
+    return conn
+
+
+def _ensure_sqlite_schema():
+    conn = _connect()
+    with conn:
+        for table, (_, columns) in _TABLES.items():
+            cols = ", ".join(f"{c} TEXT" if c != "score" else f"{c} INTEGER" for c in columns)
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (rowid INTEGER PRIMARY KEY, {cols})")
+        score_stats.ensure_schema(conn)
+
+
+def _stats_conn() -> sqlite3.Connection:
+    if STORAGE_BACKEND == "sqlite":
+        return _connect()
+    conn = getattr(_local, "stats_conn", None)
+    if conn is None:
+        conn = sqlite3.connect(STATS_DB_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL" if STORAGE_DURABILITY == "fsync" else "PRAGMA synchronous=NORMAL")
+        with conn:
+            score_stats.ensure_schema(conn)
+        _local.stats_conn = conn
+    return conn
+
+
+def _ensure_csv(path: str, columns: List[str]):
+    # exclusive create: a second worker starting at the same time must not truncate the file
+    try:
+        with open(path, "x", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerow(columns)
+    except FileExistsError:
+        pass
+
 
 def ensure_data_dirs():
     os.makedirs(DATA_DIR, exist_ok=True)
     os.makedirs(INTERVIEWS_DIR, exist_ok=True)
-    
-    if not os.path.exists(CANDIDATES_CSV):
-        pd.DataFrame(
-            columns=["id", "name", "email", "experience", "desired_position", "tech_stack", "created_at"]
-        ).to_csv(CANDIDATES_CSV, index=False)
-    
-    if not os.path.exists(PERF_CSV):
-        pd.DataFrame(
-            columns=["id", "name", "email", "role", "tech_stack", "score", "breakdown", "created_at"]
-        ).to_csv(PERF_CSV, index=False)
-
-def upsert_candidate(cand: Dict):
-    df = pd.read_csv(CANDIDATES_CSV)
+    os.makedirs(CHECKPOINTS_DIR, exist_ok=True)
+
+    if STORAGE_BACKEND == "sqlite":
+        _ensure_sqlite_schema()
+    else:
+        _ensure_csv(CANDIDATES_CSV, CANDIDATE_COLUMNS)
+        _ensure_csv(PERF_CSV, PERF_COLUMNS)
+    _bootstrap_performance_stats()
+
+
+def _append_rows(table: str, rows: List[Dict]):
+    csv_path, columns = _TABLES[table]
+    if STORAGE_BACKEND == "sqlite":
+        conn = _connect()
+        with conn:
+            conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                [[row.get(c) for c in columns] for row in rows],
+            )
+            if table == "performances":
+                score_stats.record(conn, rows)
+    else:
+        # true append: cost is the new rows only, regardless of how much history the file holds;
+        # the lock keeps rows from concurrent worker processes from interleaving
+        with file_lock(csv_path), open(csv_path, "a", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerows([row.get(c) for c in columns] for row in rows)
+            if STORAGE_DURABILITY == "fsync":
+                f.flush()
+                os.fsync(f.fileno())
+            if table == "performances":
+                # still under the CSV lock, so a concurrent rebuild sees rows and aggregates agree
+                try:
+                    conn = _stats_conn()
+                    with conn:
+                        score_stats.record(conn, rows)
+                except Exception:
+                    pass  # the rows are saved; `python -m core.storage rebuild-stats` repairs the aggregates
+
+
+def _apply_writes(ops: List[tuple]) -> List[Optional[BaseException]]:
+    """
+    Group commit for a batch of queued writes. Rows for the same table go out in one append /
+    transaction; of several transcript snapshots for one candidate only the newest is written
+    (each is a superset of the earlier ones), and likewise only the last checkpoint write or
+    removal per interview is applied.
+    """
+    errors: List[Optional[BaseException]] = [None] * len(ops)
+    by_table: Dict[str, List[int]] = {}
+    for i, op in enumerate(ops):
+        if op[0] == "row":
+            by_table.setdefault(op[1], []).append(i)
+    # newest snapshot per candidate between two closes; scanning backwards finds it first
+    newest_chat = set()
+    seen = set()
+    for i in range(len(ops) - 1, -1, -1):
+        if ops[i][0] == "chat" and ops[i][1] not in seen:
+            newest_chat.add(i)
+            seen.add(ops[i][1])
+        elif ops[i][0] == "close_chat":
+            seen.discard(ops[i][1])
+    last_checkpoint = {}
+    for i, op in enumerate(ops):
+        if op[0] in ("checkpoint", "drop_checkpoint"):
+            last_checkpoint[op[1]] = i
+    last_checkpoint = set(last_checkpoint.values())
+
+    for table, idxs in by_table.items():
+        try:
+            _append_rows(table, [ops[i][2] for i in idxs])
+        except Exception as exc:
+            for i in idxs:
+                errors[i] = exc
+
+    for i, op in enumerate(ops):
+        try:
+            if op[0] == "chat" and i in newest_chat:
+                _writer(op[1]).append(op[2])
+            elif op[0] == "close_chat":
+                _close_writer(op[1])
+            elif op[0] == "checkpoint" and i in last_checkpoint:
+                _write_checkpoint(op[1], op[2])
+            elif op[0] == "drop_checkpoint" and i in last_checkpoint:
+                _drop_checkpoint(op[1])
+        except Exception as exc:
+            errors[i] = exc
+    return errors
+
+
+_write_queue = WriteBehindQueue(
+    _apply_writes,
+    maxsize=STORAGE_QUEUE_SIZE,
+    linger_s=STORAGE_GROUP_COMMIT_MS / 1000.0,
+    name="storage-writer",
+)
+
+
+def _submit(op: tuple) -> Future:
+    if STORAGE_WRITE_BEHIND:
+        return _write_queue.submit(op)
+    fut: Future = Future()
+    err = _apply_writes([op])[0]
+    if err is None:
+        fut.set_result(None)
+    else:
+        fut.set_exception(err)
+    return fut
+
+
+def flush_writes(timeout: Optional[float] = None) -> bool:
+    """Block until every queued write is committed; False if the timeout expired first."""
+    return _write_queue.flush(timeout)
+
+
+def write_queue_stats() -> Dict[str, Any]:
+    return {"pending": _write_queue.pending(), "batches": _write_queue.batches, "ops": _write_queue.ops}
+
+
+@atexit.register
+def _shutdown_writes():
+    _write_queue.close(timeout=30)
+
+
+def _iter_rows(table: str) -> Iterator[Dict]:
+    csv_path, columns = _TABLES[table]
+    if STORAGE_BACKEND == "sqlite":
+        cur = _connect().execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY rowid")
+        for values in cur:
+            yield dict(zip(columns, values))
+    elif os.path.exists(csv_path):
+        with open(csv_path, "r", encoding="utf-8", newline="") as f:
+            yield from csv.DictReader(f)
+
+
+def upsert_candidate(cand: Dict) -> Future:
     now = datetime.utcnow().isoformat()
-    
+
     row = {
         "id": cand.get("id"),
         "name": cand.get("name"),
@@ -37,15 +237,13 @@ def upsert_candidate(cand: Dict):
         "tech_stack": cand.get("tech_stack"),
         "created_at": now,
     }
-    
+
     # append-only (simple audit trail)
-    df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-    df.to_csv(CANDIDATES_CSV, index=False)
+    return _submit(("row", "candidates", row))
 
-def append_performance(candidate_id: str, name: str, email: str, role: str, tech_stack: str, score: int, breakdown_json: str):
-    df = pd.read_csv(PERF_CSV)
+def append_performance(candidate_id: str, name: str, email: str, role: str, tech_stack: str, score: int, breakdown_json: str) -> Future:
     now = datetime.utcnow().isoformat()
-    
+
     row = {
         "id": candidate_id,
         "name": name,
@@ -56,15 +254,281 @@ def append_performance(candidate_id: str, name: str, email: str, role: str, tech
         "breakdown": breakdown_json,
         "created_at": now,
     }
-    
-    df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-    df.to_csv(PERF_CSV, index=False)
-
-def save_chat_history(candidate_id: str, history: List[tuple]):
-    path = os.path.join(INTERVIEWS_DIR, f"{candidate_id}.json")
-    
-    # Convert tuples to dicts for clarity
-    records = [{"role": r, "content": c} for (r, c) in history]
-    
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(records, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+
+    return _submit(("row", "performances", row))
+
+def iter_candidates() -> Iterator[Dict]:
+    return _iter_rows("candidates")
+
+def iter_performances() -> Iterator[Dict]:
+    return _iter_rows("performances")
+
+def migrate_csv_to_sqlite() -> Dict[str, int]:
+    """
+    Copy rows from the legacy CSV files into the SQLite store.
+
+    Tables that already contain rows are skipped so the migration can be re-run safely.
+    Returns the number of rows copied per table.
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    _ensure_sqlite_schema()
+    conn = _connect()
+    copied: Dict[str, int] = {}
+    for table, (csv_path, columns) in _TABLES.items():
+        copied[table] = 0
+        if not os.path.exists(csv_path):
+            continue
+        if conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+            continue
+        with open(csv_path, "r", encoding="utf-8", newline="") as f, conn:
+            rows = ([r.get(c) or None for c in columns] for r in csv.DictReader(f))
+            cur = conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                rows,
+            )
+            copied[table] = cur.rowcount
+    if copied.get("performances"):
+        with conn:
+            score_stats.rebuild(conn, _iter_rows("performances"))
+    return copied
+
+
+def performance_stats(dim: str = "all", key: str = "") -> Dict[str, Any]:
+    """Count, mean, p50 and p90 of the scores overall, for one role or for one tech."""
+    return score_stats.query(_stats_conn(), dim, key)
+
+
+def performance_stat_keys(dim: str) -> List[str]:
+    return score_stats.keys(_stats_conn(), dim)
+
+
+def rebuild_performance_stats() -> int:
+    """Recompute the score aggregates from every stored performance row."""
+    if STORAGE_BACKEND == "sqlite":
+        _ensure_sqlite_schema()
+        conn = _connect()
+        with conn:
+            return score_stats.rebuild(conn, _iter_rows("performances"))
+    # hold the CSV lock so no append lands between reading the rows and replacing the aggregates
+    with file_lock(PERF_CSV):
+        conn = _stats_conn()
+        with conn:
+            return score_stats.rebuild(conn, _iter_rows("performances"))
+
+
+def _bootstrap_performance_stats():
+    # aggregates appear after history already exists (upgrade, deleted stats db): build them once
+    try:
+        conn = _stats_conn()
+        if conn.execute("SELECT 1 FROM score_stats LIMIT 1").fetchone():
+            return
+        if next(iter_performances(), None) is not None:
+            rebuild_performance_stats()
+    except Exception:
+        pass
+
+# Records appended between fsyncs of a transcript (1 = every write, 0 = leave it to the OS)
+TRANSCRIPT_FSYNC_EVERY = int(os.getenv("TRANSCRIPT_FSYNC_EVERY", "8"))
+
+
+def _transcript_path(candidate_id: str) -> str:
+    return os.path.join(INTERVIEWS_DIR, f"{candidate_id}.jsonl")
+
+
+def _legacy_transcript_path(candidate_id: str) -> str:
+    return os.path.join(INTERVIEWS_DIR, f"{candidate_id}.json")
+
+
+class _TranscriptWriter:
+    """Appends only the messages a transcript file does not have yet, one JSON record per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.unsynced = 0
+        self.count = 0
+        self.size = -1  # file size after our last write; anything else means another process wrote
+
+    def _resync(self):
+        self.count, self.size = 0, 0
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                data = f.read()
+            complete = data[: data.rfind(b"\n") + 1]
+            if len(complete) != len(data):
+                # drop a record torn by a crash so new appends start on a clean line
+                with open(self.path, "r+b") as f:
+                    f.truncate(len(complete))
+            self.count, self.size = complete.count(b"\n"), len(complete)
+
+    def _write(self, records: List[tuple], mode: str):
+        with open(self.path, mode, encoding="utf-8") as f:
+            f.writelines(json.dumps({"role": r, "content": c}, ensure_ascii=False) + "\n" for (r, c) in records)
+            f.flush()
+            self.unsynced += len(records)
+            if TRANSCRIPT_FSYNC_EVERY and self.unsynced >= TRANSCRIPT_FSYNC_EVERY:
+                os.fsync(f.fileno())
+                self.unsynced = 0
+            self.size = f.tell()
+
+    def append(self, history: List[tuple]):
+        with self.lock, file_lock(self.path):
+            current = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            if current != self.size:
+                self._resync()
+            if len(history) < self.count:
+                # history was reset under the same id; start the transcript over
+                self._write(history, "w")
+            elif len(history) > self.count:
+                self._write(history[self.count:], "a")
+            self.count = len(history)
+
+    def sync(self):
+        with self.lock:
+            if self.unsynced and os.path.exists(self.path):
+                with open(self.path, "a", encoding="utf-8") as f:
+                    os.fsync(f.fileno())
+            self.unsynced = 0
+
+
+_writers: Dict[str, _TranscriptWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def _writer(candidate_id: str) -> _TranscriptWriter:
+    with _writers_lock:
+        w = _writers.get(candidate_id)
+        if w is None:
+            w = _writers[candidate_id] = _TranscriptWriter(_transcript_path(candidate_id))
+        return w
+
+
+def save_chat_history(candidate_id: str, history: List[tuple]) -> Future:
+    # Append-only: per-call I/O is the new messages only, however long the conversation gets.
+    # The snapshot keeps later turns in the session from leaking into a queued write.
+    return _submit(("chat", candidate_id, list(history)))
+
+
+def _close_writer(candidate_id: str):
+    with _writers_lock:
+        w = _writers.pop(candidate_id, None)
+    if w is not None:
+        w.sync()
+
+
+def close_chat_history(candidate_id: str) -> Future:
+    """fsync any batched records and release the writer once an interview is over."""
+    return _submit(("close_chat", candidate_id))
+
+
+_CHECKPOINT_ID_RE = re.compile(r"[0-9A-Za-z_-]{1,64}")
+
+
+def _checkpoint_path(resume_token: str) -> str:
+    return os.path.join(CHECKPOINTS_DIR, f"{resume_token}.json")
+
+
+def _write_checkpoint(resume_token: str, payload: str):
+    path = _checkpoint_path(resume_token)
+    os.makedirs(CHECKPOINTS_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(payload)
+        if STORAGE_DURABILITY == "fsync":
+            f.flush()
+            os.fsync(f.fileno())
+    # readers see the previous checkpoint or this one, never a torn mix
+    os.replace(tmp, path)
+
+
+def _drop_checkpoint(resume_token: str):
+    try:
+        os.remove(_checkpoint_path(resume_token))
+    except FileNotFoundError:
+        pass
+
+
+def save_checkpoint(resume_token: str, checkpoint: Dict[str, Any]) -> Future:
+    """Replace the interview's checkpoint; serialized now, so later turns cannot leak in."""
+    payload = json.dumps({**checkpoint, "updated_at": datetime.utcnow().isoformat()}, ensure_ascii=False)
+    return _submit(("checkpoint", resume_token, payload))
+
+
+def drop_checkpoint(resume_token: str) -> Future:
+    return _submit(("drop_checkpoint", resume_token))
+
+
+def load_checkpoint(resume_token: str) -> Optional[Dict[str, Any]]:
+    """The last checkpoint of an unfinished interview, or None (also for malformed tokens)."""
+    if not resume_token or not _CHECKPOINT_ID_RE.fullmatch(resume_token):
+        return None
+    try:
+        with open(_checkpoint_path(resume_token), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_chat_history_file(path: str) -> List[tuple]:
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            records = []
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break  # torn final line after a crash
+        else:
+            records = json.load(f)
+    return [(rec.get("role"), rec.get("content")) for rec in records]
+
+
+def load_chat_history(candidate_id: str) -> List[tuple]:
+    """Reconstruct the [(role, content), ...] history, reading legacy .json transcripts too."""
+    for path in (_transcript_path(candidate_id), _legacy_transcript_path(candidate_id)):
+        if os.path.exists(path):
+            return read_chat_history_file(path)
+    return []
+
+
+def transcript_paths(interviews_dir: str = INTERVIEWS_DIR) -> List[str]:
+    """One transcript file per interview (.jsonl preferred over a legacy .json of the same id)."""
+    if not os.path.isdir(interviews_dir):
+        return []
+    by_id: Dict[str, str] = {}
+    for name in sorted(os.listdir(interviews_dir)):
+        stem, ext = os.path.splitext(name)
+        if ext == ".jsonl" or (ext == ".json" and stem not in by_id):
+            by_id[stem] = os.path.join(interviews_dir, name)
+    return [by_id[k] for k in sorted(by_id)]
+
+
+def iter_chat_histories(interviews_dir: str = INTERVIEWS_DIR) -> Iterator[tuple]:
+    """Yield (candidate_id, history) for every stored transcript."""
+    for path in transcript_paths(interviews_dir):
+        try:
+            yield os.path.splitext(os.path.basename(path))[0], read_chat_history_file(path)
+        except Exception:
+            continue
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    if args == ["migrate"]:
+        print(json.dumps(migrate_csv_to_sqlite()))
+    elif args == ["rebuild-stats"]:
+        print(json.dumps({"rows": rebuild_performance_stats()}))
+    elif args[:1] == ["stats"] and len(args) <= 3:
+        dim = args[1] if len(args) > 1 else "all"
+        if dim != "all" and len(args) == 2:
+            print(json.dumps({k: performance_stats(dim, k) for k in performance_stat_keys(dim)}, indent=2))
+        else:
+            print(json.dumps(performance_stats(dim, args[2] if len(args) > 2 else ""), indent=2))
+    else:
+        print("usage: python -m core.storage migrate | rebuild-stats | stats [all|role|tech] [KEY]")
+        sys.exit(2)
@@ -0,0 +1,146 @@
+# core/write_behind.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+# queued by flush(): resolved once every write ahead of it has been committed
+_FLUSH = object()
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue drained by one background thread that applies writes in groups.
+
+    submit() returns a Future that resolves once the write's group has been committed, so callers
+    can fire and forget or wait for a particular write. The worker takes whatever is queued (up to
+    max_batch, lingering up to linger_s for more) and hands it to apply_batch in one call; that
+    function returns one exception-or-None per op. A full queue blocks submitters (backpressure);
+    only the enqueue itself waits, never the queue's lock, so a blocked submitter holds up no one else.
+    """
+
+    def __init__(
+        self,
+        apply_batch: Callable[[List[Any]], List[Optional[BaseException]]],
+        maxsize: int = 1000,
+        max_batch: int = 256,
+        linger_s: float = 0.005,
+        name: str = "write-behind",
+    ):
+        self._apply_batch = apply_batch
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._max_batch = max_batch
+        self._linger_s = linger_s
+        self._name = name
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._enqueuing = 0  # submitters (and flushes) past the closed check, not yet enqueued
+        self._closed = False
+        self.batches = 0
+        self.ops = 0
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+
+    def submit(self, op: Any) -> Future:
+        fut: Future = Future()
+        self._enqueue(op, fut)
+        return fut
+
+    def _enqueue(self, op: Any, fut: Future, timeout: Optional[float] = None):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("write-behind queue is closed")
+            self._ensure_thread()
+            self._enqueuing += 1
+        try:
+            self._queue.put((op, fut), timeout=timeout)
+        finally:
+            with self._lock:
+                self._enqueuing -= 1
+                if not self._enqueuing:
+                    self._idle.notify_all()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self._linger_s
+            stop = False
+            while len(batch) < self._max_batch:
+                try:
+                    nxt = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch: List[tuple]):
+        writes = [(op, fut) for op, fut in batch if op is not _FLUSH]
+        if writes:
+            ops = [op for op, _ in writes]
+            try:
+                errors = self._apply_batch(ops)
+            except BaseException as exc:
+                errors = [exc] * len(ops)
+            self.batches += 1
+            self.ops += len(ops)
+            for (_, fut), err in zip(writes, errors):
+                if err is None:
+                    fut.set_result(None)
+                else:
+                    fut.set_exception(err)
+        for op, fut in batch:
+            if op is _FLUSH:
+                fut.set_result(None)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every write submitted so far is committed; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            thread = self._thread
+            closed = self._closed
+        if thread is None:
+            return True
+        if closed:
+            # close() queued its stop marker behind every write; the worker exits after them
+            thread.join(timeout)
+            return not thread.is_alive()
+        marker: Future = Future()
+        try:
+            self._enqueue(_FLUSH, marker, timeout)
+        except queue.Full:
+            return False
+        except RuntimeError:  # closed meanwhile
+            return self.flush(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        try:
+            marker.result(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            return True
+        except Exception:
+            return marker.done()
+
+    def close(self, timeout: Optional[float] = None):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            # writes already past the closed check go in ahead of the stop marker
+            self._idle.wait_for(lambda: not self._enqueuing)
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
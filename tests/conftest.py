@@ -0,0 +1,62 @@
+import os
+import threading
+
+# keep the process-wide caches out of the developer's data/ directory
+os.environ.setdefault("QUESTION_INDEX", "0")
+os.environ.setdefault("QUESTION_BANK", "0")
+os.environ.setdefault("EVAL_CACHE", "0")
+
+import pytest
+
+from core import storage
+
+
+class FakeLLM:
+    """Streams a numbered list of `n` questions; invoke() returns the same list in one piece."""
+
+    model = "fake"
+
+    def __init__(self, n: int = 10, prefix: str = "Generated question"):
+        self.n = n
+        self.prefix = prefix
+        self.calls = 0
+
+    def _lines(self):
+        return [f"{i}. {self.prefix} {i} about Python internals?\n" for i in range(1, self.n + 1)]
+
+    def stream(self, prompt):
+        self.calls += 1
+        for line in self._lines():
+            yield line
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return "".join(self._lines())
+
+
+@pytest.fixture
+def fake_llm():
+    return FakeLLM()
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(storage, "INTERVIEWS_DIR", str(tmp_path / "interviews"))
+    monkeypatch.setattr(storage, "CHECKPOINTS_DIR", str(tmp_path / "checkpoints"))
+    monkeypatch.setattr(storage, "CANDIDATES_CSV", str(tmp_path / "candidates.csv"))
+    monkeypatch.setattr(storage, "PERF_CSV", str(tmp_path / "performances.csv"))
+    monkeypatch.setattr(storage, "DB_PATH", str(tmp_path / "talentscout.db"))
+    monkeypatch.setattr(storage, "STATS_DB_PATH", str(tmp_path / "score_stats.db"))
+    monkeypatch.setattr(storage, "_local", threading.local())  # per-thread connections to the paths above
+    monkeypatch.setattr(storage, "_writers", {})  # transcript writers hold the path they were opened for
+    monkeypatch.setattr(storage, "_TABLES", {
+        "candidates": (storage.CANDIDATES_CSV, storage.CANDIDATE_COLUMNS),
+        "performances": (storage.PERF_CSV, storage.PERF_COLUMNS),
+    })
+    storage.ensure_data_dirs()
+    yield tmp_path
+    storage.flush_writes()
+
+
+BASIC_DETAILS = ["hello", "Ada Lovelace", "ada@example.com", "3 years", "Backend Developer", "Python, Django"]
@@ -0,0 +1,24 @@
+import json
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from core import analytics, storage
+
+SCORES = [12, 40, 55, 55, 61, 66, 70, 72, 72, 90, 34, 58]
+
+
+def test_distribution_quantiles_match_performance_stats(tmp_path, monkeypatch):
+    monkeypatch.setattr(analytics, "ANALYTICS_DIR", str(tmp_path / "analytics"))
+    for i, score in enumerate(SCORES):
+        role = "Backend Developer" if i % 3 else "Data Engineer"
+        storage.append_performance(f"c{i}", "Ada", "ada@example.com", role, "Python, SQL", score, json.dumps([]))
+    storage.flush_writes()
+    analytics.export_performances()
+
+    for role in (None, "Backend Developer"):
+        dist = analytics.score_distribution(role)
+        stats = storage.performance_stats("role", role) if role else storage.performance_stats()
+        assert dist["count"] == stats["count"]
+        assert (dist["mean"], dist["p50"], dist["p90"]) == (stats["mean"], stats["p50"], stats["p90"])
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+
+from core import calibrate, evaluator
+
+LABELED = [
+    {"q": "Explain Python decorators and closures.", "a": "A decorator wraps a function; closures keep the enclosing scope alive."},
+    {"q": "How does the Django ORM avoid N+1 queries?", "a": "select_related joins and prefetch_related batches the related queries."},
+    {"q": "What is RAII in C++?", "a": "In C++ resources are tied to object lifetime, released in the destructor."},
+    {"q": "Describe Kubernetes pods.", "a": "I like turtles and sunny weather."},
+    {"q": "What is a hash map?", "a": "A hash map stores keys and values; a hash map looks up keys in O(1)."},
+    {"q": "Explain SQL indexes.", "a": "aaaaaaaaaaaa"},
+    {"q": "Why use Go channels?", "a": "Channels let goroutines communicate; use channels instead of shared memory."},
+    {"q": "What does the GIL protect?", "a": "Reference counts: the GIL lets one thread run Python bytecode at a time."},
+]
+
+WEIGHT_SETS = [(0.6, 0.4, 0.15), (0.3, 0.7, 0.25), (1.0, 0.0, 0.0), (0.05, 0.95, 0.5)]
+
+
+@pytest.mark.parametrize("w_sim,w_kw,threshold", WEIGHT_SETS)
+def test_vectorized_scores_reproduce_the_evaluator(w_sim, w_kw, threshold, monkeypatch):
+    features = evaluator.answer_features(LABELED)
+    scores = calibrate.score_features(features, np.array([[w_sim, w_kw]]), np.array([threshold]))[0]
+
+    monkeypatch.setattr(evaluator, "W_SIM", w_sim)
+    monkeypatch.setattr(evaluator, "W_KW", w_kw)
+    monkeypatch.setattr(evaluator, "MIN_ACCEPT_THRESHOLD", threshold)
+    graded = evaluator.grade_qa_batch(None, None, LABELED, use_llm=False, use_cache=False)
+    assert scores.tolist() == [r["score"] for r in graded]
+
+
+def test_grid_search_recovers_the_weights_behind_the_labels():
+    features = evaluator.answer_features(LABELED)
+    labels = calibrate.score_features(features, np.array([[0.3, 0.7]]), np.array([0.25]))[0]
+    best = calibrate.grid_search(features, labels, "mae", step=0.1)
+    assert best["mae"] == 0.0
+    assert best["evaluated"] == 11 * 11 * 51
+    assert calibrate.current_error(features, labels) > 0
+
+
+def test_written_weights_load_back(tmp_path):
+    path = str(tmp_path / "models" / "evaluator_weights.json")
+    result = {"w_sim": 0.3, "w_kw": 0.7, "threshold": 0.25, "mae": 0.1}
+    data = calibrate.write_weights(result, "mae", 8, 1.2, path=path)
+    assert evaluator.load_weights(path) == {"version": data["version"], "w_sim": 0.3, "w_kw": 0.7, "threshold": 0.25}
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({**data, "format": evaluator.WEIGHTS_FORMAT + 1}, f)
+    assert evaluator.load_weights(path) is None
+    assert evaluator.load_weights(str(tmp_path / "missing.json")) is None
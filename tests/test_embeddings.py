@@ -0,0 +1,66 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.embeddings import EmbeddingSimilarity, VectorCache, text_key
+
+
+def _vec(*values):
+    v = np.asarray(values, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+def test_vector_cache_appends_and_other_instances_refresh(tmp_path):
+    writer = VectorCache(str(tmp_path), dim=3)
+    reader = VectorCache(str(tmp_path), dim=3)  # e.g. another worker process
+    assert reader.get_many(["a"]) == {}
+
+    writer.put_many({"a": _vec(1, 0, 0), "b": _vec(0, 1, 0)})
+    writer.put_many({"a": _vec(0, 0, 1), "c": _vec(0, 0, 1)})  # "a" is kept as first written
+    got = reader.get_many(["a", "b", "c", "missing"])
+    assert sorted(got) == ["a", "b", "c"]
+    assert got["a"].tolist() == [1, 0, 0] and got["c"].tolist() == [0, 0, 1]
+    assert len(reader) == 3
+    assert (tmp_path / "vectors.f32").stat().st_size == 3 * 3 * 4
+
+
+def test_vector_cache_trims_vectors_orphaned_by_a_crash(tmp_path):
+    cache = VectorCache(str(tmp_path), dim=2)
+    cache.put_many({"a": _vec(1, 0)})
+    with open(cache.vectors_path, "ab") as f:
+        f.write(np.asarray([9, 9], dtype=np.float32).tobytes())  # vector written, key never was
+    cache.put_many({"b": _vec(0, 1)})
+    assert VectorCache(str(tmp_path), dim=2).get_many(["a", "b"])["b"].tolist() == [0, 1]
+
+
+class StandInModel:
+    """Deterministic unit vectors; records every encode() batch."""
+
+    def __init__(self):
+        self.batches = []
+
+    def get_sentence_embedding_dimension(self):
+        return 4
+
+    def encode(self, texts, **kwargs):
+        self.batches.append(list(texts))
+        return np.stack([_vec(len(t) % 7 + 1, t.count(" ") + 1, t.count("e") + 1, 1) for t in texts])
+
+
+def test_similarities_encode_each_batch_once_and_reuse_cached_questions(tmp_path):
+    backend = EmbeddingSimilarity("stand-in", cache_dir=str(tmp_path))
+    backend._model = model = StandInModel()
+    backend._cache = VectorCache(str(tmp_path), 4)
+    questions = ["What is a closure?", "Explain the GIL.", "What is a closure?", "Explain the GIL."]
+    answers = ["A function with captured scope.", "A global lock.", "", "One thread runs bytecode."]
+
+    first = backend.similarities(questions, answers)
+    assert model.batches == [["What is a closure?", "Explain the GIL."] + answers]
+    assert first[2] == 0.0 and all(0.0 <= s <= 1.0 for s in first)
+    expected = float(np.dot(model.encode([questions[0]])[0], model.encode([answers[0]])[0]))
+    assert first[0] == pytest.approx(expected)
+
+    model.batches.clear()
+    assert backend.similarities(questions, answers) == first
+    assert model.batches == [answers]
+    assert sorted(backend._cache.get_many([text_key(q) for q in questions])) == sorted({text_key(q) for q in questions})
@@ -0,0 +1,36 @@
+from core.eval_cache import EvalCache
+
+
+def _entries(prefix, n):
+    return {f"{prefix}{i}": (float(i % 10), "j") for i in range(n)}
+
+
+def test_cache_stays_within_max_entries(tmp_path):
+    cache = EvalCache(str(tmp_path / "eval_cache.db"), max_entries=50)
+    for batch in range(30):
+        cache.put_many(_entries(f"b{batch}-", 10))
+        assert cache.stats()["size"] <= 50
+    assert cache.stats()["evictions"] == 250
+    # re-storing cached keys does not count as growth
+    cache.put_many(_entries("b29-", 10))
+    assert cache.stats()["evictions"] == 250
+
+
+def test_bound_is_enforced_across_restarts(tmp_path):
+    path = str(tmp_path / "eval_cache.db")
+    EvalCache(path, max_entries=1000).put_many(_entries("old-", 300))
+    # a process that restarts with a lower bound evicts on its very first insert
+    cache = EvalCache(path, max_entries=50)
+    cache.get_many(["old-299"])  # recently used, so it survives
+    cache.put_many(_entries("new-", 1))
+    assert cache.stats()["size"] == 50
+    assert cache.get_many(["old-299", "new-0"]).keys() == {"old-299", "new-0"}
+
+
+def test_rows_written_by_another_process_are_counted(tmp_path):
+    path = str(tmp_path / "eval_cache.db")
+    first, second = EvalCache(path, max_entries=50), EvalCache(path, max_entries=50)
+    first.put_many(_entries("a-", 40))
+    second.put_many(_entries("b-", 40))
+    first.put_many(_entries("c-", 1))
+    assert first.stats()["size"] == 50
@@ -0,0 +1,64 @@
+import re
+
+import pytest
+
+pytest.importorskip("sklearn")
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from core.evaluator import _extract_keywords, _score_result, _tokenize, grade_qa_batch
+
+PAIRS = [
+    {"q": "Explain Python decorators and closures.", "a": "A decorator wraps a function; closures keep the enclosing scope alive."},
+    {"q": "How does the Django ORM avoid N+1 queries?", "a": "select_related joins and prefetch_related batches the related queries."},
+    {"q": "What is RAII in C++?", "a": "In C++ resources are tied to object lifetime, released in the destructor."},
+    {"q": "How does node.js handle I/O?", "a": "node.js uses an event loop with non-blocking I/O."},
+    {"q": "Describe Kubernetes pods.", "a": "I like turtles and sunny weather."},
+    {"q": "What is a hash map?", "a": "A hash map stores keys and values; a hash map looks up keys in O(1)."},
+    {"q": "Explain SQL indexes.", "a": ""},
+    {"q": "Explain SQL indexes.", "a": "aaaaaaaaaaaa"},
+    {"q": "Explain SQL indexes.", "a": "1234 5678 9012 3456"},
+    {"q": "a b c", "a": "x y z"},
+    {"q": "", "a": "An answer to no question at all."},
+    {"q": "Why use Go channels?", "a": "Channels let goroutines communicate; use channels instead of shared memory."},
+    "a bare string answer",
+]
+
+
+def test_batched_grading_matches_per_pair_scoring():
+    batched = grade_qa_batch(None, None, PAIRS, batched=True, use_llm=False, use_cache=False)
+    per_pair = grade_qa_batch(None, None, PAIRS, batched=False, use_llm=False, use_cache=False)
+    assert batched == per_pair
+    assert any(r["score"] > 0 for r in batched)
+
+
+def _reference_grade(q, a):
+    """The scorer as it was before questions and answers were analyzed once per pair."""
+    q, a = (q or "").strip(), (a or "").strip()
+    if not a or re.search(r"(.)\1{6,}", a):
+        return None
+    alpha_ratio = sum(1 for c in a if c.isalpha()) / len(a)
+    if (len(a) >= 15 and alpha_ratio < 0.25) or (len(a) < 6 and not _tokenize(a)):
+        return None
+    keywords = _extract_keywords(q)
+    kw = sum(1 for k in keywords if re.search(rf"\b{re.escape(k)}\b", a.lower())) / len(keywords) if keywords else 0.0
+    sim = 0.0
+    if q:
+        try:
+            mat = TfidfVectorizer().fit([q, a]).transform([q, a])
+            sim = max(0.0, min(1.0, float(cosine_similarity(mat[0], mat[1])[0][0])))
+        except ValueError:
+            qt, at = set(_tokenize(q)), set(_tokenize(a))
+            sim = len(qt & at) / len(qt | at) if qt and at else 0.0
+    return _score_result(q, a, kw, sim)
+
+
+def test_shared_analysis_reproduces_the_previous_scorer():
+    pairs = [p for p in PAIRS if isinstance(p, dict)]
+    for pair, result in zip(pairs, grade_qa_batch(None, None, pairs, batched=False, use_llm=False, use_cache=False)):
+        expected = _reference_grade(pair["q"], pair["a"])
+        if expected is None:
+            assert result["score"] == 0.0 and result["justification"].startswith("Gibberish")
+        else:
+            assert result == expected
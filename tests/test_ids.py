@@ -0,0 +1,36 @@
+import re
+import threading
+import time
+
+from core.ids import new_candidate_id
+
+_ULID_RE = re.compile(r"[0-9A-HJKMNP-TV-Z]{26}")
+
+
+def test_candidate_ids_are_ulids_that_sort_by_creation_time():
+    before_ms = time.time_ns() // 1_000_000
+    ids = [new_candidate_id() for _ in range(2000)]
+    assert all(_ULID_RE.fullmatch(i) for i in ids)
+    assert ids == sorted(ids) and len(set(ids)) == len(ids)
+    # the first 10 characters are the creation millisecond
+    first_ms = 0
+    for c in ids[0][:10]:
+        first_ms = first_ms * 32 + "0123456789ABCDEFGHJKMNPQRSTVWXYZ".index(c)
+    assert before_ms <= first_ms <= time.time_ns() // 1_000_000
+
+
+def test_candidate_ids_are_unique_across_threads():
+    ids, lock = [], threading.Lock()
+
+    def worker():
+        mine = [new_candidate_id() for _ in range(500)]
+        assert mine == sorted(mine)
+        with lock:
+            ids.extend(mine)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(set(ids)) == 4000
@@ -0,0 +1,53 @@
+import threading
+
+from conftest import BASIC_DETAILS
+from core import scoring, storage
+from core.flow import InterviewSession, Phase
+
+
+def test_reset_cancels_pending_scoring(fake_llm, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(scoring, "_grade_one", lambda llm, prompt, qa: release.wait(5) and {"score": 5})
+    session = InterviewSession({}, interviewer_llm=fake_llm, evaluator_llm=fake_llm)
+    session.start()
+    for text in BASIC_DETAILS + [f"answer {i}" for i in range(8)]:
+        session.handle(text)
+    assert session.phase == Phase.INTERVIEW
+    scorer = session.state["scorer"]  # still referenced, so only an explicit cancel stops it
+    futures = [fut for _, fut in scorer._entries]
+    assert len(futures) == 8
+
+    try:
+        # the workers are all busy, so most answers are still queued when the candidate starts over
+        session.reset()
+        assert sum(fut.cancelled() for fut in futures) >= len(futures) - scoring._EXECUTOR._max_workers
+        assert session.phase == Phase.GREET
+        assert session.state["answers"] == [] and session.state["scorer"] is None
+    finally:
+        release.set()
+
+
+def test_resume_needs_the_resume_token_and_keeps_the_question_tier(fake_llm):
+    first = InterviewSession({}, interviewer_llm=fake_llm, evaluator_llm=fake_llm)
+    first.start()
+    for text in BASIC_DETAILS + ["answer 0", "answer 1", "answer 2"]:
+        first.handle(text)
+    candidate = first.state["candidate"]
+    token = first.snapshot()["resume_token"]
+    assert token and token != candidate["id"]
+    storage.flush_writes()
+    # a checkpoint from before resume tokens, named by the (guessable) candidate id
+    storage.save_checkpoint(candidate["id"], {"candidate": candidate, "questions": [], "current_q": 0, "answers": []})
+    storage.flush_writes()
+
+    second = InterviewSession({}, interviewer_llm=fake_llm, evaluator_llm=fake_llm)
+    assert not second.resume(candidate["id"])
+    assert second.phase == Phase.GREET
+    assert second.resume(token)
+    assert second.state["current_q"] == 3
+    for i in range(3, 10):
+        second.handle(f"answer {i}")
+    assert second.phase == Phase.THANK_YOU
+    assert second.state["performance"]["question_tier"] == "model"
+    storage.flush_writes()
+    assert storage.load_checkpoint(token) is None
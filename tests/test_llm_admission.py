@@ -0,0 +1,92 @@
+import threading
+import time
+
+from core import evaluator, flow, llm
+
+
+class SlowLLM:
+    model = "slow"
+
+    def __init__(self, delay_s: float):
+        self.delay_s = delay_s
+
+    def stream(self, prompt):
+        for i in range(1, 11):
+            time.sleep(self.delay_s)
+            yield f"{i}. Slow question {i} about Python?\n"
+
+
+def _wait_until(predicate, timeout_s=2.0):
+    end = time.monotonic() + timeout_s
+    while not predicate():
+        assert time.monotonic() < end
+        time.sleep(0.01)
+
+
+def test_cut_stream_leaves_the_admission_queue(monkeypatch):
+    monkeypatch.setattr(llm, "_ADMISSION", llm._AdmissionQueue(1))
+    model = llm._TimedChatModel(SlowLLM(0.5))
+    hog = threading.Thread(target=lambda: list(model.stream("hog")), daemon=True)
+    hog.start()
+    _wait_until(lambda: llm.llm_queue_metrics()["running"] == 1)
+
+    stream = flow.QuestionStream(model, "prompt", ["Python"], deadline_s=0.2)
+    _wait_until(lambda: llm.llm_queue_metrics()["queued"] == 1)
+    assert stream.get(0).startswith("In Python")  # served from the generic tier after the deadline
+    _wait_until(lambda: llm.llm_queue_metrics()["queued"] == 0)
+    _wait_until(lambda: stream.done)
+    assert isinstance(stream.error, llm.LLMCallAbandoned)
+
+
+def test_running_stream_releases_its_slot_after_the_time_limit(monkeypatch):
+    monkeypatch.setattr(llm, "_ADMISSION", llm._AdmissionQueue(1))
+    monkeypatch.setattr(flow, "QUESTION_GENERATION_TIMEOUT_S", 0.3)
+    stream = flow.QuestionStream(llm._TimedChatModel(SlowLLM(0.1)), "prompt", ["Python"], deadline_s=0.1)
+    stream.fall_back()
+    _wait_until(lambda: stream.done)
+    assert llm.llm_queue_metrics()["running"] == 0
+    assert isinstance(stream.error, llm.LLMCallAbandoned)
+    assert len(stream.result()) == 10
+
+
+class Grader:
+    model = "grader"
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return '{"score": 7, "justification": "fine"}'
+
+
+def test_grading_timeout_withdraws_queued_calls(monkeypatch):
+    monkeypatch.setattr(llm, "_ADMISSION", llm._AdmissionQueue(1))
+    monkeypatch.setattr(evaluator, "LLM_GRADING_TIMEOUT", 0.3)
+    release = threading.Event()
+
+    class Hog:
+        model = "hog"
+
+        def stream(self, prompt):
+            release.wait(5)
+            yield "1. Done?\n"
+
+    hog = threading.Thread(target=lambda: list(llm._TimedChatModel(Hog()).stream("hog")), daemon=True)
+    hog.start()
+    _wait_until(lambda: llm.llm_queue_metrics()["running"] == 1)
+
+    grader = Grader()
+    qa = [{"q": f"How does Python manage memory {i}?", "a": "Reference counting plus a cyclic garbage collector."}
+          for i in range(3)]
+    results = evaluator.grade_qa_batch(
+        llm._TimedChatModel(grader, llm.PRIORITY_BATCH), "{question} {answer}", qa, use_llm=True, use_cache=False,
+    )
+    assert len(results) == 3
+    # the batch gave up: its calls leave the queue instead of waiting for the hog's slot
+    _wait_until(lambda: llm.llm_queue_metrics()["queued"] == 0, timeout_s=1.0)
+    release.set()
+    hog.join(2)
+    _wait_until(lambda: llm.llm_queue_metrics()["running"] == 0)
+    time.sleep(0.1)
+    assert grader.calls == 0
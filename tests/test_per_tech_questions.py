@@ -0,0 +1,69 @@
+import re
+
+from conftest import BASIC_DETAILS, FakeLLM
+from core import flow
+from core.flow import InterviewSession, QuestionStream, per_tech_quotas
+from core.question_index import QuestionIndex
+
+SHARED = "What is the difference between a list and a tuple?"
+QUESTIONS = {
+    "Python": ["How do Python decorators work?", "What does the GIL protect?", "How are generators lazily evaluated?",
+               "When would you use a dataclass?", "How does reference counting free memory?", SHARED],
+    "Django": ["How does the Django ORM avoid N+1 queries?", "What do Django middlewares do?",
+               "How are Django migrations generated?", "When should signals be avoided?",
+               "what is the difference between a LIST and a tuple"],
+}
+
+
+class TechLLM(FakeLLM):
+    """Answers each prompt with the questions of the tech it names."""
+
+    def __init__(self):
+        super().__init__()
+        self.prompts = []
+
+    def stream(self, prompt):
+        self.calls += 1
+        self.prompts.append(prompt)
+        tech = "Django" if re.search(r"Tech Stack: Django\b|^Django$", prompt, re.M) else "Python"
+        for i, q in enumerate(QUESTIONS[tech], 1):
+            yield f"{i}. {q}\n"
+
+
+def test_quotas_split_evenly_with_the_remainder_first():
+    assert per_tech_quotas(["Python", "Django", "SQL"], 10) == {"Python": 4, "Django": 3, "SQL": 3}
+    assert per_tech_quotas(["Python", "Python", "Go"], 10) == {"Python": 5, "Go": 5}
+    assert per_tech_quotas(["Go"], 10) == {"Go": 10}
+    assert sum(per_tech_quotas([f"t{i}" for i in range(12)], 10).values()) == 12  # at least one each
+
+
+def test_per_tech_streams_merge_without_duplicates_and_alternate(tmp_path, monkeypatch):
+    index = QuestionIndex(str(tmp_path / "question_index.db"))
+    monkeypatch.setattr(flow, "get_question_index", lambda: index)
+    questions = QuestionStream(TechLLM(), {"Python": "Python", "Django": "Django"}, ["Python", "Django"], total=10)
+    for t in questions._threads:
+        t.join()
+    served = questions.result()
+
+    assert questions.sources() == ["model"] * 10
+    assert len({flow._dedup_key(q) for q in served}) == 10
+    tech_of = {q: tech for tech, qs in QUESTIONS.items() for q in qs}
+    # the least-covered tech goes next while both have questions left
+    assert [tech_of[q] for q in served[:8]].count("Django") == 4
+    # generated questions are indexed under the tech they were asked for
+    assert set(index.assemble(["Django"], 10)) <= set(QUESTIONS["Django"])
+    assert set(index.assemble(["Python"], 10)) <= set(QUESTIONS["Python"])
+
+
+def test_interview_asks_each_tech_for_its_share_plus_a_spare(monkeypatch):
+    monkeypatch.setattr(flow, "QUESTION_GENERATION", "per_tech")
+    llm = TechLLM()
+    session = InterviewSession({}, interviewer_llm=llm, evaluator_llm=llm)
+    session.start()
+    for text in BASIC_DETAILS:
+        session.handle(text)
+    session.state["questions"].result()
+
+    assert sorted(re.search(r"Tech Stack: (\w+)", p).group(1) for p in llm.prompts) == ["Django", "Python"]
+    assert all("Write exactly 6 questions." in p for p in llm.prompts)
+    assert len(session.state["questions"]) == 10
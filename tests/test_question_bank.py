@@ -0,0 +1,27 @@
+from conftest import FakeLLM
+from core import flow
+from core.flow import QuestionStream, stream_questions
+from core.question_bank import QuestionBank, profile_key
+
+
+def _interview(llm, key):
+    questions = stream_questions(llm, "prompt", ["Python", "Django"], total=10, bank_key=key)
+    served = list(questions) if isinstance(questions, list) else questions.result()
+    if isinstance(questions, QuestionStream):
+        for t in questions._threads:
+            t.join()  # the bank is written once generation ends
+    return served
+
+
+def test_repeat_profile_gets_fresh_questions(tmp_path, monkeypatch):
+    bank = QuestionBank(str(tmp_path / "question_bank.db"))
+    monkeypatch.setattr(flow, "get_question_bank", lambda: bank)
+    key = profile_key(["Python", "Django"], "Backend Developer", "3 years")
+
+    first = _interview(FakeLLM(prefix="First question"), key)
+    assert len(bank.sample(key, 100)) == 10
+
+    second = _interview(FakeLLM(prefix="Second question"), key)
+    fresh = [q for q in second if q.startswith("Second question")]
+    assert len(fresh) == round(10 * flow.QUESTION_BANK_FRESH_RATIO) > 0
+    assert set(second) - set(fresh) <= set(first)
@@ -0,0 +1,63 @@
+import json
+from functools import partial
+
+from conftest import BASIC_DETAILS, FakeLLM
+from core import flow
+from core.flow import InterviewSession, Phase
+from core.question_index import QuestionIndex
+
+
+class DistinctLLM(FakeLLM):
+    TOPICS = ["decorators and closures", "Django ORM query optimisation", "asyncio event loops"]
+
+    def _lines(self):
+        return [f"{i}. How would you explain {topic}?\n" for i, topic in enumerate(self.TOPICS, 1)]
+
+
+def _generic(question):
+    return question.startswith("In ") and "fundamentals" in question
+
+
+def test_generic_fallback_questions_stay_out_of_the_index(tmp_path, monkeypatch):
+    index = QuestionIndex(str(tmp_path / "question_index.db"))
+    monkeypatch.setattr(flow, "get_question_index", lambda: index)
+    # three model questions: the other seven come from the generic template
+    llm = DistinctLLM(n=3)
+    session = InterviewSession({}, interviewer_llm=llm, evaluator_llm=llm)
+    session.start()
+    for text in BASIC_DETAILS + [f"answer {i}" for i in range(10)]:
+        session.handle(text)
+    assert session.phase == Phase.THANK_YOU
+
+    answers = session.state["answers"]
+    assert [a["tier"] for a in answers] == ["model"] * 3 + ["generic"] * 7
+    assert [r["tier"] for r in session.state["performance"]["breakdown"]] == [a["tier"] for a in answers]
+
+    assert len(index) == 3
+    assert not any(_generic(q) for q in index.assemble(["Python", "Django"], 10))
+
+
+def test_rebuild_skips_generic_questions_without_tiers(tmp_path, monkeypatch):
+    from core import storage
+    from core.question_index import rebuild_question_index
+
+    real = "How does Django's ORM avoid N+1 queries?"
+    asked = "What does the GIL protect in CPython?"
+    generic = flow._fallback_question(["Python"], 0)
+    # a breakdown written before answers carried their tier
+    storage.append_performance("c1", "Ada", "ada@example.com", "Backend", "Python", 50, json.dumps([
+        {"question": real, "answer": "select_related", "score": 8.0},
+        {"question": generic, "answer": "something", "score": 2.0},
+    ]))
+    # an interview that was never scored: only its transcript is there
+    storage.upsert_candidate({"id": "c2", "name": "Bob", "tech_stack": "Python"})
+    storage.save_chat_history("c2", [
+        ("assistant", f"Question 1/10: {asked}"), ("user", "shared state"),
+        ("assistant", f"Question 2/10: {generic}"), ("user", "something"),
+    ])
+    storage.flush_writes()
+    monkeypatch.setattr(storage, "iter_chat_histories", partial(storage.iter_chat_histories, storage.INTERVIEWS_DIR))
+
+    index = QuestionIndex(str(tmp_path / "question_index.db"))
+    assert rebuild_question_index(index) == {"interviews": 2, "questions": 2}
+    assert sorted(index.assemble(["Python"], 10)) == sorted([real, asked])
@@ -0,0 +1,48 @@
+import time
+
+from conftest import FakeLLM
+from core import flow
+from core.flow import QuestionStream, question_tier_metrics
+
+
+class SlowLLM(FakeLLM):
+    def stream(self, prompt):
+        for line in super().stream(prompt):
+            time.sleep(0.05)
+            yield line
+
+
+def test_tier_metrics_time_the_first_question_and_the_full_set(monkeypatch):
+    monkeypatch.setattr(flow, "_TIER_STATS", flow._TierStats())
+    # three streamed questions, the other two filled from the generic tier once the model is done
+    questions = QuestionStream(SlowLLM(n=3), "prompt", ["Python"], total=5)
+    assert len(questions.result()) == 5
+
+    metrics = question_tier_metrics()["generic"]
+    assert metrics["interviews"] == 1
+    assert metrics["first_p50_s"] < metrics["full_p50_s"]
+    assert metrics["full_p50_s"] >= 0.15
+    assert question_tier_metrics()["model"]["interviews"] == 0
+
+
+class LateBankLLM(FakeLLM):
+    """Streams, after the deadline, a question the bank has already served."""
+
+    def _lines(self):
+        return ["1. What is a Python bank question?\n"] + [f"{i}. Model question {i} on asyncio?\n" for i in range(2, 6)]
+
+    def stream(self, prompt):
+        time.sleep(0.2)
+        yield from super().stream(prompt)
+
+
+def test_model_question_already_served_from_the_bank_is_skipped():
+    bank_question = "What is a Python bank question?"
+    questions = QuestionStream(LateBankLLM(), "prompt", ["Python"], total=5,
+                               cached=[bank_question], n_fresh=3, deadline_s=0.05)
+    assert questions.get(0) == bank_question  # the model missed the deadline
+    for t in questions._threads:
+        t.join()
+    served = questions.result()
+    assert len(set(served)) == 5
+    assert served.count(bank_question) == 1
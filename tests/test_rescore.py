@@ -0,0 +1,56 @@
+import csv
+import json
+
+import pytest
+
+from core import evaluator, rescore, storage
+from core.eval_cache import EvalCache
+
+ANSWERS = [
+    ("How does Python manage memory?", "Reference counting plus a cyclic garbage collector."),
+    ("What is a Django migration?", "A versioned change to the database schema generated from the models."),
+    ("Explain the GIL.", "asdf qwer"),
+]
+
+
+@pytest.fixture
+def performances(tmp_path, monkeypatch):
+    path = str(tmp_path / "eval_cache.db")
+    # a connection per call: the pool's worker processes must not share one
+    monkeypatch.setattr(evaluator, "get_eval_cache", lambda: EvalCache(path))
+    for i in range(7):
+        breakdown = [{"question": q, "answer": f"{a} ({i})", "score": 0} for q, a in ANSWERS]
+        storage.append_performance(f"c{i}", "Ada", "ada@example.com", "Backend", "Python", 0, json.dumps(breakdown))
+    storage.flush_writes()
+    return path
+
+
+def _rows(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return sorted(list(csv.reader(f))[1:])
+
+
+class Interrupted(Exception):
+    pass
+
+
+def test_interrupted_run_resumes_to_the_same_output(tmp_path, performances):
+    full = rescore.rescore(workers=1, chunk_size=2, out_dir=str(tmp_path / "full"))
+    assert full["rescored"] == 7
+    assert EvalCache(performances).stats()["size"] == 7 * len(ANSWERS)
+
+    def stop(rows, answers, elapsed):
+        raise Interrupted
+
+    with pytest.raises(Interrupted):
+        rescore.rescore(workers=1, chunk_size=2, out_dir=str(tmp_path / "resumed"), progress=stop)
+    out_path = tmp_path / "resumed" / f"performances-{full['tag']}.csv"
+    partial = rescore._done_rows(str(out_path))
+    assert 0 < len(partial) < 7
+    with open(out_path, "a", encoding="utf-8") as f:
+        f.write("7,c6,1")  # torn record left by a kill mid-write
+
+    # the rest now comes from the cache the first run filled, and must match it row for row
+    resumed = rescore.rescore(workers=1, chunk_size=2, out_dir=str(tmp_path / "resumed"))
+    assert resumed["skipped"] == len(partial)
+    assert _rows(resumed["output"]) == _rows(full["output"])
@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from core import score_stats, storage
+
+ROLES = ["Backend Developer", "backend  developer", "Data Scientist", "DevOps Engineer"]
+STACKS = ["Python, Django", "python,  SQL", "Go, Kubernetes, Python", "", "Rust"]
+
+
+def _table(conn):
+    return conn.execute("SELECT dim, key, bucket, n FROM score_stats ORDER BY dim, key, bucket").fetchall()
+
+
+@pytest.mark.parametrize("backend", ["csv", "sqlite"])
+def test_rebuild_reproduces_the_incremental_aggregates(backend, monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_BACKEND", backend)
+    storage.ensure_data_dirs()
+    rng = random.Random(7)
+    rows = [(rng.choice(ROLES), rng.choice(STACKS), rng.randint(0, 100)) for _ in range(300)]
+    for i, (role, stack, score) in enumerate(rows):
+        storage.append_performance(f"c{i}", "Cand", "c@example.com", role, stack, score, "[]")
+    storage.flush_writes()
+
+    conn = storage._stats_conn()
+    incremental = _table(conn)
+    assert storage.rebuild_performance_stats() == 300
+    assert _table(conn) == incremental
+
+    # every aggregate equals a histogram taken straight over the matching rows
+    backend_scores = [s for r, _, s in rows if score_stats.role_key(r) == "backend developer"]
+    python_scores = [s for _, t, s in rows if "python" in score_stats.split_techs(t)]
+    assert storage.performance_stats() == score_stats.summarize(score_stats.histogram(s for _, _, s in rows))
+    assert storage.performance_stats("role", "Backend Developer") == score_stats.summarize(score_stats.histogram(backend_scores))
+    assert storage.performance_stats("tech", "Python") == score_stats.summarize(score_stats.histogram(python_scores))
+
+
+def test_summary_uses_nearest_rank_quantiles():
+    stats = score_stats.summarize(score_stats.histogram([10, 20, 30, 40, "n/a", None]))
+    assert stats == {"count": 4, "mean": 25.0, "p50": 20, "p90": 40}
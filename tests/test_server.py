@@ -0,0 +1,108 @@
+import asyncio
+import json
+import os
+from functools import partial
+
+from conftest import BASIC_DETAILS
+from core.flow import InterviewSession, Phase
+from core.server import WELCOME, InterviewService
+
+
+def _service(fake_llm, **kwargs):
+    factory = partial(InterviewSession, interviewer_llm=fake_llm, evaluator_llm=fake_llm)
+    return InterviewService(threads=4, session_factory=factory, store=None, **kwargs)
+
+
+async def _request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.decode().partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return status, json.loads(await reader.readexactly(int(headers["content-length"])))
+
+
+async def _serve(service, client):
+    server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+    reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+    try:
+        return await client(reader, writer)
+    finally:
+        writer.close()
+        server.close()
+        await server.wait_closed()
+
+
+def test_http_interview_from_greeting_to_score(fake_llm):
+    texts = BASIC_DETAILS + [f"answer {i}: reference counting and the GIL" for i in range(10)]
+
+    async def client(reader, writer):
+        status, created = await _request(reader, writer, "POST", "/sessions")
+        assert (status, created["messages"], created["phase"]) == (201, [WELCOME], Phase.WAIT_GREETING)
+        path = f"/sessions/{created['session_id']}"
+        replies = [await _request(reader, writer, "POST", f"{path}/messages", {"text": t}) for t in texts]
+        after = await _request(reader, writer, "POST", f"{path}/messages", {"text": "one more"})
+        return replies, after, await _request(reader, writer, "GET", path)
+
+    replies, after, (status, state) = asyncio.run(_serve(_service(fake_llm), client))
+    assert all(s == 200 for s, _ in replies)
+    assert replies[len(BASIC_DETAILS)][1]["messages"][-1].startswith("Question 2/10")
+    assert replies[-1][1]["phase"] == Phase.THANK_YOU and len(replies[-1][1]["performance"]["scores"]) == 10
+    assert after[0] == 409
+    assert status == 200 and [m for r, m in state["chat_history"] if r == "user"] == texts
+
+
+def test_http_errors_and_health(fake_llm):
+    async def client(reader, writer):
+        _, created = await _request(reader, writer, "POST", "/sessions")
+        sid = created["session_id"]
+        return [
+            await _request(reader, writer, "GET", "/sessions/unknown"),
+            await _request(reader, writer, "POST", f"/sessions/{sid}/messages", {"text": "  "}),
+            await _request(reader, writer, "GET", "/sessions"),
+            await _request(reader, writer, "POST", "/sessions"),
+            await _request(reader, writer, "GET", "/nowhere"),
+            await _request(reader, writer, "GET", "/healthz"),
+        ]
+
+    unknown, empty, wrong_method, full, nowhere, (status, health) = asyncio.run(
+        _serve(_service(fake_llm, max_sessions=1), client))
+    assert [unknown[0], empty[0], wrong_method[0], full[0], nowhere[0]] == [404, 400, 405, 503, 404]
+    assert status == 200 and health["ok"] and health["sessions"] == 1
+    assert set(health["question_tiers"]) == {"model", "bank", "index", "generic"}
+
+
+def _ws_frame(text, opcode=0x1):
+    payload, mask = text.encode(), os.urandom(4)
+    return bytes([0x80 | opcode, 0x80 | len(payload)]) + mask + bytes(c ^ mask[i % 4] for i, c in enumerate(payload))
+
+
+async def _ws_recv(reader):
+    b1, n = await reader.readexactly(2)
+    if n == 126:
+        n = int.from_bytes(await reader.readexactly(2), "big")
+    return json.loads(await reader.readexactly(n))
+
+
+def test_websocket_turns(fake_llm):
+    async def client(reader, writer):
+        _, created = await _request(reader, writer, "POST", "/sessions")
+        writer.write(
+            f"GET /sessions/{created['session_id']}/ws HTTP/1.1\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            "Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\nSec-WebSocket-Version: 13\r\n\r\n".encode()
+        )
+        handshake = await reader.readuntil(b"\r\n\r\n")
+        first = await _ws_recv(reader)
+        writer.write(_ws_frame("hello") + _ws_frame(json.dumps({"text": "Ada Lovelace"})))
+        greeted, named = await _ws_recv(reader), await _ws_recv(reader)
+        writer.write(_ws_frame("", opcode=0x8))
+        return handshake, first, greeted, named, await reader.readexactly(2)
+
+    handshake, first, greeted, named, close = asyncio.run(_serve(_service(fake_llm), client))
+    assert handshake.startswith(b"HTTP/1.1 101") and b"s3pPLMBiTxaQ9kYGzzhZRbK+xOo=" in handshake
+    assert first["phase"] == Phase.WAIT_GREETING
+    assert greeted["pending_field"] == "name" and named["pending_field"] == "email"
+    assert close == bytes([0x88, 0])
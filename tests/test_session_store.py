@@ -0,0 +1,64 @@
+import asyncio
+from functools import partial
+
+from conftest import BASIC_DETAILS
+from core.flow import InterviewSession, Phase
+from core.server import InterviewService
+from core.session_store import MemorySessionStore, SessionSync, SQLiteSessionStore
+
+
+def _replicas(store, fake_llm, n=2):
+    factory = partial(InterviewSession, interviewer_llm=fake_llm, evaluator_llm=fake_llm)
+    return [InterviewService(threads=2, session_factory=factory, store=store) for _ in range(n)]
+
+
+def test_alternating_replicas_continue_each_others_turns(tmp_path, fake_llm):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    replicas = _replicas(store, fake_llm)
+    texts = BASIC_DETAILS + [f"answer {i}: reference counting and the GIL" for i in range(10)]
+
+    async def run():
+        sid, _ = await replicas[0].create()
+        results = []
+        for i, text in enumerate(texts):
+            # both replicas keep their in-memory copy; each sees the other's turns through the store
+            service = replicas[i % 2]
+            entry = await service.get(sid)
+            results.append(await service.turn(entry, text))
+        return sid, results
+
+    sid, results = asyncio.run(run())
+    assert all(r is not None for r in results)
+    assert results[2]["messages"] == ["Thanks! What's your **work experience** (e.g., '3 years')?"]
+    assert results[-1]["phase"] == Phase.THANK_YOU
+
+    final = InterviewSession({}, store=store, session_id=sid)
+    assert [a["a"] for a in final.state["answers"]] == texts[len(BASIC_DETAILS):]
+    users = [m for role, m in final.state["chat_history"] if role == "user"]
+    assert users == texts
+
+
+def test_stale_writer_reloads_instead_of_overwriting():
+    store = MemorySessionStore()
+    first, second = {}, {}
+    a = InterviewSession(first, store=store, session_id="s")
+    a.start()
+    b = InterviewSession(second, store=store, session_id="s")
+    assert b.restored
+    b.handle("hello")
+
+    # a's copy is behind: its next write must not clobber b's turn
+    first["chat_history"].append(("user", "stale"))
+    assert first["_session_sync"].commit(first) == 0
+    assert first["phase"] == Phase.COLLECT_INFO
+    assert ("user", "stale") not in store.load("s")[1]["chat_history"]
+
+
+def test_sync_writes_only_appended_items():
+    store = MemorySessionStore()
+    state = {"phase": Phase.INTERVIEW, "chat_history": [("user", "hi")], "answers": []}
+    sync = SessionSync(store, "s")
+    sync.commit(state)
+    state["chat_history"].append(("assistant", "hello"))
+    ops, _ = sync.delta(state)
+    assert ops == [("append", "chat_history", [["assistant", "hello"]])]
@@ -0,0 +1,100 @@
+import json
+import multiprocessing
+import threading
+
+import pytest
+
+from core import storage
+
+
+def _write_history(n):
+    for i in range(n):
+        storage.upsert_candidate({"id": f"c{i}", "name": f"Cand {i}", "email": f"c{i}@example.com",
+                                  "experience": "2 years", "desired_position": "Backend", "tech_stack": "Python"})
+        storage.append_performance(f"c{i}", f"Cand {i}", f"c{i}@example.com", "Backend", "Python", 10 * i, "[]")
+    storage.flush_writes()
+
+
+def test_csv_writes_append_without_rewriting_earlier_rows():
+    _write_history(2)
+    with open(storage.PERF_CSV, "rb") as f:
+        before = f.read()
+    storage.append_performance("c9", "Cand 9", "c9@example.com", "Backend", "Python", 90, "[]").result(timeout=5)
+    with open(storage.PERF_CSV, "rb") as f:
+        after = f.read()
+    assert after.startswith(before) and len(after) > len(before)
+    assert [r["id"] for r in storage.iter_performances()] == ["c0", "c1", "c9"]
+
+
+def test_migrate_csv_to_sqlite_round_trip(monkeypatch):
+    _write_history(3)
+    candidates = list(storage.iter_candidates())
+    performances = list(storage.iter_performances())
+    stats = storage.performance_stats()
+
+    monkeypatch.setattr(storage, "STORAGE_BACKEND", "sqlite")
+    assert storage.migrate_csv_to_sqlite() == {"candidates": 3, "performances": 3}
+    # re-running must not duplicate rows
+    assert storage.migrate_csv_to_sqlite() == {"candidates": 0, "performances": 0}
+
+    # SQLite returns scores as integers, the CSV as text
+    assert list(storage.iter_candidates()) == candidates
+    assert [{**r, "score": str(r["score"])} for r in storage.iter_performances()] == performances
+    assert storage.performance_stats() == stats
+
+
+def test_chat_history_round_trips_through_append_only_jsonl():
+    history = [("assistant", "Hi! Your name?"), ("user", "Zoë — naïve \"quotes\"\nand a newline")]
+    storage.save_chat_history("c1", history).result(timeout=5)
+    path = storage._transcript_path("c1")
+    with open(path, "rb") as f:
+        before = f.read()
+
+    history += [("assistant", "Question 1/10: What is a closure?"), ("user", "A function with captured scope.")]
+    storage.save_chat_history("c1", history).result(timeout=5)
+    with open(path, "rb") as f:
+        after = f.read()
+    assert after.startswith(before)
+    assert after.count(b"\n") == 4
+    assert storage.load_chat_history("c1") == history
+
+
+def test_chat_history_recovers_from_a_torn_record_and_reads_legacy_json():
+    history = [("assistant", "Hi!"), ("user", "hello")]
+    storage.save_chat_history("c1", history).result(timeout=5)
+    with open(storage._transcript_path("c1"), "a", encoding="utf-8") as f:
+        f.write('{"role": "assistant", "con')  # a crash mid-write
+    assert storage.load_chat_history("c1") == history
+
+    history.append(("assistant", "Question 1/10: ..."))
+    storage.save_chat_history("c1", history).result(timeout=5)
+    assert storage.load_chat_history("c1") == history
+
+    with open(storage._legacy_transcript_path("c2"), "w", encoding="utf-8") as f:
+        json.dump([{"role": "user", "content": "old format"}], f)
+    assert storage.load_chat_history("c2") == [("user", "old format")]
+    assert dict(storage.iter_chat_histories(storage.INTERVIEWS_DIR)) == {"c1": history, "c2": [("user", "old format")]}
+
+
+def _append_from_worker(worker):
+    storage._local = threading.local()  # no SQLite connection may cross a fork
+    breakdown = json.dumps([{"question": "q" * 500, "answer": str(worker) * 500}] * 4)
+    for i in range(50):
+        storage._append_rows("performances", [{"id": f"w{worker}-{i}", "role": "Backend", "tech_stack": "Python",
+                                               "score": 50, "breakdown": breakdown}])
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_concurrent_worker_processes_append_intact_rows():
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_append_from_worker, args=(w,)) for w in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+
+    rows = list(storage.iter_performances())
+    assert sorted(r["id"] for r in rows) == sorted(f"w{w}-{i}" for w in range(4) for i in range(50))
+    assert all(len(json.loads(r["breakdown"])) == 4 for r in rows)
+    assert storage.performance_stats()["count"] == 200
@@ -0,0 +1,43 @@
+import threading
+import time
+
+from core.write_behind import WriteBehindQueue
+
+
+def _wait_until(predicate, timeout_s=2.0):
+    end = time.monotonic() + timeout_s
+    while not predicate():
+        assert time.monotonic() < end
+        time.sleep(0.01)
+
+
+def test_full_queue_blocks_only_the_enqueue():
+    release = threading.Event()
+    applied = []
+
+    def apply_batch(ops):
+        release.wait(5)
+        applied.extend(ops)
+        return [None] * len(ops)
+
+    q = WriteBehindQueue(apply_batch, maxsize=1, max_batch=1, linger_s=0)
+    futures = [q.submit("a")]
+    _wait_until(lambda: q.pending() == 0)  # the worker holds "a"
+    futures.append(q.submit("b"))  # fills the queue
+
+    blocked = [threading.Thread(target=lambda op=op: futures.append(q.submit(op))) for op in ("c", "d")]
+    for t in blocked:
+        t.start()
+    # both submitters wait on the full queue itself, not on each other's lock
+    _wait_until(lambda: q._enqueuing == 2)
+    assert not q.flush(timeout=0.1)
+
+    release.set()
+    for t in blocked:
+        t.join(2)
+    assert q.flush(timeout=2)
+    assert all(f.done() and f.exception() is None for f in futures)
+    assert sorted(applied) == ["a", "b", "c", "d"]
+    assert q.ops == 4
+    q.close(timeout=2)
+    assert q.flush(timeout=1)